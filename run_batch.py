@@ -0,0 +1,436 @@
+"""
+===========================================================================
+Screen a whole universe of stocks against a set of benchmarks, no prompts.
+===========================================================================
+
+run_batch.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: non-interactive version of run_correlations.py for scheduled jobs. Reads a
+ universe file (one ticker per line, '#' for comments), fetches the chosen benchmark set
+ once, and then streams one result row per ticker to a CSV or JSONL file as it goes. A
+ checkpoint file next to the output records how far the run got, so an interrupted run
+ picks up where it stopped instead of starting over. The statistics for each chunk of
+ tickers are spread over a process pool when the chunk is big enough (sc_parallel.py), so
+ for large universes pass a --chunk in the thousands.
+
+Usage:
+    python3 run_batch.py universe.txt --benchmarks 1 --output results.csv [--charts charts/]
+                         [--factor | --bootstrap N] [--chunk 32] [--processes N]
+                         [--profile] [--metrics-out metrics.prom]
+
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+import sc_analysis as sca
+import sc_benchmarks as scb
+import sc_metrics as scm
+import sc_panel as scpn
+import sc_request_manager as scr
+import sc_settings as scs
+
+
+def read_universe(path):
+    """
+    Lazily iterate over the tickers in a universe file.
+
+    Parameters
+    ----------
+    path :
+        Path to a text file with one ticker per line. Anything after a
+        comma or a '#' on a line is ignored.
+
+    Returned Variables [1]
+    ----------------------
+    <generator> :
+        Yields (line_number, ticker) for each non-blank line.
+    """
+
+    with open(path) as f:
+        for line_number, line in enumerate(f):
+            ticker = line.split('#')[0].split(',')[0].strip().upper()
+            if ticker:
+                yield line_number, ticker
+
+
+def load_checkpoint(checkpoint_path):
+    try:
+        with open(checkpoint_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(checkpoint_path, checkpoint):
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+    # Write-then-rename so the checkpoint is never half-written
+
+
+def write_header(f, fmt, benchmark_keys, factor=False, bootstrap=False):
+    if (fmt == 'csv'):
+        extra = ['se_' + key for key in benchmark_keys] + ['se_alpha', 'r2'] if factor else []
+        if bootstrap:
+            extra = ['ci_%s_%s_%s' % (name, end, key) for name in ('beta', 'alpha') for end in ('low', 'high')
+                     for key in benchmark_keys]
+        csv.writer(f).writerow(['symbol', 'periods', 'error']
+                               + ['beta_' + key for key in benchmark_keys]
+                               + ['alpha_' + key for key in benchmark_keys] + extra)
+
+
+def write_row(f, fmt, benchmark_keys, symbol, periods, betas, alphas, error='', fit=None, factor=False,
+              ci=None, bootstrap=False):
+    """
+    Write one result row as CSV or JSONL.
+
+    Parameters
+    ----------
+    f :
+        The open output file
+    fmt :
+        'csv' or 'jsonl'
+    benchmark_keys :
+        <list> of benchmark names, in the same order as betas/alphas
+    symbol :
+        The ticker for this row
+    periods :
+        <int> Number of aligned return periods used
+    betas, alphas :
+        Length M arrays of results, or None if the symbol failed
+    error :
+        <str> Reason the symbol failed
+    fit :
+        <dict> with 'se', 'alpha_se' and 'r2' for this symbol in multi-factor
+        mode (betas are then the loadings, alphas the intercept repeated)
+    factor :
+        True if the file has the multi-factor columns
+    ci :
+        <dict> with 'beta_low', 'beta_high', 'alpha_low', 'alpha_high'
+        (length M arrays) for this symbol in bootstrap mode
+    bootstrap :
+        True if the file has the confidence interval columns
+
+    Returned Variables [nil]
+    ------------------------
+
+    """
+
+    if (fmt == 'csv'):
+        if (betas is None):
+            values = [''] * ((3*len(benchmark_keys) + 2) if factor else
+                             (6*len(benchmark_keys)) if bootstrap else (2*len(benchmark_keys)))
+        else:
+            values = ["%.6f" % v for v in betas] + ["%.6f" % v for v in alphas]
+            if factor:
+                values += ["%.6f" % v for v in fit['se']] + ["%.6f" % fit['alpha_se'], "%.6f" % fit['r2']]
+            if bootstrap:
+                values += ["%.6f" % v for key in ('beta_low', 'beta_high', 'alpha_low', 'alpha_high')
+                           for v in ci[key]]
+        csv.writer(f).writerow([symbol, periods, error] + values)
+    else:
+        result = {'symbol': symbol, 'periods': periods}
+        if (betas is None):
+            result['error'] = error
+        else:
+            result['beta'] = dict(zip(benchmark_keys, betas.tolist()))
+            result['alpha'] = dict(zip(benchmark_keys, alphas.tolist()))
+            if factor:
+                result['se'] = dict(zip(benchmark_keys, fit['se'].tolist()))
+                result['se_alpha'] = float(fit['alpha_se'])
+                result['r2'] = float(fit['r2'])
+            if bootstrap:
+                result['beta_ci'] = {k: [float(lo), float(hi)] for k, lo, hi
+                                     in zip(benchmark_keys, ci['beta_low'], ci['beta_high'])}
+                result['alpha_ci'] = {k: [float(lo), float(hi)] for k, lo, hi
+                                      in zip(benchmark_keys, ci['alpha_low'], ci['alpha_high'])}
+        f.write(json.dumps(result) + '\n')
+
+
+def alpha_betas(tickers, histories, bench_list, bench_panel, stats, processes):
+    """
+    Betas and alphas for a chunk of tickers. Tickers that trade on every
+    benchmark date go through sc_parallel.parallel_alpha_beta() together
+    (spread over a process pool when the chunk is big enough); the rest are
+    aligned one by one with sc_analysis.analyze_symbol().
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        Maps each ticker to (betas, alphas, periods), with None for the
+        betas and alphas if it has too little data.
+    """
+
+    import sc_parallel
+
+    results = {}
+    batched = []
+    for ticker in tickers:
+        closes = scpn.align_to_dates(histories[ticker], bench_panel['dates'])
+        if (len(closes) >= 3 and not np.isnan(closes).any()):
+            batched.append((ticker, closes))
+        else:
+            results[ticker] = sca.analyze_symbol(histories[ticker], bench_list, stats['years'], stats['rfr'])
+
+    if batched:
+        closes = np.vstack([c for _, c in batched])
+        betas, alphas = sc_parallel.parallel_alpha_beta(closes[:, 1:]/closes[:, :-1] - 1,
+                                                        closes[:, -1]/closes[:, 0] - 1, stats, processes)
+        for i, (ticker, _) in enumerate(batched):
+            results[ticker] = (betas[i], alphas[i], closes.shape[1] - 1)
+
+    return results
+
+
+def factor_fits(tickers, histories, bench_list, bench_panel, model, years, rfr):
+    """
+    Multi-factor regressions for a chunk of tickers. Tickers that trade on
+    every benchmark date are regressed together in one batched solve against
+    the shared factorization; the rest are aligned and solved one by one.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        Maps each ticker to (fit, periods), where fit is the ticker's row of
+        sc_analysis.factor_regression() or None if it has too little data.
+    """
+
+    fits = {}
+    batched = []
+    for ticker in tickers:
+        closes = scpn.align_to_dates(histories[ticker], bench_panel['dates'])
+        if not np.isnan(closes).any():
+            batched.append((ticker, closes))
+            continue
+        try:
+            fits[ticker] = sca.regress_symbol(histories[ticker], bench_list, years, rfr)
+        except ValueError:
+            fits[ticker] = (None, 0)
+
+    if batched:
+        closes = np.vstack([c for _, c in batched])
+        fit = sca.factor_regression(closes[:, 1:]/closes[:, :-1] - 1, model)
+        for i, (ticker, _) in enumerate(batched):
+            fits[ticker] = ({key: (val[i] if isinstance(val, np.ndarray) else val) for key, val in fit.items()},
+                            fit['periods'])
+
+    return fits
+
+
+def bootstrap_cis(tickers, histories, bench_list, bench_panel, years, rfr, n_resamples, processes=None):
+    """
+    Bootstrap confidence intervals for a chunk of tickers. Tickers that trade
+    on every benchmark date are resampled together in one call (split by
+    symbol over a process pool when it is big enough, see sc_parallel); the
+    rest one by one.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        Maps each ticker to its row of sc_bootstrap.bootstrap_alpha_beta(),
+        or None if it has too little data.
+    """
+
+    import sc_bootstrap
+    import sc_parallel
+
+    cis = {}
+    batched = []
+    for ticker in tickers:
+        closes = scpn.align_to_dates(histories[ticker], bench_panel['dates'])
+        if not np.isnan(closes).any():
+            batched.append((ticker, closes))
+        else:
+            cis[ticker] = sc_bootstrap.bootstrap_symbol(histories[ticker], bench_list, years, rfr,
+                                                        n_resamples=n_resamples)
+
+    if batched:
+        closes = np.vstack([c for _, c in batched])
+        boot = sc_parallel.parallel_bootstrap(closes[:, 1:]/closes[:, :-1] - 1,
+                                              scpn.panel_returns(bench_panel)[0], years, rfr,
+                                              n_resamples=n_resamples, processes=processes)
+        for i, (ticker, _) in enumerate(batched):
+            cis[ticker] = {key: (val[i] if isinstance(val, np.ndarray) else val) for key, val in boot.items()}
+
+    return cis
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch alpha/beta screening of a universe of tickers.')
+    parser.add_argument('universe', help='text file with one ticker per line')
+    parser.add_argument('--benchmarks', type=int, default=1,
+                        help='benchmark set id as in sc_benchmarks.select_benchmark (default: 1)')
+    parser.add_argument('--output', required=True, help='output path, .csv or .jsonl')
+    parser.add_argument('--checkpoint', help='checkpoint path (default: <output>.ckpt)')
+    parser.add_argument('--chunk', type=int, default=32, help='tickers fetched per round (default: 32)')
+    parser.add_argument('--restart', action='store_true', help='ignore any checkpoint and start over')
+    parser.add_argument('--charts', metavar='DIR', help='also render a chart per ticker into DIR')
+    parser.add_argument('--chart-format', default='png', choices=['png', 'svg'], help='chart file format (default: png)')
+    parser.add_argument('--factor', action='store_true',
+                        help='regress on all benchmarks jointly (multi-factor) instead of one at a time')
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                        help='add 95%% block-bootstrap confidence intervals from N resamples (eg. 2000)')
+    parser.add_argument('--processes', type=int, metavar='N',
+                        help='worker processes for the statistics (default: one per CPU for large chunks)')
+    parser.add_argument('--profile', action='store_true', help='print a timing/counter summary at the end')
+    parser.add_argument('--metrics-out', metavar='PATH',
+                        help='write the timings/counters to PATH (.prom/.txt for Prometheus text, otherwise JSON)')
+    args = parser.parse_args(argv)
+    if (args.bootstrap and args.factor):
+        parser.error("--bootstrap can't be combined with --factor, which reports standard errors already")
+    scm.enable(args.profile or args.metrics_out is not None)
+
+    settings = scs.get_settings()
+    years_of_data = sca.calculate_data_duration(settings['start_date'])
+
+    fmt = 'jsonl' if args.output.lower().endswith(('.jsonl', '.json')) else 'csv'
+    checkpoint_path = args.checkpoint or args.output + '.ckpt'
+
+    benchmark_dict = scb.select_benchmark(args.benchmarks)
+    benchmark_histories = scr.get_histories(benchmark_dict.values(), settings['interval'], settings['start_date'])
+    # The benchmarks are fetched once for the whole run
+
+    benchmark_keys = []
+    for key in benchmark_dict:
+        if (benchmark_histories[benchmark_dict[key]] == -1):
+            print("Error Retrieving Benchmark Data. Ignoring data for: " + key)
+            continue
+        benchmark_keys.append(key)
+
+    if not benchmark_keys:
+        print("No benchmark data could be retrieved. Terminating program.")
+        return 1
+
+    bench_list = [scpn.to_series(benchmark_histories[benchmark_dict[key]]) for key in benchmark_keys]
+    # Convert once up front, every ticker is joined against these
+
+    bench_panel = scpn.build_panel(dict(enumerate(bench_list)))
+    stats = sca.benchmark_stats(*scpn.panel_returns(bench_panel),
+                                sca.aligned_duration(bench_panel['dates'], years_of_data), settings['rfr'])
+    # The benchmark side of every ticker that trades on all of the benchmark dates. Tickers
+    # with a shorter history go through analyze_symbol, which annualizes over their own span.
+    if args.factor:
+        try:
+            model = sca.factor_model(scpn.panel_returns(bench_panel)[0], stats['years'], settings['rfr'])
+        except ValueError as e:
+            print("Multi-factor regression failed: " + str(e))
+            return 1
+        # Factor the benchmark matrix once. Every ticker that trades on all of the benchmark
+        # dates is regressed against it in one batched solve per chunk.
+
+    checkpoint = None if args.restart else load_checkpoint(checkpoint_path)
+    run_id = {'universe': os.path.abspath(args.universe), 'benchmarks': benchmark_keys,
+              'interval': settings['interval'], 'start_date': settings['start_date'], 'factor': args.factor,
+              'bootstrap': args.bootstrap}
+
+    if (checkpoint is not None and checkpoint['run'] != run_id):
+        print("Checkpoint is for a different run. Use --restart to overwrite it.")
+        return 1
+
+    if (checkpoint is not None and os.path.exists(args.output)):
+        f = open(args.output, 'r+', newline='', encoding='utf-8')
+        f.truncate(checkpoint['offset'])
+        f.seek(checkpoint['offset'])
+        # Drop any rows written after the last checkpoint, they get redone
+        next_line = checkpoint['line']
+        print("Resuming from line %d of %s" % (next_line, args.universe))
+    else:
+        f = open(args.output, 'w', newline='', encoding='utf-8')
+        next_line = 0
+
+    with f:
+        if (next_line == 0):
+            write_header(f, fmt, benchmark_keys, args.factor, args.bootstrap > 0)
+
+        def flush(chunk):
+            with scm.timer('stage', stage='fetch'):
+                histories = scr.get_histories([ticker for _, ticker in chunk],
+                                              settings['interval'], settings['start_date'])
+            if args.bootstrap:
+                with scm.timer('stage', stage='bootstrap'):
+                    cis = bootstrap_cis([ticker for _, ticker in chunk if histories[ticker] != -1], histories,
+                                        bench_list, bench_panel, stats['years'], settings['rfr'], args.bootstrap,
+                                        args.processes)
+
+            if args.factor:
+                with scm.timer('stage', stage='analyze'):
+                    fits = factor_fits([ticker for _, ticker in chunk if histories[ticker] != -1], histories,
+                                       bench_list, bench_panel, model, years_of_data, settings['rfr'])
+            else:
+                with scm.timer('stage', stage='analyze'):
+                    analyzed = alpha_betas([ticker for _, ticker in chunk if histories[ticker] != -1], histories,
+                                           bench_list, bench_panel, stats, args.processes)
+
+            for line_number, ticker in chunk:
+                if (histories[ticker] == -1):
+                    write_row(f, fmt, benchmark_keys, ticker, 0, None, None, 'download failed', factor=args.factor,
+                              bootstrap=args.bootstrap > 0)
+                    scm.increment('symbols', result='download_failed')
+                    continue
+
+                if args.factor:
+                    fit, periods = fits[ticker]
+                    scm.increment('symbols', result='ok' if fit is not None else 'too_short')
+                    if (fit is None):
+                        write_row(f, fmt, benchmark_keys, ticker, periods, None, None,
+                                  'not enough overlapping data', factor=True)
+                    else:
+                        write_row(f, fmt, benchmark_keys, ticker, periods, fit['coef'],
+                                  np.full(len(benchmark_keys), fit['alpha']), fit=fit, factor=True)
+                    continue
+
+                betas, alphas, periods = analyzed[ticker]
+                scm.increment('symbols', result='ok' if betas is not None else 'too_short')
+                if (betas is None):
+                    write_row(f, fmt, benchmark_keys, ticker, periods, None, None, 'not enough overlapping data',
+                              bootstrap=args.bootstrap > 0)
+                else:
+                    write_row(f, fmt, benchmark_keys, ticker, periods, betas, alphas,
+                              ci=cis.get(ticker) if args.bootstrap else None, bootstrap=args.bootstrap > 0)
+
+            f.flush()
+            save_checkpoint(checkpoint_path, {'run': run_id,
+                                              'line': chunk[-1][0] + 1,
+                                              'offset': f.tell()})
+            print("Completed through line %d (%s)" % (chunk[-1][0] + 1, chunk[-1][1]))
+
+        chunk = []
+        for line_number, ticker in read_universe(args.universe):
+            if (line_number < next_line):
+                continue
+            chunk.append((line_number, ticker))
+            if (len(chunk) >= args.chunk):
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    # The run finished, a later run should start from scratch
+    print("Results written to " + args.output)
+
+    if args.charts:
+        import sc_render
+        with scm.timer('stage', stage='render'):
+            paths = sc_render.render_results(args.output, args.charts, args.chart_format)
+        print("%d charts written to %s" % (len([p for p in paths if p]), args.charts))
+
+    if args.profile:
+        scm.print_summary()
+    if args.metrics_out:
+        scm.write(args.metrics_out)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,168 +5,555 @@ Generate a bar chart of correlations and risk-adjusted returns for a stock.
 
 run_corrleations.py forked from run_risk_asssessment.py
 Author: Teddy Rowan @ MySybil.com
-Last Modified: Sept 22, 2020
+Last Modified: October 18, 2026
 Description: The idea is to give me a much faster and easier way to look at correlations for a single
  stock. Previously had to edit my portfolio analysis software and then create a custom portfolio.
- 
+
+ With no arguments it prompts for the benchmarks and the symbol like it always has. The symbol
+ and benchmark set can also be passed on the command line, and --no-plot skips matplotlib
+ entirely (it is only imported when a chart is drawn) and prints the alpha/beta table instead.
+ --intervals downloads daily bars once, builds the weekly and monthly bars from them locally
+ (sc_resample.py) and prints the betas and alphas for every interval side by side.
+ --sweep takes a list of start dates, downloads once from the earliest and reports beta and
+ alpha for every lookback (sc_sweep.py), as a table or a heatmap.
+
+Usage:
+    python3 run_correlations.py [-s SYMBOL] [-b SET] [--no-plot] [--format table|csv|json]
+                                [--factor | --bootstrap N] [--intervals daily,weekly,monthly]
+                                [--sweep DATE [DATE ...]]
+                                [--profile] [--metrics-out metrics.json|metrics.prom]
+
 """
 
-import matplotlib.pyplot as plt; plt.rcdefaults()
-import matplotlib.patches as mpatches
-import numpy as np
-import requests
+import argparse
+import contextlib
+from datetime import datetime
+import json
+import sys
 
-import gradient_bar as gb
 import sc_analysis as sca
 import sc_benchmarks as scb
-import sc_plot_manager as scp
+import sc_metrics as scm
+import sc_panel as scpn
 import sc_request_manager as scr
+import sc_resample
 import sc_settings as scs
-
-settings = scs.get_settings()
-# Retrieve the compile time settings for the tool
-
-years_of_data = sca.calculate_data_duration(settings['start_date'])
-# Find out the time-length of the data so we can annualize numbers
-
-scb.print_benchmarks()
-# Print the benchmark choices and descriptions for the user
-
-# Prompt the user to select a benchmark and error catch to the default benchmark
-try:
-    benchmark_dict = scb.select_benchmark(int(input('Select a set of benchmarks: ')))
-except ValueError:
-    print("Invalid input. Using common benchmarks option.")
-    benchmark_dict = scb.select_benchmark(1)
-
-
-symbol = input("Select an underlying symbol to analyze: ").upper()
-# Prompt the user to choose a stock to analyze.
-
-benchmark_dict = {key:val for key, val in benchmark_dict.items() if val != symbol}
-# If the symbol is also being used as a benchmark, then remove the benchmark
-
-stock_history_data = scr.get_history(symbol, settings['interval'], settings['start_date'])
-# Retrieve and analyze the price history for the symbol data
-
-# Validate the downloaded data
-if (stock_history_data == -1):
-    print("Error downloading stock data. Terminating program.")
-    exit()
-    
-
-symbol_data, symbol_performance = sca.convert_to_percent_change(stock_history_data)
-# Traverse the stock data and calculate the daily percent changes and overall return
-
-sca.print_basic_return_facts(stock_history_data)
-# Display some basic details about the stock's performance
-
-
-# Retrieve and analyze the Benchmark Data
-benchmark_data = {}
-benchmark_performance = {}
-for key in benchmark_dict:
-    print("Retrieving Benchmark Data: " + key + " [" + benchmark_dict[key] + "]")
-    benchmark_response = scr.get_history(benchmark_dict[key], settings['interval'], settings['start_date'])
-    # Retrieve and analyze the price history for the benchmark
+import sc_sweep
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Correlations and risk-adjusted returns for a stock.')
+    parser.add_argument('-s', '--symbol', help='symbol to analyze (prompted for if omitted)')
+    parser.add_argument('-b', '--benchmarks', type=int,
+                        help='benchmark set id as in sc_benchmarks.select_benchmark (prompted for if omitted)')
+    parser.add_argument('--no-plot', action='store_true', help="compute only, don't import matplotlib or draw a chart")
+    parser.add_argument('--format', default='table', choices=['table', 'csv', 'json'],
+                        help='output format for the alpha/beta results with --no-plot (default: table)')
+    parser.add_argument('--factor', action='store_true',
+                        help='regress on all benchmarks jointly (multi-factor) instead of one at a time')
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                        help='add 95%% block-bootstrap confidence intervals from N resamples (eg. 2000)')
+    parser.add_argument('--profile', action='store_true', help='print a timing/counter summary to stderr at the end')
+    parser.add_argument('--metrics-out', metavar='PATH',
+                        help='write the timings/counters to PATH (.prom/.txt for Prometheus text, otherwise JSON)')
+    parser.add_argument('--intervals', type=lambda text: [iv.strip() for iv in text.split(',') if iv.strip()],
+                        metavar='LIST', help='comma-separated intervals to compare from one daily download, '
+                                             'eg. daily,weekly,monthly (default: the interval setting)')
+    parser.add_argument('--sweep', nargs='+', metavar='DATE',
+                        help='start dates (YYYY-MM-DD) to compare lookbacks for, from one download')
+    args = parser.parse_args(argv)
+    if (args.bootstrap and args.factor):
+        parser.error("--bootstrap can't be combined with --factor, which reports standard errors already")
+    if args.intervals is not None:
+        unknown = [iv for iv in args.intervals if iv not in sc_resample.intervals]
+        if (unknown or not args.intervals):
+            parser.error("--intervals takes a comma-separated list of: " + ', '.join(sc_resample.intervals))
+        if (args.bootstrap or args.factor):
+            parser.error("--intervals compares plain betas and alphas, it can't be combined with --factor or --bootstrap")
+    if args.sweep is not None:
+        try:
+            args.sweep = sorted(set(datetime.strptime(d, "%Y-%m-%d").strftime("%Y-%m-%d") for d in args.sweep))
+        except ValueError:
+            parser.error("--sweep takes start dates in YYYY-MM-DD format")
+        if (args.bootstrap or args.factor or args.intervals):
+            parser.error("--sweep can't be combined with --factor, --bootstrap or --intervals")
+    return args
+
+
+def choose_inputs(args):
+    """
+    Pick the benchmark set and the symbol, prompting for anything that
+    wasn't given on the command line.
+
+    Returned Variables [2]
+    ----------------------
+    <dict> :
+        The benchmark dictionary (name to ticker), minus the symbol itself.
+    <str> :
+        The symbol to analyze.
+    """
+
+    if (args.benchmarks is not None):
+        benchmark_dict = scb.select_benchmark(args.benchmarks)
+    else:
+        scb.print_benchmarks()
+        # Print the benchmark choices and descriptions for the user
+
+        # Prompt the user to select a benchmark and error catch to the default benchmark
+        try:
+            benchmark_dict = scb.select_benchmark(int(input('Select a set of benchmarks: ')))
+        except ValueError:
+            print("Invalid input. Using common benchmarks option.")
+            benchmark_dict = scb.select_benchmark(1)
+
+    symbol = args.symbol or input("Select an underlying symbol to analyze: ")
+    symbol = symbol.upper()
+    # Prompt the user to choose a stock to analyze.
+
+    benchmark_dict = {key:val for key, val in benchmark_dict.items() if val != symbol}
+    # If the symbol is also being used as a benchmark, then remove the benchmark
+
+    return benchmark_dict, symbol
+
+
+def compute_correlations(symbol, benchmark_dict, settings, factor=False, bootstrap=0, histories=None):
+    """
+    Download the data and calculate the beta and alpha of the symbol
+    against every benchmark.
+
+    Parameters
+    ----------
+    symbol :
+        The ticker to analyze
+    benchmark_dict :
+        <dict> of benchmark name to ticker
+    settings :
+        <dict> from sc_settings.get_settings()
+    factor :
+        Set True for a joint multi-factor regression on all of the
+        benchmarks. 'beta' is then the factor loadings and every 'alpha'
+        is the one regression intercept.
+    bootstrap :
+        Number of block-bootstrap resamples for confidence intervals. 0 for none.
+    histories :
+        Already downloaded histories (ticker to history or -1), eg. from
+        sc_resample. Downloaded here if omitted.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> or None :
+        None if the symbol couldn't be downloaded. Otherwise a dictionary
+        with keys: 'symbol', 'beta', 'alpha' (dicts of benchmark name to
+        value), 'tickers' (benchmark name to ticker), 'panel', 'returns' and
+        'performance' (the aligned data the results came from). With
+        factor=True it also has 'factor': {'se' (benchmark name to standard
+        error), 'alpha', 'alpha_se', 'r2'}. With bootstrap it also has
+        'ci': {'beta', 'alpha' (benchmark name to (low, high)), 'level', 'n_resamples'}.
+    """
+
+    years_of_data = sca.calculate_data_duration(settings['start_date'])
+    # Find out the time-length of the data so we can annualize numbers
+
+    if histories is None:
+        with scm.timer('stage', stage='fetch'):
+            histories = scr.get_histories([symbol] + list(benchmark_dict.values()), settings['interval'], settings['start_date'])
+    # Retrieve the price history for the symbol and every benchmark concurrently
+
+    stock_history_data = histories[symbol]
+    # Retrieve and analyze the price history for the symbol data
 
     # Validate the downloaded data
-    if (benchmark_response == -1):
-        print("Error Retrieving Benchmark Data. Ignoring data for: " + key)
-        continue
-    
-    benchmark_data[key], benchmark_performance[key] = sca.convert_to_percent_change(benchmark_response)
-    # Convert the daily close data to percent change data
-
-
-alpha_values = {}
-beta_values = {}
-# Dictionaries to store the CAPM results
-
-annu_port = pow((1+symbol_performance), 1/years_of_data)-1
-# Calculate the annualized portfolio return
-
-# Calcuate the correlations and risk-adjusted performance of the stock vs each benchmark    
-for benchmark_key in benchmark_data:
-    annu_market = pow((1+benchmark_performance[benchmark_key]), 1/years_of_data)-1
-    # Calculate the annualized return of the benchmark
-
-    result_mat = np.cov(np.stack((symbol_data, benchmark_data[benchmark_key]), axis = 0))
-    # Generate a covariance matrix between the symbol and the benchmark
-    
-    beta_values[benchmark_key] = result_mat[1][0]/result_mat[1][1]
-    # Calculate the beta from the covariance matrix
-    
-    alpha_values[benchmark_key] = (pow((1+symbol_performance), 1/years_of_data)-1) - settings['rfr'] - beta_values[benchmark_key]*(annu_market - settings['rfr'])
-    # Calculate the alpha from the performance and beta result
-    
-
-sorted_correlations = dict(sorted(beta_values.items(), key = lambda kv:(kv[1], kv[0]), reverse=True))
-# Sort the betas so that we can plot the benchmarks in order of correlation
-
-benchmark_ticks = sorted_correlations.keys()
-# Create a list of the tick values in plot-order
-
-x_positions = np.arange(len(benchmark_ticks))
-# Array of 0 to N-1 as positions for plotting the columns
-
-sorted_betas_list = sorted_correlations.values()
-# Extract the beta values for the chart
-
-# Take the sort order from the betas and sort the alphas to match
-sorted_alphas_list = []
-for key in sorted_correlations:
-    sorted_alphas_list.append(alpha_values[key])
-
-
-"""
-==========================================
- Everything below this is plotting stuff.
-==========================================
-"""
-
-extrema = sca.get_component_extrema(sorted_alphas_list, sorted_betas_list)
-# Determine the (zero-constrained) extrema we will need to know
-
-colors = sca.get_alpha_colors(sorted_alphas_list, extrema)
-# Assign a color to each column to be plotted
-
-plt, fig, ax1 = scp.set_defaults(plt)
-# Default plot design / settings
-
-print(type(plt))
-print(type(fig))
-print(type(ax1))
-
-bar_w = 0.5
-# Column width for barchart
-
-kwargs = dict(width=bar_w-0.1, align='center', alpha=1, zorder=3)
-# Shared plot settings between alpha/beta columns
-
-br  = plt.bar(x_positions-bar_w/2+0.03, sorted_betas_list, **kwargs, color=[0, 0.75, 1.0])
-# Plot the beta columns
-
-br2 = plt.bar(x_positions+bar_w/2-0.03, sorted_alphas_list, **kwargs, color=colors)
-# Plot the alpha columns
-
-gb.overlay_bar(br, ax1, 5, True)
-# Overlay a blue-gradient onto the beta columns
-
-gb.overlay_bar(br2, ax1, 5, False)
-# Overlay custom red/green gradients on the alpha columns
-
-scp.reorient_plot(ax1, len(sorted_betas_list), extrema['min'], extrema['max'])
-# After generating gradients the plot window gets screwed up badly
-
-title_str = 'Benchmark Correlations for ' + symbol
-scp.customize_plot(title_str, x_positions, benchmark_ticks)
-# Override the x-ticklabels with benchmark names. Add a title to the figure.
-
-v_offset = 0.020*(extrema['max']-extrema['min'])
-# Vertical offset for the labels above/below the columns
-
-scp.create_labels(v_offset, ax1, sorted_betas_list, sorted_alphas_list)
-# Create the labels above/below the columns
-    
-plt.show()    
+    if (stock_history_data == -1):
+        print("Error downloading stock data. Terminating program.")
+        return None
+
+    sca.print_basic_return_facts(stock_history_data)
+    # Display some basic details about the stock's performance
+
+    # Validate the Benchmark Data
+    valid_histories = {symbol: stock_history_data}
+    benchmark_keys = []
+    for key in benchmark_dict:
+        print("Analyzing Benchmark Data: " + key + " [" + benchmark_dict[key] + "]")
+        benchmark_response = histories[benchmark_dict[key]]
+
+        # Validate the downloaded data
+        if (benchmark_response == -1):
+            print("Error Retrieving Benchmark Data. Ignoring data for: " + key)
+            continue
+
+        valid_histories[benchmark_dict[key]] = benchmark_response
+        benchmark_keys.append(key)
+
+    with scm.timer('stage', stage='panel'):
+        panel = scpn.build_panel(valid_histories)
+        # Join the symbol and benchmark histories on date so every return lines up
+
+        returns, performance = scpn.panel_returns(panel)
+        # Convert the aligned close data to percent change data
+
+    years_of_data = sca.aligned_duration(panel['dates'], years_of_data)
+    # A symbol that listed after the start date only has returns over its own span
+
+    benchmark_rows = [scpn.row(panel, benchmark_dict[key]) for key in benchmark_keys]
+    # Panel rows for each benchmark, in benchmark_keys order
+
+    result = {}
+    result['symbol'] = symbol
+
+    with scm.timer('stage', stage='alpha_beta'):
+        if factor:
+            try:
+                model = sca.factor_model(returns[benchmark_rows], years_of_data, settings['rfr'])
+            except ValueError as e:
+                print("Multi-factor regression failed: " + str(e))
+                return None
+            fit = sca.factor_regression(returns[0], model)
+            # Regress the stock on every benchmark jointly
+
+            result['beta'] = dict(zip(benchmark_keys, fit['coef'][0].tolist()))
+            result['alpha'] = {key: float(fit['alpha'][0]) for key in benchmark_keys}
+            result['factor'] = {'se': dict(zip(benchmark_keys, fit['se'][0].tolist())),
+                                'alpha': float(fit['alpha'][0]),
+                                'alpha_se': float(fit['alpha_se'][0]),
+                                'r2': float(fit['r2'][0])}
+        else:
+            stats = sca.benchmark_stats(returns[benchmark_rows], performance[benchmark_rows],
+                                        years_of_data, settings['rfr'])
+            # Benchmark variances and annualized returns, computed once
+
+            betas, alphas = sca.alpha_beta_matrix(returns[0], performance[0], stats)
+            # Calculate the correlations and risk-adjusted performance of the stock vs every benchmark at once
+
+            result['beta'] = dict(zip(benchmark_keys, betas[0].tolist()))
+            result['alpha'] = dict(zip(benchmark_keys, alphas[0].tolist()))
+
+    if (bootstrap > 0 and not factor):
+        import sc_bootstrap
+        with scm.timer('stage', stage='bootstrap'):
+            boot = sc_bootstrap.bootstrap_alpha_beta(returns[0], returns[benchmark_rows], years_of_data,
+                                                     settings['rfr'], n_resamples=bootstrap)
+        # Resample the aligned returns to see how much the estimates move around
+
+        result['ci'] = {'beta': {key: (float(boot['beta_low'][0][i]), float(boot['beta_high'][0][i]))
+                                 for i, key in enumerate(benchmark_keys)},
+                        'alpha': {key: (float(boot['alpha_low'][0][i]), float(boot['alpha_high'][0][i]))
+                                  for i, key in enumerate(benchmark_keys)},
+                        'level': boot['ci'],
+                        'n_resamples': bootstrap}
+    result['tickers'] = {key: benchmark_dict[key] for key in benchmark_keys}
+    result['panel'] = panel
+    result['returns'] = returns
+    result['performance'] = performance
+    # Dictionaries to store the CAPM results and the data behind them
+
+    return result
+
+
+def compute_intervals(symbol, benchmark_dict, settings, intervals):
+    """
+    compute_correlations() for several intervals from one daily download.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> or None :
+        Interval to compute_correlations() result, in the order given, or
+        None if the symbol couldn't be downloaded.
+    """
+
+    with scm.timer('stage', stage='fetch'):
+        daily = scr.get_histories([symbol] + list(benchmark_dict.values()), 'daily', settings['start_date'])
+    # Weekly and monthly bars are built from the daily ones, no extra downloads
+
+    results = {}
+    for interval in intervals:
+        print("")
+        print("Interval: " + interval)
+        with scm.timer('stage', stage='resample'):
+            histories = sc_resample.resample_histories(daily, interval)
+        result = compute_correlations(symbol, benchmark_dict, dict(settings, interval=interval), histories=histories)
+        if result is None:
+            return None
+        results[interval] = result
+    return results
+
+
+def compute_sweep(symbol, benchmark_dict, settings, start_dates):
+    """
+    Beta and alpha for every start date in start_dates from one download
+    starting at the earliest of them.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> or None :
+        sc_sweep.sweep() results plus 'symbol', 'keys' (benchmark names in
+        column order) and 'tickers', or None if the symbol couldn't be
+        downloaded.
+    """
+
+    result = compute_correlations(symbol, benchmark_dict, dict(settings, start_date=start_dates[0]))
+    if result is None:
+        return None
+
+    panel, keys = result['panel'], list(result['tickers'])
+    rows = [scpn.row(panel, result['tickers'][key]) for key in keys]
+    with scm.timer('stage', stage='sweep'):
+        sweep = sc_sweep.sweep(panel['closes'][0], panel['closes'][rows], panel['dates'],
+                               start_dates, settings['rfr'])
+    # Every window is answered from running sums over the one aligned panel
+
+    sweep['symbol'] = symbol
+    sweep['keys'] = keys
+    sweep['tickers'] = result['tickers']
+    return sweep
+
+
+def print_sweep_results(sweep, fmt):
+    """ Print the compute_sweep() betas and alphas, one row per start date. """
+
+    keys = sweep['keys']
+    if (fmt == 'json'):
+        print(json.dumps({'symbol': sweep['symbol'],
+                          'windows': [{'start_date': d, 'first': first, 'clamped': clamped, 'periods': int(n),
+                                       'benchmarks': [{'name': k, 'ticker': sweep['tickers'][k],
+                                                       'beta': None if b != b else float(b),
+                                                       'alpha': None if a != a else float(a)}
+                                                      for k, b, a in zip(keys, betas, alphas)]}
+                                      for d, first, clamped, n, betas, alphas in zip(
+                                          sweep['start_dates'], sweep['first'], sweep['clamped'],
+                                          sweep['periods'], sweep['beta'], sweep['alpha'])]}))
+    elif (fmt == 'csv'):
+        print("start_date,first,periods,benchmark,ticker,beta,alpha")
+        for d, first, n, betas, alphas in zip(sweep['start_dates'], sweep['first'], sweep['periods'],
+                                              sweep['beta'], sweep['alpha']):
+            for k, b, a in zip(keys, betas, alphas):
+                print("%s,%s,%d,%s,%s,%.6f,%.6f" % (d, first or '', n, k, sweep['tickers'][k], b, a))
+    else:
+        labels = [d + ('*' if clamped else ' ') for d, clamped in zip(sweep['start_dates'], sweep['clamped'])]
+        print("")
+        print("Beta by Lookback for " + sweep['symbol'])
+        print("%-11s %7s" % ('Start', 'Periods') + ''.join(" %9s" % sweep['tickers'][k] for k in keys))
+        for d, n, betas in zip(labels, sweep['periods'], sweep['beta']):
+            print("%-11s %7d" % (d, n) + ''.join(" %9.2f" % b for b in betas))
+        print("")
+        print("Alpha /yr by Lookback for " + sweep['symbol'])
+        print("%-11s %7s" % ('Start', 'Periods') + ''.join(" %9s" % sweep['tickers'][k] for k in keys))
+        for d, n, alphas in zip(labels, sweep['periods'], sweep['alpha']):
+            print("%-11s %7d" % (d, n) + ''.join(" %8.1f%%" % (100*a) for a in alphas))
+        if any(sweep['clamped']):
+            print("* before the first shared bar, the window starts on " + sweep['first'][sweep['clamped'].index(True)])
+
+
+def plot_sweep_results(sweep):
+    """ Draw the compute_sweep() results as a heatmap. matplotlib is only imported here. """
+
+    with scm.timer('stage', stage='render'):
+        import matplotlib.pyplot as plt
+        import sc_plot_manager as scp
+
+        fig, ax = plt.subplots(figsize=(scp.figure_size[0], max(scp.figure_size[1], 0.45*len(sweep['start_dates']) + 1.5)))
+        scp.plot_sweep(ax, sweep['symbol'], sweep, sweep['keys'])
+        fig.tight_layout()
+
+    plt.show()
+
+
+def print_interval_results(results, fmt):
+    """
+    Print the betas and alphas from compute_intervals() side by side,
+    sorted by the first interval's beta.
+    """
+
+    intervals = list(results)
+    first = results[intervals[0]]
+    keys = sorted(first['beta'], key=lambda k: first['beta'][k], reverse=True)
+    keys = list(dict.fromkeys(keys + [k for r in results.values() for k in r['beta']]))
+    # A benchmark can drop out of one interval (too few bars), keep it listed for the others
+
+    if (fmt == 'json'):
+        print(json.dumps({'symbol': first['symbol'],
+                          'intervals': {iv: [{'name': k, 'ticker': r['tickers'][k], 'beta': r['beta'][k],
+                                              'alpha': r['alpha'][k]} for k in keys if k in r['beta']]
+                                        for iv, r in results.items()}}))
+    elif (fmt == 'csv'):
+        print("benchmark,ticker,interval,beta,alpha")
+        for k in keys:
+            for iv, r in results.items():
+                if k in r['beta']:
+                    print("%s,%s,%s,%.6f,%.6f" % (k, r['tickers'][k], iv, r['beta'][k], r['alpha'][k]))
+    else:
+        nan = float('nan')
+        tickers = {k: t for r in results.values() for k, t in r['tickers'].items()}
+        print("")
+        print("Benchmark Correlations for " + first['symbol'])
+        print("%-14s %-7s" % ('Benchmark', 'Ticker') + ''.join(" %9s" % ('Beta ' + iv[0].upper()) for iv in intervals)
+              + ''.join(" %10s" % ('Alpha ' + iv[0].upper()) for iv in intervals))
+        for k in keys:
+            print("%-14s %-7s" % (k.replace('\n', ' '), tickers[k])
+                  + ''.join(" %9.2f" % r['beta'].get(k, nan) for r in results.values())
+                  + ''.join(" %9.1f%%" % (100*r['alpha'].get(k, nan)) for r in results.values()))
+        print("(D/W/M: daily, weekly and monthly bars, alphas annualized)")
+
+
+def print_results(result, fmt):
+    """
+    Print the alpha/beta results, sorted by beta like the chart.
+
+    Parameters
+    ----------
+    result :
+        <dict> returned from compute_correlations()
+    fmt :
+        'table', 'csv', or 'json'
+
+    Returned Variables [nil]
+    ------------------------
+
+    """
+
+    keys = sorted(result['beta'], key=lambda k: result['beta'][k], reverse=True)
+
+    if 'factor' in result:
+        print_factor_results(result, keys, fmt)
+    elif (fmt == 'json'):
+        rows = [{'name': k, 'ticker': result['tickers'][k], 'beta': result['beta'][k], 'alpha': result['alpha'][k]}
+                for k in keys]
+        if 'ci' in result:
+            for row in rows:
+                row['beta_ci'] = result['ci']['beta'][row['name']]
+                row['alpha_ci'] = result['ci']['alpha'][row['name']]
+        print(json.dumps({'symbol': result['symbol'], 'benchmarks': rows}))
+    elif (fmt == 'csv'):
+        if 'ci' in result:
+            print("benchmark,ticker,beta,alpha,beta_low,beta_high,alpha_low,alpha_high")
+        else:
+            print("benchmark,ticker,beta,alpha")
+        for k in keys:
+            line = "%s,%s,%.6f,%.6f" % (k, result['tickers'][k], result['beta'][k], result['alpha'][k])
+            if 'ci' in result:
+                line += ",%.6f,%.6f,%.6f,%.6f" % (result['ci']['beta'][k] + result['ci']['alpha'][k])
+            print(line)
+    else:
+        print("")
+        print("Benchmark Correlations for " + result['symbol'])
+        if 'ci' in result:
+            level = "%d%% CI" % round(100*result['ci']['level'])
+            print("%-14s %-7s %8s %16s %10s %18s" % ('Benchmark', 'Ticker', 'Beta', level, 'Alpha /yr', level))
+            for k in keys:
+                beta_ci, alpha_ci = result['ci']['beta'][k], result['ci']['alpha'][k]
+                print("%-14s %-7s %8.2f %7.2f to %5.2f %9.1f%% %7.1f%% to %5.1f%%" % (
+                      k.replace('\n', ' '), result['tickers'][k], result['beta'][k], beta_ci[0], beta_ci[1],
+                      100*result['alpha'][k], 100*alpha_ci[0], 100*alpha_ci[1]))
+            print("(%d block-bootstrap resamples)" % result['ci']['n_resamples'])
+        else:
+            print("%-14s %-7s %8s %10s" % ('Benchmark', 'Ticker', 'Beta', 'Alpha /yr'))
+            for k in keys:
+                print("%-14s %-7s %8.2f %9.1f%%" % (k.replace('\n', ' '), result['tickers'][k],
+                                                    result['beta'][k], 100*result['alpha'][k]))
+
+
+def print_factor_results(result, keys, fmt):
+    """ print_results() for a multi-factor regression: loadings with standard errors, one alpha and R². """
+
+    fit = result['factor']
+    if (fmt == 'json'):
+        print(json.dumps({'symbol': result['symbol'], 'alpha': fit['alpha'], 'alpha_se': fit['alpha_se'],
+                          'r2': fit['r2'],
+                          'benchmarks': [{'name': k, 'ticker': result['tickers'][k],
+                                          'beta': result['beta'][k], 'se': fit['se'][k]}
+                                         for k in keys]}))
+    elif (fmt == 'csv'):
+        print("benchmark,ticker,beta,se")
+        for k in keys:
+            print("%s,%s,%.6f,%.6f" % (k, result['tickers'][k], result['beta'][k], fit['se'][k]))
+        print("alpha,,%.6f,%.6f" % (fit['alpha'], fit['alpha_se']))
+        print("r2,,%.6f," % fit['r2'])
+    else:
+        print("")
+        print("Multi-Factor Regression for " + result['symbol'])
+        print("%-14s %-7s %8s %8s %7s" % ('Benchmark', 'Ticker', 'Beta', 'Std Err', 't'))
+        for k in keys:
+            print("%-14s %-7s %8.2f %8.2f %7.2f" % (k.replace('\n', ' '), result['tickers'][k], result['beta'][k],
+                                                   fit['se'][k], result['beta'][k]/fit['se'][k]))
+        print("Alpha: %.1f%% /yr (std err %.1f%%)   R²: %.3f" % (100*fit['alpha'], 100*fit['alpha_se'], fit['r2']))
+
+
+def plot_results(result):
+    """
+    Draw the interactive bar chart. matplotlib is only imported here.
+    """
+
+    with scm.timer('stage', stage='render'):
+        import matplotlib.pyplot as plt
+        import sc_plot_manager as scp
+
+        plt, fig, ax1 = scp.set_defaults(plt)
+        # Default plot design / settings
+
+        ci = result.get('ci', {})
+        scp.plot_correlations(ax1, result['symbol'], result['beta'], result['alpha'],
+                              ci.get('beta'), ci.get('alpha'))
+        # Draw the beta/alpha columns, gradients, ticks and labels
+
+    plt.show()
+
+
+def report_metrics(args):
+    if args.profile:
+        scm.print_summary()
+    if args.metrics_out:
+        scm.write(args.metrics_out)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scm.enable(args.profile or args.metrics_out is not None)
+
+    settings = scs.get_settings()
+    # Retrieve the compile time settings for the tool
+
+    benchmark_dict, symbol = choose_inputs(args)
+
+    quiet = args.no_plot and args.format != 'table'
+    if args.intervals:
+        with contextlib.redirect_stdout(sys.stderr) if args.format != 'table' else contextlib.nullcontext():
+            results = compute_intervals(symbol, benchmark_dict, settings, args.intervals)
+        if results is not None:
+            print_interval_results(results, args.format)
+        # One chart can't hold every interval, so this mode always prints
+        report_metrics(args)
+        return 0 if results is not None else 1
+
+    if args.sweep:
+        with contextlib.redirect_stdout(sys.stderr) if quiet else contextlib.nullcontext():
+            sweep = compute_sweep(symbol, benchmark_dict, settings, args.sweep)
+        if sweep is not None:
+            if args.no_plot:
+                print_sweep_results(sweep, args.format)
+            else:
+                plot_sweep_results(sweep)
+        report_metrics(args)
+        return 0 if sweep is not None else 1
+
+    with contextlib.redirect_stdout(sys.stderr) if quiet else contextlib.nullcontext():
+        result = compute_correlations(symbol, benchmark_dict, settings, args.factor, args.bootstrap)
+    # Keep stdout clean for machine-readable output
+
+    if result is None:
+        report_metrics(args)
+        return 1
+
+    if args.no_plot:
+        print_results(result, args.format)
+    else:
+        if args.factor:
+            print_results(result, 'table')
+        # The chart has no room for the standard errors and R², print them too
+        plot_results(result)
+
+    report_metrics(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+=====================================================================
+Build, update and query the similarity index from the command line.
+=====================================================================
+
+run_index.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: thin command line wrapper around sc_index.py. 'build' downloads a reference
+ universe (one ticker per line in a text file), 'update' appends the bars that have come in
+ since, and 'query' lists the instruments a symbol tracks most closely. Several symbols can
+ be queried in one call; the index is only opened once.
+
+Usage:
+    python3 run_index.py build etfs.txt --index etfs.idx
+    python3 run_index.py update --index etfs.idx
+    python3 run_index.py query AAPL XOM --index etfs.idx [-k 10] [--by corr|beta]
+
+"""
+
+import argparse
+import sys
+import time
+
+import sc_index
+import sc_settings as scs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find the instruments a symbol tracks most closely.')
+    parser.add_argument('command', choices=['build', 'update', 'query'])
+    parser.add_argument('args', nargs='*', help='build: universe file, query: symbols')
+    parser.add_argument('--index', default='universe.idx', help='index file (default: universe.idx)')
+    parser.add_argument('-k', type=int, default=10, help='results per query (default: 10)')
+    parser.add_argument('--by', default='corr', choices=['corr', 'beta'], help='rank by correlation or beta (default: corr)')
+    parser.add_argument('--calendar', default='SPY', help='ticker whose bars define the dates (default: SPY)')
+    args = parser.parse_args(argv)
+
+    if (args.command == 'build'):
+        if (len(args.args) != 1):
+            parser.error("build takes one universe file")
+        with open(args.args[0]) as f:
+            symbols = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        settings = scs.get_settings()
+        failed = sc_index.build_index(args.index, symbols, settings['interval'], settings['start_date'], args.calendar)
+        print("Indexed %d of %d symbols" % (len(symbols) - len(failed), len(symbols)))
+        if failed:
+            print("No data for: " + ' '.join(failed))
+
+    elif (args.command == 'update'):
+        print("Added %d periods" % sc_index.update_index(args.index))
+
+    else:
+        if not args.args:
+            parser.error("query takes one or more symbols")
+        index = sc_index.load_index(args.index)
+        for symbol in args.args:
+            start = time.perf_counter()
+            try:
+                matches = sc_index.query(index, symbol, args.k, args.by)
+            except ValueError as e:
+                print(str(e))
+                continue
+            print("")
+            print("Closest matches for %s (%.1f ms)" % (symbol.upper(), (time.perf_counter() - start)*1000))
+            print("%-8s %7s %7s" % ('Ticker', 'Corr', 'Beta'))
+            for match in matches:
+                print("%-8s %7.3f %7.2f" % (match['symbol'], match['corr'], match['beta']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
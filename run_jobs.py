@@ -0,0 +1,266 @@
+"""
+=====================================================================
+Run many analyses from one job file, downloading each series once.
+=====================================================================
+
+run_jobs.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: reads a JSON job file listing analyses (symbols x benchmark set x interval x
+ start date). Before computing anything it works out the distinct (ticker, interval) series
+ that all of the jobs need, fetches each of them once from the earliest start date any job
+ asks for, and then hands every job its own slice of the shared data. Overlapping benchmark
+ sets and repeated symbols cost one network call each instead of one per job. Results are
+ written per job to <output-dir>/<job name>.json.
+
+Job file:
+    {
+      "defaults": {"interval": "weekly", "start_date": "2019-01-01", "benchmarks": 1},
+      "jobs": [
+        {"name": "tech", "symbols": ["AAPL", "MSFT"]},
+        {"name": "tech-global", "symbols": ["AAPL"], "benchmarks": 2, "factor": true},
+        {"name": "aapl-daily", "symbols": ["AAPL"], "interval": "daily", "start_date": "2021-01-01",
+         "bootstrap": 2000},
+        {"name": "custom", "symbols": ["XOM"], "benchmarks": {"Oil": "USO", "SP500": "SPY"}}
+      ]
+    }
+
+ Job keys: name, symbols, benchmarks (a set id as in sc_benchmarks.select_benchmark, or a
+ dict of name to ticker), interval, start_date, rfr, factor, bootstrap. Anything left out
+ comes from "defaults", then from sc_settings.
+
+Usage:
+    python3 run_jobs.py jobs.json [--output-dir job_results]
+
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+import sc_analysis as sca
+import sc_benchmarks as scb
+import sc_metrics as scm
+import sc_request_manager as scr
+import sc_series
+import sc_settings as scs
+
+job_keys = ('name', 'symbols', 'benchmarks', 'interval', 'start_date', 'rfr', 'factor', 'bootstrap')
+
+
+def load_jobs(path):
+    """
+    Read a job file and fill in the defaults.
+
+    Returned Variables [1]
+    ----------------------
+    <list> :
+        One dict per job with every key in job_keys, the symbols
+        upper-cased and 'benchmarks' resolved to a name -> ticker dict.
+    """
+
+    with open(path) as f:
+        spec = json.load(f)
+
+    settings = scs.get_settings()
+    defaults = {'interval': settings['interval'], 'start_date': settings['start_date'],
+                'rfr': settings['rfr'], 'benchmarks': 1, 'factor': False, 'bootstrap': 0}
+    defaults.update(spec.get('defaults', {}))
+
+    jobs = []
+    for i, entry in enumerate(spec['jobs']):
+        unknown = set(entry) - set(job_keys)
+        if unknown:
+            raise ValueError("Job %d has unknown keys: %s" % (i, ', '.join(sorted(unknown))))
+
+        job = dict(defaults)
+        job.update(entry)
+        job['name'] = str(job.get('name', 'job%d' % i))
+        job['symbols'] = list(dict.fromkeys(s.strip().upper() for s in job['symbols']))
+        if isinstance(job['benchmarks'], dict):
+            job['benchmarks'] = {name: ticker.upper() for name, ticker in job['benchmarks'].items()}
+        else:
+            job['benchmarks'] = scb.select_benchmark(int(job['benchmarks']))
+        jobs.append(job)
+
+    names = [job['name'] for job in jobs]
+    if (len(set(names)) != len(names)):
+        raise ValueError("Job names must be unique, they name the output files")
+    return jobs
+
+
+def plan_fetches(jobs):
+    """
+    Work out the distinct series the jobs need.
+
+    Parameters
+    ----------
+    jobs :
+        <list> from load_jobs()
+
+    Returned Variables [2]
+    ----------------------
+    <dict> :
+        Maps (ticker, interval) to the earliest start date any job needs.
+    <int> :
+        How many series the jobs ask for in total, counting repeats.
+    """
+
+    plan = {}
+    requested = 0
+    for job in jobs:
+        for ticker in job['symbols'] + list(job['benchmarks'].values()):
+            key = (ticker, job['interval'])
+            requested += 1
+            if (key not in plan or job['start_date'] < plan[key]):
+                plan[key] = job['start_date']
+            # One fetch from the earliest start covers every later start too
+    return plan, requested
+
+
+def fetch_plan(plan):
+    """
+    Download every series in the plan once.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        Maps (ticker, interval) to the columnar series, or -1 if it failed.
+    """
+
+    groups = {}
+    for (ticker, interval), start_date in plan.items():
+        groups.setdefault((interval, start_date), []).append(ticker)
+    # get_histories() takes one interval and start date per call
+
+    data = {}
+    for (interval, start_date), tickers in groups.items():
+        histories = scr.get_histories(tickers, interval, start_date)
+        for ticker in tickers:
+            data[(ticker, interval)] = histories[ticker]
+    return data
+
+
+def job_series(data, ticker, job):
+    """ The job's view of a shared series: sliced to its start date, or -1. """
+
+    series = data[(ticker, job['interval'])]
+    if (series == -1):
+        return -1
+    series = sc_series.slice_from(series, job['start_date'])
+    return -1 if sc_series.length(series) == 0 else series
+
+
+def run_job(job, data):
+    """
+    Compute one job's results from the shared data.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        {'job', 'interval', 'start_date', 'benchmarks' (name -> ticker, the
+        ones that downloaded), 'results': one dict per symbol}. Each result
+        has 'symbol' and 'periods', then either 'error' or 'benchmarks' (a
+        list of {'name', 'ticker', 'beta', 'alpha'}, plus 'se' with factor,
+        and 'beta_ci'/'alpha_ci' with bootstrap). Factor results also have
+        'alpha', 'alpha_se' and 'r2'.
+    """
+
+    years = sca.calculate_data_duration(job['start_date'])
+    bench = {name: ticker for name, ticker in job['benchmarks'].items() if job_series(data, ticker, job) != -1}
+    for name in job['benchmarks']:
+        if name not in bench:
+            print("[%s] Error Retrieving Benchmark Data. Ignoring data for: %s" % (job['name'], name))
+
+    results = []
+    for symbol in job['symbols']:
+        names = [name for name in bench if bench[name] != symbol]
+        # If the symbol is also being used as a benchmark, then remove the benchmark
+        history = job_series(data, symbol, job)
+        bench_series = [job_series(data, bench[name], job) for name in names]
+
+        row = {'symbol': symbol, 'periods': 0}
+        results.append(row)
+        if (history == -1):
+            row['error'] = 'download failed'
+            continue
+        if not names:
+            row['error'] = 'no benchmark data'
+            continue
+
+        if job['factor']:
+            try:
+                fit, row['periods'] = sca.regress_symbol(history, bench_series, years, job['rfr'])
+            except ValueError as e:
+                fit = None
+                row['error'] = str(e)
+            if fit is None:
+                row.setdefault('error', 'not enough overlapping data')
+                continue
+            row['alpha'], row['alpha_se'], row['r2'] = float(fit['alpha']), float(fit['alpha_se']), float(fit['r2'])
+            betas, alphas = fit['coef'], np.full(len(names), fit['alpha'])
+        else:
+            betas, alphas, row['periods'] = sca.analyze_symbol(history, bench_series, years, job['rfr'])
+            if betas is None:
+                row['error'] = 'not enough overlapping data'
+                continue
+
+        row['periods'] = int(row['periods'])
+        row['benchmarks'] = [{'name': name, 'ticker': bench[name], 'beta': float(b), 'alpha': float(a)}
+                             for name, b, a in zip(names, betas, alphas)]
+        if job['factor']:
+            for entry, se in zip(row['benchmarks'], fit['se']):
+                entry['se'] = float(se)
+
+        if (job['bootstrap'] and not job['factor']):
+            import sc_bootstrap
+            boot = sc_bootstrap.bootstrap_symbol(history, bench_series, years, job['rfr'],
+                                                 n_resamples=int(job['bootstrap']))
+            for i, entry in enumerate(row['benchmarks']):
+                entry['beta_ci'] = [float(boot['beta_low'][i]), float(boot['beta_high'][i])]
+                entry['alpha_ci'] = [float(boot['alpha_low'][i]), float(boot['alpha_high'][i])]
+
+    return {'job': job['name'], 'interval': job['interval'], 'start_date': job['start_date'],
+            'benchmarks': bench, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the analyses in a job file with one download per series.')
+    parser.add_argument('jobs', help='JSON job file')
+    parser.add_argument('--output-dir', default='job_results', help='directory for <job>.json results (default: job_results)')
+    parser.add_argument('--profile', action='store_true', help='print a timing/counter summary at the end')
+    args = parser.parse_args(argv)
+    scm.enable(args.profile)
+
+    try:
+        jobs = load_jobs(args.jobs)
+    except (OSError, ValueError, KeyError) as e:
+        print("Could not read job file: " + str(e))
+        return 1
+
+    plan, requested = plan_fetches(jobs)
+    print("%d jobs need %d series, %d distinct downloads" % (len(jobs), requested, len(plan)))
+
+    with scm.timer('stage', stage='fetch'):
+        data = fetch_plan(plan)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for job in jobs:
+        with scm.timer('stage', stage='analyze'):
+            output = run_job(job, data)
+        path = os.path.join(args.output_dir, job['name'] + '.json')
+        with open(path, 'w') as f:
+            json.dump(output, f, indent=2)
+        failed = len([r for r in output['results'] if 'error' in r])
+        print("[%s] %d symbols, %d failed -> %s" % (job['name'], len(output['results']), failed, path))
+
+    if args.profile:
+        scm.print_summary()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+===========================================================================
+Offline performance benchmarks for the fetch -> analyze -> render pipeline.
+===========================================================================
+
+run_perf.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: times the whole pipeline (not to be confused with sc_benchmarks.py, which is the
+ list of market benchmarks) against synthetic data served by sc_fake_tradier.py, so it needs
+ no network or API key. For each universe size it records wall time and peak Python memory
+ (tracemalloc, measured in a second run of the stage) of every stage and writes the results to JSON. Pass --compare with an older
+ results file to see the ratio for each stage.
+
+Stages:
+    startup     import time of run_correlations in a fresh interpreter
+    fetch       sc_request_manager.get_histories over HTTP, cache disabled
+    convert     sc_analysis.convert_to_percent_change on every history
+    panel       sc_panel.build_panel + panel_returns for the universe and benchmarks
+    alpha_beta  sc_analysis.benchmark_stats + alpha_beta_matrix for the universe
+    render      sc_render.render_charts for up to --render charts (memory is the parent only)
+    boot_pN     sc_parallel.parallel_bootstrap of the universe with N worker processes, for
+                each N in --processes (memory is the parent only). Compare the times to see
+                how the process pool scales.
+
+Usage:
+    python3 run_perf.py --sizes 10 100 1000 --output perf.json [--compare old_perf.json]
+                        [--processes 1 8 32 [--resamples 200]]
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import sc_analysis as sca
+import sc_benchmarks as scb
+import sc_fake_tradier as scf
+import sc_panel as scpn
+import sc_request_manager as scr
+import sc_startup
+
+
+def timed(results, n_symbols, stage, func, *args):
+    """
+    Run one stage twice: once untraced for its wall time, then again under
+    tracemalloc for its peak memory (tracing slows Python code down a lot,
+    so one run can't give both).
+
+    Returned Variables [1]
+    ----------------------
+    <any> :
+        Whatever func returned.
+    """
+
+    start = time.perf_counter()
+    output = func(*args)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    results.append({'n_symbols': n_symbols, 'stage': stage,
+                    'seconds': seconds, 'peak_mb': peak/1024/1024})
+    print("%7d  %-11s %9.3f s %9.1f MB" % (n_symbols, stage, seconds, peak/1024/1024))
+    return output
+
+
+def run_size(results, n_symbols, interval, start_date, n_render, render_dir, processes=(), n_resamples=200):
+    symbols = ['SYN%05d' % i for i in range(n_symbols)]
+    benchmark_dict = scb.benchmarks_common()
+    bench_tickers = list(benchmark_dict.values())
+
+    histories = timed(results, n_symbols, 'fetch', scr.get_histories,
+                      symbols + bench_tickers, interval, start_date, None, False)
+
+    failed = [s for s in histories if histories[s] == -1]
+    if failed:
+        print("%d histories failed to download, leaving them out" % len(failed))
+        symbols = [s for s in symbols if histories[s] != -1]
+
+    timed(results, n_symbols, 'convert',
+          lambda: [sca.convert_to_percent_change(histories[s]) for s in symbols])
+
+    def panel_stage():
+        panel = scpn.build_panel({s: histories[s] for s in bench_tickers + symbols})
+        return scpn.panel_returns(panel)
+    returns, performance = timed(results, n_symbols, 'panel', panel_stage)
+
+    years = sca.calculate_data_duration(start_date)
+    n_bench = len(bench_tickers)
+
+    def alpha_beta_stage():
+        stats = sca.benchmark_stats(returns[:n_bench], performance[:n_bench], years, 0.002)
+        return sca.alpha_beta_matrix(returns[n_bench:], performance[n_bench:], stats)
+    betas, alphas = timed(results, n_symbols, 'alpha_beta', alpha_beta_stage)
+
+    if processes:
+        import sc_parallel
+        for count in processes:
+            timed(results, n_symbols, 'boot_p%d' % count, sc_parallel.parallel_bootstrap,
+                  returns[n_bench:], returns[:n_bench], years, 0.002, n_resamples, None, 0.95, 0, count)
+
+    if (n_render > 0):
+        import sc_render
+        names = list(benchmark_dict.keys())
+        charts = [(s, dict(zip(names, betas[i].tolist())), dict(zip(names, alphas[i].tolist())))
+                  for i, s in enumerate(symbols[:n_render])]
+        timed(results, n_symbols, 'render', sc_render.render_charts, charts, render_dir)
+
+
+def git_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ''
+
+
+def compare(results, old_path):
+    with open(old_path) as f:
+        old = {(r['n_symbols'], r['stage']): r for r in json.load(f)['results']}
+
+    print("")
+    print("Compared to " + old_path + " (ratio new/old, >1 is slower)")
+    for r in results:
+        prev = old.get((r['n_symbols'], r['stage']))
+        if prev and prev['seconds'] > 0:
+            print("%7d  %-11s time x%5.2f   memory x%5.2f" % (r['n_symbols'], r['stage'],
+                  r['seconds']/prev['seconds'], r['peak_mb']/max(prev['peak_mb'], 1e-9)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline pipeline performance benchmarks.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='universe sizes')
+    parser.add_argument('--interval', default='weekly', choices=['daily', 'weekly', 'monthly'])
+    parser.add_argument('--start', default='2019-01-01', help='history start date')
+    parser.add_argument('--render', type=int, default=20, help='charts to render per size (0 to skip)')
+    parser.add_argument('--output', default='perf.json', help='results file')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--processes', type=int, nargs='+', default=[],
+                        help='also time the parallel bootstrap with each of these process counts')
+    parser.add_argument('--resamples', type=int, default=200, help='bootstrap resamples for --processes (default: 200)')
+    args = parser.parse_args(argv)
+
+    server, url = scf.start_server_process()
+    scr.root_url = url
+    # Point the client at the local fake API
+
+    results = []
+    startup = sc_startup.measure_import_time('run_correlations')
+    results.append({'n_symbols': 0, 'stage': 'startup', 'seconds': startup['import_us']/1e6, 'peak_mb': 0.0})
+    print("%7s  %-11s %11s %12s" % ('symbols', 'stage', 'time', 'peak mem'))
+    print("%7d  %-11s %9.3f s" % (0, 'startup', startup['import_us']/1e6))
+
+    with tempfile.TemporaryDirectory() as render_dir:
+        for n_symbols in args.sizes:
+            run_size(results, n_symbols, args.interval, args.start, args.render, render_dir,
+                     args.processes, args.resamples)
+
+    server.terminate()
+
+    report = {'version': git_version(),
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'python': platform.python_version(),
+              'numpy': np.__version__,
+              'interval': args.interval,
+              'start': args.start,
+              'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print("Results written to " + args.output)
+
+    if args.compare:
+        compare(results, args.compare)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
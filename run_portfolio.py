@@ -0,0 +1,160 @@
+"""
+=====================================================================
+Beta, alpha and contribution to beta for a whole portfolio.
+=====================================================================
+
+run_portfolio.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: loads a holdings file (hundreds of positions are fine), fetches every position
+ and the chosen benchmark set once, and reports the portfolio's beta and alpha against each
+ benchmark plus every position's beta and contribution to the portfolio beta (sc_portfolio.py).
+ --what-if takes more holdings files with rebalanced weights. Their symbols are fetched along
+ with the portfolio's, and every scenario is then evaluated from that one set of data.
+
+Holdings file (CSV with a header; 'weight' can be 'value' or 'shares' instead):
+    symbol,weight
+    AAPL,0.25
+    XOM,0.10
+    ...
+
+Usage:
+    python3 run_portfolio.py holdings.csv [-b 1] [--what-if rebalanced.csv ...] [--top 20]
+                             [--format table|csv|json]
+
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+
+import numpy as np
+
+import sc_analysis as sca
+import sc_benchmarks as scb
+import sc_metrics as scm
+import sc_portfolio
+import sc_request_manager as scr
+import sc_settings as scs
+
+
+def print_portfolio(model, result, name, fmt, top):
+    """
+    Print the portfolio results and the positions, largest absolute
+    contribution to the first benchmark's beta first.
+    """
+
+    keys, tickers = model['keys'], model['tickers']
+    order = np.argsort(-np.abs(result['contribution'][:, 0]), kind='stable')
+    order = order[result['weights'][order] != 0]
+    # Symbols only held in another what-if scenario are left out
+    if top:
+        order = order[:top]
+
+    if (fmt == 'json'):
+        print(json.dumps({'portfolio': name, 'performance': float(result['performance']),
+                          'benchmarks': [{'name': k, 'ticker': tickers[k], 'beta': float(b), 'alpha': float(a)}
+                                         for k, b, a in zip(keys, result['beta'], result['alpha'])],
+                          'positions': [{'symbol': model['symbols'][i], 'weight': float(result['weights'][i]),
+                                         'periods': int(model['periods'][i]),
+                                         'beta': dict(zip(keys, model['betas'][i].tolist())),
+                                         'alpha': dict(zip(keys, model['alphas'][i].tolist())),
+                                         'contribution': dict(zip(keys, result['contribution'][i].tolist()))}
+                                        for i in order]}))
+    elif (fmt == 'csv'):
+        print("portfolio,symbol,weight,periods,benchmark,ticker,beta,alpha,contribution")
+        for j, k in enumerate(keys):
+            print("%s,PORTFOLIO,1,%d,%s,%s,%.6f,%.6f,%.6f" % (name, model['returns'].shape[1], k, tickers[k],
+                                                             result['beta'][j], result['alpha'][j], result['beta'][j]))
+        for i in order:
+            for j, k in enumerate(keys):
+                print("%s,%s,%.6f,%d,%s,%s,%.6f,%.6f,%.6f" % (
+                      name, model['symbols'][i], result['weights'][i], model['periods'][i], k, tickers[k],
+                      model['betas'][i, j], model['alphas'][i, j], result['contribution'][i, j]))
+    else:
+        print("")
+        print("Portfolio: %s   (%d positions, %d periods, %.1f%% total return)" % (
+              name, np.count_nonzero(result['weights']), model['returns'].shape[1], 100*result['performance']))
+        print("%-14s %-7s %8s %10s" % ('Benchmark', 'Ticker', 'Beta', 'Alpha /yr'))
+        for k, b, a in zip(keys, result['beta'], result['alpha']):
+            print("%-14s %-7s %8.2f %9.1f%%" % (k.replace('\n', ' '), tickers[k], b, 100*a))
+
+        print("")
+        print("Positions: beta (contribution to portfolio beta)" + (", top %d" % top if top else ""))
+        print("%-8s %7s" % ('Symbol', 'Weight') + ''.join(" %15s" % tickers[k] for k in keys))
+        for i in order:
+            print("%-8s %6.1f%%" % (model['symbols'][i], 100*result['weights'][i])
+                  + ''.join(" %6.2f (%6.3f)" % (model['betas'][i, j], result['contribution'][i, j])
+                            for j in range(len(keys))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Portfolio and per-position beta, alpha and contribution to beta.')
+    parser.add_argument('holdings', help="CSV with 'symbol' and 'weight' (or 'value' or 'shares') columns")
+    parser.add_argument('-b', '--benchmarks', type=int, default=1, help='benchmark set id (default: 1)')
+    parser.add_argument('--what-if', nargs='+', default=[], metavar='FILE',
+                        help='holdings files with rebalanced weights, evaluated from the same data')
+    parser.add_argument('--top', type=int, default=0, help='only list the N largest contributors (default: all)')
+    parser.add_argument('--format', default='table', choices=['table', 'csv', 'json'], help='output format (default: table)')
+    parser.add_argument('--profile', action='store_true', help='print a timing/counter summary to stderr at the end')
+    args = parser.parse_args(argv)
+    scm.enable(args.profile)
+
+    try:
+        holdings, kind = sc_portfolio.load_holdings(args.holdings)
+        what_ifs = [(path,) + sc_portfolio.load_holdings(path) for path in args.what_if]
+    except (OSError, ValueError) as e:
+        print("Could not read holdings: " + str(e))
+        return 1
+
+    settings = scs.get_settings()
+    benchmark_dict = scb.select_benchmark(args.benchmarks)
+    symbols = list(dict.fromkeys(list(holdings) + [s for _, h, _ in what_ifs for s in h]))
+    # What-if files may add symbols at zero weight in the base portfolio; fetch everything once
+
+    quiet = args.format != 'table'
+    with contextlib.redirect_stdout(sys.stderr) if quiet else contextlib.nullcontext():
+        with scm.timer('stage', stage='fetch'):
+            histories = scr.get_histories(symbols + list(benchmark_dict.values()), settings['interval'],
+                                          settings['start_date'])
+
+        tickers = {key: ticker for key, ticker in benchmark_dict.items() if histories[ticker] != -1}
+        for key in benchmark_dict:
+            if key not in tickers:
+                print("Error Retrieving Benchmark Data. Ignoring data for: " + key)
+        if not tickers:
+            print("No benchmark data. Terminating program.")
+            return 1
+
+        try:
+            with scm.timer('stage', stage='alpha_beta'):
+                model = sc_portfolio.build_model(histories, symbols, tickers,
+                                                 sca.calculate_data_duration(settings['start_date']), settings['rfr'])
+        except ValueError as e:
+            print(str(e))
+            return 1
+        model['tickers'] = tickers
+        if model['missing']:
+            print("No data for (left out): " + ' '.join(model['missing']))
+
+    exit_code = 0
+    for name, amounts, amount_kind in [(args.holdings, holdings, kind)] + what_ifs:
+        amounts = {s: v for s, v in amounts.items() if s not in model['missing']}
+        try:
+            weights = sc_portfolio.weights_for(model, amounts, amount_kind)
+        except ValueError as e:
+            print("%s: %s" % (name, e))
+            exit_code = 1
+            continue
+        with scm.timer('stage', stage='evaluate'):
+            result = sc_portfolio.evaluate(model, weights)
+        print_portfolio(model, result, name, args.format, args.top)
+
+    if args.profile:
+        scm.print_summary()
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
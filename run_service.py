@@ -0,0 +1,326 @@
+"""
+=====================================================================
+Local HTTP/JSON service that answers alpha/beta queries from memory.
+=====================================================================
+
+run_service.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: long-running version of run_correlations.py for dashboards. Each benchmark set
+ is fetched once, date-aligned, and its variances and annualized returns are precomputed
+ (sc_analysis.benchmark_stats) and kept in memory; a background thread rebuilds them on a
+ schedule. A query then only needs the one symbol, which is itself kept in an in-memory LRU
+ cache for a while, so a repeat query touches neither the network nor the disk.
+
+ Refreshes go through sc_request_manager like everything else, so with the on-disk cache
+ enabled new bars show up once the cached copy is older than the 'cache_ttl' setting.
+
+Endpoints:
+    GET /alpha_beta?symbol=XYZ&set=2   beta/alpha of XYZ vs benchmark set 2 (default set 1)
+    GET /health                        loaded sets and cache size
+    GET /metrics                       request timings and counters, Prometheus text format
+
+Usage:
+    python3 run_service.py [--port 8080] [--sets 1 2] [--refresh 900] [--symbol-ttl 900]
+
+"""
+
+import argparse
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import sc_analysis as sca
+import sc_benchmarks as scb
+import sc_metrics as scm
+import sc_panel as scpn
+import sc_request_manager as scr
+import sc_settings as scs
+
+
+class SymbolCache:
+    """
+    Thread-safe in-memory LRU cache of columnar histories with a time limit.
+    Concurrent misses for the same symbol share one fetch.
+    """
+
+    def __init__(self, fetch, max_symbols=2000, ttl=900):
+        self.fetch = fetch
+        self.max_symbols = max_symbols
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # symbol -> (fetched time, series or -1)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol):
+        """
+        Returned Variables [2]
+        ----------------------
+        <dict> or int :
+            The columnar series, or -1 if the symbol couldn't be retrieved.
+        <bool> :
+            True if it was served from memory.
+        """
+
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if (entry is not None and time.time() - entry[0] < self.ttl):
+                self._entries.move_to_end(symbol)
+                return entry[1], True
+
+            event = self._inflight.get(symbol)
+            owner = event is None
+            if owner:
+                event = self._inflight[symbol] = threading.Event()
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(symbol)
+            return (entry[1] if entry is not None else -1), True
+        # Someone else is already fetching this symbol, wait for their result
+
+        try:
+            try:
+                series = self.fetch(symbol)
+            except (IOError, ValueError):
+                series = -1
+
+            with self._lock:
+                self._entries[symbol] = (time.time(), series)
+                self._entries.move_to_end(symbol)
+                while (len(self._entries) > self.max_symbols):
+                    self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                del self._inflight[symbol]
+            event.set()
+        # Any other error goes to this caller uncached, but the waiters are still released
+        # (they find no entry and get -1) and the next get() fetches again
+
+        return series, False
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class AnalysisService:
+    """
+    Warm benchmark sets plus the symbol cache. Each loaded set is a dict
+    with keys 'keys', 'tickers', 'dates', 'series', 'stats' and 'loaded'
+    and is replaced wholesale on refresh, so readers never see it half-built.
+    """
+
+    def __init__(self, settings, symbol_ttl=900, max_symbols=2000):
+        self.settings = settings
+        self.sets = {}
+        self._set_lock = threading.Lock()
+        self.symbols = SymbolCache(self._fetch, max_symbols, symbol_ttl)
+
+    def _fetch(self, symbol):
+        return scr.get_history(symbol, self.settings['interval'], self.settings['start_date'], as_arrays=True)
+
+    def build_set(self, set_id):
+        """
+        Fetch and precompute one benchmark set.
+
+        Returned Variables [1]
+        ----------------------
+        <dict> or None :
+            The benchmark state, or None if no benchmark could be retrieved.
+        """
+
+        benchmark_dict = scb.select_benchmark(set_id)
+        histories = scr.get_histories(benchmark_dict.values(), self.settings['interval'],
+                                      self.settings['start_date'], as_arrays=True)
+
+        keys = [key for key in benchmark_dict if histories[benchmark_dict[key]] != -1]
+        if not keys:
+            return None
+
+        panel = scpn.build_panel({key: histories[benchmark_dict[key]] for key in keys})
+        if (len(panel['dates']) < 3):
+            return None
+        returns, performance = scpn.panel_returns(panel)
+        years = sca.aligned_duration(panel['dates'], sca.calculate_data_duration(self.settings['start_date']))
+
+        state = {}
+        state['keys'] = keys
+        state['tickers'] = [benchmark_dict[key] for key in keys]
+        state['dates'] = panel['dates']
+        state['series'] = [histories[benchmark_dict[key]] for key in keys]
+        state['stats'] = sca.benchmark_stats(returns, performance, years, self.settings['rfr'])
+        state['loaded'] = time.time()
+        return state
+
+    def get_set(self, set_id):
+        state = self.sets.get(set_id)
+        if state is None:
+            with self._set_lock:
+                state = self.sets.get(set_id)
+                if state is None:
+                    state = self.build_set(set_id)
+                    if state is not None:
+                        self.sets[set_id] = state
+        return state
+
+    def refresh(self):
+        """ Rebuild every loaded benchmark set, keeping the old one if a rebuild fails. """
+        for set_id in list(self.sets):
+            state = self.build_set(set_id)
+            if state is not None:
+                self.sets[set_id] = state
+
+    def alpha_beta(self, symbol, set_id):
+        """
+        Beta and alpha of a symbol against a benchmark set.
+
+        Returned Variables [1]
+        ----------------------
+        <dict> :
+            A dictionary with keys 'symbol', 'set', 'periods', 'cached' and
+            'benchmarks' (a list of {'name', 'ticker', 'beta', 'alpha'}), or
+            with an 'error' key if the query can't be answered.
+        """
+
+        state = self.get_set(set_id)
+        if state is None:
+            return {'error': 'no benchmark data for set %d' % set_id}
+
+        keys, tickers = state['keys'], state['tickers']
+        if symbol in tickers:
+            keep = [i for i, t in enumerate(tickers) if t != symbol]
+            keys, tickers = [keys[i] for i in keep], [tickers[i] for i in keep]
+        # If the symbol is also being used as a benchmark, then remove the benchmark
+
+        series, cached = self.symbols.get(symbol)
+        if (series == -1):
+            return {'error': 'no data for ' + symbol}
+
+        closes = scpn.align_to_dates(series, state['dates'])
+        if (not np.isnan(closes).any() and len(keys) == len(state['keys'])):
+            returns = closes[1:]/closes[:-1] - 1
+            betas, alphas = sca.alpha_beta_matrix(returns, closes[-1]/closes[0] - 1, state['stats'])
+            betas, alphas, periods = betas[0], alphas[0], len(returns)
+            # The symbol trades on every benchmark date, so the precomputed benchmark stats apply as-is
+        else:
+            bench = [state['series'][state['keys'].index(key)] for key in keys]
+            betas, alphas, periods = sca.analyze_symbol(series, bench, state['stats']['years'],
+                                                        self.settings['rfr'])
+            if betas is None:
+                return {'error': 'not enough overlapping data for ' + symbol}
+            # Shorter history (or the symbol is a benchmark): align on the shared dates only
+
+        return {'symbol': symbol, 'set': set_id, 'periods': int(periods), 'cached': cached,
+                'benchmarks': [{'name': key, 'ticker': ticker, 'beta': float(b), 'alpha': float(a)}
+                               for key, ticker, b, a in zip(keys, tickers, betas, alphas)]}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    service = None
+    # Set by main()
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: val[0] for key, val in parse_qs(url.query).items()}
+
+        if (url.path == '/alpha_beta'):
+            symbol = query.get('symbol', '').strip().upper()
+            try:
+                set_id = int(query.get('set', 1))
+            except ValueError:
+                set_id = -1
+            if (not symbol or set_id not in (0, 1, 2, 3)):
+                self.send_json(400, {'error': 'usage: /alpha_beta?symbol=XYZ&set=0-3'})
+                return
+
+            start = time.perf_counter()
+            with scm.timer('service_request'):
+                result = self.service.alpha_beta(symbol, set_id)
+            scm.increment('service_queries', result='error' if 'error' in result else 'ok')
+            result['ms'] = round((time.perf_counter() - start)*1000, 3)
+            self.send_json(404 if 'error' in result else 200, result)
+
+        elif (url.path == '/health'):
+            self.send_json(200, {'sets': {str(k): {'benchmarks': len(v['keys']), 'periods': len(v['dates']) - 1,
+                                                   'loaded': v['loaded']}
+                                          for k, v in self.service.sets.copy().items()},
+                                 'symbols_cached': len(self.service.symbols)})
+
+        elif (url.path == '/metrics'):
+            payload = scm.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        else:
+            self.send_json(404, {'error': 'unknown endpoint'})
+
+    def log_message(self, *args):
+        pass
+        # Dashboards poll constantly, don't fill the terminal
+
+
+def refresh_loop(service, interval, stop):
+    while not stop.wait(interval):
+        try:
+            service.refresh()
+        except Exception as e:
+            print("Benchmark refresh failed: " + str(e))
+            # Keep serving the previous data, try again next time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve alpha/beta queries over HTTP from warm benchmark data.')
+    parser.add_argument('--host', default='127.0.0.1', help='interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='port to listen on (default: 8080)')
+    parser.add_argument('--sets', type=int, nargs='*', default=[1], help='benchmark sets to load up front (default: 1)')
+    parser.add_argument('--refresh', type=float, default=900, help='seconds between benchmark refreshes (default: 900)')
+    parser.add_argument('--symbol-ttl', type=float, default=900, help='seconds to keep a symbol in memory (default: 900)')
+    parser.add_argument('--max-symbols', type=int, default=2000, help='symbols kept in memory (default: 2000)')
+    args = parser.parse_args(argv)
+
+    scm.enable()
+    # Cheap enough to leave on for a server, and /metrics exposes it
+
+    service = AnalysisService(scs.get_settings(), args.symbol_ttl, args.max_symbols)
+    for set_id in args.sets:
+        print("Loading benchmark set %d" % set_id)
+        if service.get_set(set_id) is None:
+            print("No benchmark data for set %d" % set_id)
+
+    stop = threading.Event()
+    threading.Thread(target=refresh_loop, args=(service, args.refresh, stop), daemon=True).start()
+
+    ServiceHandler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), ServiceHandler)
+    server.daemon_threads = True
+    print("Serving on http://%s:%d/alpha_beta?symbol=XYZ&set=1" % server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    stop.set()
+    server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
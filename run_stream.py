@@ -0,0 +1,148 @@
+"""
+=====================================================================
+Keep a watchlist's betas and alphas live from a price feed.
+=====================================================================
+
+run_stream.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: loads the history for a watchlist and a benchmark set once, then folds every
+ price from a feed into running moments (sc_stream.py) so beta and alpha stay current
+ without rerunning anything. The table (or, for a single symbol, the chart) is redrawn at
+ most every --refresh seconds, however fast the prices come in.
+
+ Feeds: file:PATH reads date,ticker,price lines from a file (--delay paces them for a replay),
+ tcp:HOST:PORT reads the same lines from a socket. --serve FILE replays a file over TCP for
+ testing a tcp feed offline.
+
+Usage:
+    python3 run_stream.py AAPL MSFT -b 1 --feed file:ticks.csv [--delay 0.01] [--refresh 1]
+    python3 run_stream.py AAPL -b 1 --feed tcp:127.0.0.1:9009 --plot
+    python3 run_stream.py --serve ticks.csv --port 9009
+
+"""
+
+import argparse
+import sys
+import time
+
+import sc_benchmarks as scb
+import sc_request_manager as scr
+import sc_series
+import sc_settings as scs
+import sc_stream
+
+
+def print_table(stream, rfr, clear=True):
+    """ Print every symbol's beta and alpha against every benchmark. """
+
+    betas, alphas, periods = stream.results(None, rfr)
+    # Each pair is annualized over its own shared bars, seeded or not
+    if clear:
+        print("\033[2J\033[H", end='')
+        # Redraw in place rather than scrolling
+
+    date = sc_series.int_to_date(stream.bar_date) if stream.bar_date else '-'
+    print("Bar: %s   Updates: %d   %s" % (date, stream.updates, time.strftime('%H:%M:%S')))
+    print("%-8s" % 'Beta' + ''.join(" %9s" % k.replace('\n', ' ')[:9] for k in stream.keys))
+    for symbol, row in zip(stream.symbols, betas):
+        print("%-8s" % symbol + ''.join(" %9.2f" % b for b in row))
+    print("%-8s" % 'Alpha/yr' + ''.join(" %9s" % k.replace('\n', ' ')[:9] for k in stream.keys))
+    for symbol, row in zip(stream.symbols, alphas):
+        print("%-8s" % symbol + ''.join(" %8.1f%%" % (100*a) for a in row))
+    print("(%d periods)" % periods.max(initial=0))
+    sys.stdout.flush()
+
+
+def draw_chart(stream, rfr, ax, plt):
+    """ Redraw the beta/alpha chart for the first symbol. """
+
+    import sc_plot_manager as scp
+
+    betas, alphas, _ = stream.results(None, rfr)
+    keep = [i for i, b in enumerate(betas[0]) if b == b]
+    ax.clear()
+    scp.style_axes(ax)
+    scp.plot_correlations(ax, stream.symbols[0], {stream.keys[i]: betas[0][i] for i in keep},
+                          {stream.keys[i]: alphas[0][i] for i in keep})
+    plt.pause(0.001)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Live betas and alphas for a watchlist from a price feed.')
+    parser.add_argument('symbols', nargs='*', help='tickers to monitor')
+    parser.add_argument('-b', '--benchmarks', type=int, default=1, help='benchmark set id (default: 1)')
+    parser.add_argument('--feed', help='file:PATH or tcp:HOST:PORT')
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds between lines of a file feed (default: 0)')
+    parser.add_argument('--refresh', type=float, default=1.0, help='seconds between redraws (default: 1)')
+    parser.add_argument('--plot', action='store_true', help='redraw the chart instead of the table (one symbol only)')
+    parser.add_argument('--no-seed', action='store_true', help="don't load the history first, start from the feed alone")
+    parser.add_argument('--serve', metavar='FILE', help='replay FILE over TCP instead of monitoring')
+    parser.add_argument('--port', type=int, default=9009, help='port for --serve (default: 9009)')
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        print("Replaying %s on 127.0.0.1:%d" % (args.serve, args.port))
+        try:
+            sc_stream.serve_replay(args.serve, args.port, args.delay or 0.01)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if (not args.symbols or not args.feed):
+        parser.error("give the symbols to monitor and a --feed")
+    if (args.plot and len(args.symbols) != 1):
+        parser.error("--plot draws one symbol, use the table for a watchlist")
+
+    settings = scs.get_settings()
+    symbols = [s.upper() for s in args.symbols]
+    benchmark_dict = scb.select_benchmark(args.benchmarks)
+    stream = sc_stream.MomentStream(symbols, benchmark_dict, settings['interval'])
+
+    if not args.no_seed:
+        histories = scr.get_histories(stream.tickers, settings['interval'], settings['start_date'])
+        for ticker in stream.tickers:
+            if (histories[ticker] == -1):
+                print("No history for %s, starting it from the feed" % ticker)
+        sc_stream.seed(stream, histories)
+
+    try:
+        feed = sc_stream.open_feed(args.feed, delay=args.delay)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.plot:
+        import matplotlib.pyplot as plt
+        import sc_plot_manager as scp
+        plt, fig, ax = scp.set_defaults(plt)
+        plt.ion()
+        redraw = lambda: draw_chart(stream, settings['rfr'], ax, plt)
+    else:
+        redraw = lambda: print_table(stream, settings['rfr'])
+
+    redraw()
+    last_draw = time.monotonic()
+    pending = False
+    try:
+        for date, ticker, price in feed:
+            pending = stream.update(date, ticker, price) or pending
+            if (pending and time.monotonic() - last_draw >= args.refresh):
+                redraw()
+                last_draw = time.monotonic()
+                pending = False
+            # Prices can arrive far faster than anyone can read, so redraws are throttled
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print("Feed closed: " + str(e))
+    if pending:
+        redraw()
+
+    if args.plot:
+        plt.ioff()
+        plt.show()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
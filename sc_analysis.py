@@ -5,7 +5,7 @@ Helper function to abstract data analysis from run_correlations.py
 
 sc_analysis.py (imported as sca)
 Author: Teddy Rowan @ MySybil.com
-Last Modified: Sept 22, 2020
+Last Modified: October 18, 2026
 Description: helper functions for run_correlations.py. Mainly mathematical
 or analysis-based.
 
@@ -14,6 +14,11 @@ or analysis-based.
 from datetime import datetime
 import time
 
+import numpy as np
+
+import sc_panel
+import sc_resample
+
 def calculate_data_duration(start_date):
     """ 
     Determine the timeframe of the data we're dealing with so that 
@@ -41,6 +46,31 @@ def calculate_data_duration(start_date):
     # Return the duration of the dataset in years.
 
 
+def aligned_duration(dates, years):
+    """
+    The duration to annualize an aligned panel over. A panel can be shorter
+    than the dataset (eg. a ticker that listed after the start date), and
+    then its returns only cover the span of its own dates.
+
+    Parameters
+    ----------
+    dates :
+        Sorted YYYYMMDD dates of the panel
+    years :
+        <float> The duration of the dataset in years.
+
+    Returned Variables [1]
+    ----------------------
+    <float> :
+        The smaller of years and the span of the dates, in years.
+    """
+
+    if (len(dates) < 2):
+        return years
+    days = sc_resample.day_numbers([dates[0], dates[-1]])
+    return min(years, (days[1] - days[0])/365)
+
+
 def get_component_extrema(alphas, betas):
     """ 
     Analyze the correlation data and find the extrema for each data group.
@@ -96,7 +126,10 @@ def get_alpha_colors(sorted_alphas, extrema_dict):
     
     colors = []
     for alpha in list(sorted_alphas):
-        if (alpha >= 0):
+        if (alpha == 0):
+            color = [0.00, 0.50, 0.25]
+            # Avoid 0/0 when every alpha is zero (eg. a symbol against itself)
+        elif (alpha > 0):
             color = [0.00, 
                      0.50 + 0.50*alpha/extrema_dict['max_alpha'], 
                      0.25]
@@ -111,15 +144,25 @@ def get_alpha_colors(sorted_alphas, extrema_dict):
     return colors
 
 
+def _closes(history):
+    if isinstance(history, dict):
+        return np.asarray(history['close'], dtype=np.float64)
+    return np.array([data['close'] for data in history], dtype=np.float64)
+    # Columnar series or the older list of dicts
+
+
 def convert_to_percent_change(daily_data):
     """ 
     Take the daily closing prices of the trade data and then convert them to 
-    percent change data + calculate the percent return.
+    percent change data + calculate the percent return. This works on a
+    single history in isolation; use sc_panel to get returns that are 
+    aligned by date across several histories.
     
     Parameters
     ----------
     daily_data : 
-        json data of daily stock data returned from Tradier API
+        A history from sc_request_manager.get_history(), either the
+        columnar series or the list-of-dicts format
 
     Returned Variables [2]
     ----------------------
@@ -129,17 +172,15 @@ def convert_to_percent_change(daily_data):
         The percent return of the stock over the time period.
     """
     
-    percent_change = []
-    last_close = 0
-    for data in daily_data:
-        if (last_close != 0): # Discard the first data point
-            percent_change.append(float(data['close'])/last_close - 1)
-        last_close = data['close']
+    closes = _closes(daily_data)
+    
+    percent_change = closes[1:]/closes[:-1] - 1
+    # Discard the first data point
         
-    performance = daily_data[-1]['close']/daily_data[0]['close']-1
+    performance = closes[-1]/closes[0]-1
     # Calculate the percent change of the stock
     
-    return percent_change, performance
+    return percent_change.tolist(), performance
     
 
 def print_basic_return_facts(data):
@@ -149,14 +190,323 @@ def print_basic_return_facts(data):
     Parameters
     ----------
     data : 
-        json data of daily stock data returned from Tradier API
+        A history from sc_request_manager.get_history() (either format)
 
     Returned Variables [nil]
     ----------------------
     
     """
     
-    print("Starting Share Price: $%.2f" % data[0]['close'])
-    print("Final Share Price:    $%.2f" % data[-1]['close'])
-    print("Stock Percent Return: %.2f%%" % (100*(data[-1]['close']/data[0]['close']-1)))
-    
\ No newline at end of file
+    closes = _closes(data)
+    print("Starting Share Price: $%.2f" % closes[0])
+    print("Final Share Price:    $%.2f" % closes[-1])
+    print("Stock Percent Return: %.2f%%" % (100*(closes[-1]/closes[0]-1)))
+
+
+def periods_per_year(interval):
+    """ 
+    Number of bars per year for a Tradier history interval.
+
+    Parameters
+    ----------
+    interval : 
+        'daily', 'weekly', or 'monthly'
+
+    Returned Variables [1]
+    ----------------------
+    <int> : 
+        Trading periods per year.
+    """
+    
+    return {'daily': 252, 'weekly': 52, 'monthly': 12}[interval]
+
+
+def annualize_return(performance, years):
+    """ 
+    Convert a total percent return over the dataset into an annualized return.
+
+    Parameters
+    ----------
+    performance : 
+        <float> or array of total percent returns (eg. 0.25 for +25%)
+    years :
+        <float> The duration of the dataset in years.
+
+    Returned Variables [1]
+    ----------------------
+    <float> or <ndarray> : 
+        The annualized return(s).
+    """
+    
+    return np.power(1 + np.asarray(performance, dtype=np.float64), 1/years) - 1
+
+
+def benchmark_stats(benchmark_returns, benchmark_performance, years, rfr):
+    """ 
+    Precompute everything about a set of benchmarks that the alpha/beta 
+    calculation needs, so that it can be reused for any number of symbols.
+
+    Parameters
+    ----------
+    benchmark_returns : 
+        (M benchmarks x T periods) array-like of percent change data
+    benchmark_performance :
+        Length M array-like of total percent returns for each benchmark
+    years :
+        <float> The duration of the dataset in years.
+    rfr :
+        <float> The risk-free rate in decimal form.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> : 
+        A dictionary with keys:
+        'centered' : (M x T) demeaned benchmark returns
+        'var'      : length M sample variances of the benchmark returns
+        'excess'   : length M annualized benchmark returns minus the rfr
+        'years', 'rfr' : the inputs, carried along for alpha_beta_matrix()
+    """
+    
+    returns = np.atleast_2d(np.asarray(benchmark_returns, dtype=np.float64))
+    centered = returns - returns.mean(axis=1, keepdims=True)
+    # Demean once. Covariance against a demeaned series doesn't need the other side demeaned.
+    
+    stats = {}
+    stats['centered'] = centered
+    stats['var'] = np.einsum('ij,ij->i', centered, centered)/(returns.shape[1]-1)
+    stats['excess'] = annualize_return(benchmark_performance, years) - rfr
+    stats['years'] = years
+    stats['rfr'] = rfr
+    
+    return stats
+
+
+def alpha_beta_matrix(symbol_returns, symbol_performance, stats):
+    """ 
+    Calculate the CAPM beta and alpha of every symbol against every benchmark
+    in one vectorized pass. Matches np.cov based betas (ddof=1).
+
+    Parameters
+    ----------
+    symbol_returns : 
+        (N symbols x T periods) array-like of percent change data, aligned
+        period-by-period with the benchmark returns used to build stats.
+    symbol_performance :
+        Length N array-like of total percent returns for each symbol
+    stats :
+        <dict> returned from benchmark_stats()
+
+    Returned Variables [2]
+    ----------------------
+    <ndarray> : 
+        (N x M) matrix of betas.
+    <ndarray> : 
+        (N x M) matrix of annualized alphas.
+    """
+    
+    returns = np.atleast_2d(np.asarray(symbol_returns, dtype=np.float64))
+    
+    cov = returns @ stats['centered'].T / (returns.shape[1]-1)
+    # (N x M) covariances between each symbol and each benchmark
+    
+    betas = cov / stats['var']
+    
+    symbol_excess = annualize_return(symbol_performance, stats['years']) - stats['rfr']
+    alphas = np.reshape(symbol_excess, (-1, 1)) - betas*stats['excess']
+    # alpha = (R_s - rfr) - beta*(R_m - rfr) with annualized returns
+    
+    return betas, alphas
+
+
+def analyze_symbol(history, benchmark_histories, years, rfr):
+    """ 
+    Date-align one symbol with a set of benchmarks and calculate its 
+    beta and alpha against each of them.
+
+    Parameters
+    ----------
+    history : 
+        The symbol's history (list-of-dicts or columnar series)
+    benchmark_histories :
+        <list> of benchmark histories in the desired output order
+    years :
+        <float> The duration of the dataset in years. A shorter aligned
+        panel is annualized over its own span (see aligned_duration).
+    rfr :
+        <float> The risk-free rate in decimal form.
+
+    Returned Variables [3]
+    ----------------------
+    <ndarray> or None : 
+        Length M betas, or None if there are too few shared periods.
+    <ndarray> or None : 
+        Length M annualized alphas.
+    <int> :
+        The number of aligned return periods used.
+    """
+    
+    panel = sc_panel.build_panel(dict(enumerate([history] + list(benchmark_histories))))
+    # Integer labels so a ticker can never collide with a benchmark
+    
+    if (len(panel['dates']) < 3):
+        return None, None, max(len(panel['dates'])-1, 0)
+    # Need at least two returns for a sample covariance
+    
+    returns, performance = sc_panel.panel_returns(panel)
+    stats = benchmark_stats(returns[1:], performance[1:], aligned_duration(panel['dates'], years), rfr)
+    betas, alphas = alpha_beta_matrix(returns[0], performance[0], stats)
+    
+    return betas[0], alphas[0], returns.shape[1]
+
+
+
+def factor_model(benchmark_returns, years, rfr):
+    """ 
+    Factor the benchmark design matrix once for a joint multi-factor 
+    regression, so that any number of symbols can then be regressed on 
+    all benchmarks at once (see factor_regression).
+    
+    The model is r_s - rf = a + sum_j b_j*(r_j - rf) + e, with rf the 
+    per-period risk-free rate, solved by least squares through a QR 
+    factorization of [1, benchmark excess returns].
+
+    Parameters
+    ----------
+    benchmark_returns : 
+        (M benchmarks x T periods) array-like of percent change data
+    years :
+        <float> The time the returns span in years (see aligned_duration),
+        which sets the periods per year.
+    rfr :
+        <float> The annual risk-free rate in decimal form.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> : 
+        A dictionary with keys:
+        'q'        : (T x M+1) orthonormal factor of the design matrix
+        'r_inv'    : (M+1 x M+1) inverse of the triangular factor
+        'cov_diag' : length M+1 diagonal of (X'X)^-1, for standard errors
+        'rf'       : per-period risk-free rate
+        'periods_per_year' : periods per year, for annualizing the intercept
+    """
+    
+    returns = np.atleast_2d(np.asarray(benchmark_returns, dtype=np.float64))
+    n_periods = returns.shape[1]
+    if (n_periods <= returns.shape[0] + 1):
+        raise ValueError("Need more periods than benchmarks for a multi-factor regression")
+    
+    per_year = n_periods/years
+    rf = (1 + rfr)**(1/per_year) - 1
+    
+    design = np.column_stack((np.ones(n_periods), (returns - rf).T))
+    q, r = np.linalg.qr(design)
+    
+    diag = np.abs(np.diag(r))
+    if (diag.min() < 1e-10*diag.max()):
+        raise ValueError("Benchmarks are collinear, drop one of them for a multi-factor regression")
+    # eg. the same ETF twice, or a benchmark with no price changes
+    
+    r_inv = np.linalg.inv(r)
+    
+    model = {}
+    model['q'] = q
+    model['r_inv'] = r_inv
+    model['cov_diag'] = np.einsum('ij,ij->i', r_inv, r_inv)
+    model['rf'] = rf
+    model['periods_per_year'] = per_year
+    
+    return model
+
+
+def factor_regression(symbol_returns, model):
+    """ 
+    Regress every symbol on all of the benchmarks jointly, in one batched 
+    solve against the precomputed factorization.
+
+    Parameters
+    ----------
+    symbol_returns : 
+        (N symbols x T periods) array-like of percent change data, aligned
+        period-by-period with the benchmark returns used to build the model.
+    model :
+        <dict> returned from factor_model()
+
+    Returned Variables [1]
+    ----------------------
+    <dict> : 
+        A dictionary with keys:
+        'coef'     : (N x M) factor loadings (the joint betas)
+        'se'       : (N x M) standard errors of the loadings
+        'alpha'    : length N intercepts, annualized (x periods per year)
+        'alpha_se' : length N standard errors of the annualized intercepts
+        'r2'       : length N coefficients of determination
+        'periods'  : the number of return periods used
+    """
+    
+    y = np.atleast_2d(np.asarray(symbol_returns, dtype=np.float64)).T - model['rf']
+    # (T x N), one column per symbol
+    
+    q = model['q']
+    coef = model['r_inv'] @ (q.T @ y)
+    # R^-1 Q'y for every symbol at once. (M+1 x N), intercept first
+    
+    fitted = q @ (q.T @ y)
+    ssr = np.einsum('ij,ij->j', y - fitted, y - fitted)
+    centered = y - y.mean(axis=0)
+    sst = np.einsum('ij,ij->j', centered, centered)
+    
+    n_periods, n_params = q.shape
+    sigma2 = ssr/(n_periods - n_params)
+    se = np.sqrt(np.outer(model['cov_diag'], sigma2))
+    
+    result = {}
+    result['coef'] = coef[1:].T
+    result['se'] = se[1:].T
+    result['alpha'] = coef[0]*model['periods_per_year']
+    result['alpha_se'] = se[0]*model['periods_per_year']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['r2'] = 1 - ssr/sst
+    result['periods'] = n_periods
+    
+    return result
+
+
+def regress_symbol(history, benchmark_histories, years, rfr):
+    """ 
+    Date-align one symbol with a set of benchmarks and regress it on all of 
+    them jointly. Use factor_model/factor_regression directly to do many 
+    symbols that share the same dates in one go.
+
+    Parameters
+    ----------
+    history : 
+        The symbol's history (list-of-dicts or columnar series)
+    benchmark_histories :
+        <list> of benchmark histories in the desired output order
+    years :
+        <float> The duration of the dataset in years. A shorter aligned
+        panel is annualized over its own span (see aligned_duration).
+    rfr :
+        <float> The risk-free rate in decimal form.
+
+    Returned Variables [2]
+    ----------------------
+    <dict> or None : 
+        factor_regression() results for the one symbol (row 0 of each
+        array), or None if there are too few shared periods.
+    <int> :
+        The number of aligned return periods used.
+    """
+    
+    panel = sc_panel.build_panel(dict(enumerate([history] + list(benchmark_histories))))
+    periods = max(len(panel['dates'])-1, 0)
+    if (periods <= len(benchmark_histories) + 1):
+        return None, periods
+    
+    returns, _ = sc_panel.panel_returns(panel)
+    model = factor_model(returns[1:], aligned_duration(panel['dates'], years), rfr)
+    # A panel shorter than the dataset has more periods per year than years would suggest
+    result = factor_regression(returns[0], model)
+    
+    return {key: (val[0] if isinstance(val, np.ndarray) else val) for key, val in result.items()}, periods
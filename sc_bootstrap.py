@@ -0,0 +1,242 @@
+"""
+==========================================================
+Block-bootstrap confidence intervals for alpha and beta.
+==========================================================
+
+sc_bootstrap.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: with weekly bars since 2019 there are only a few hundred returns behind each
+ beta, so the point estimates on the chart can be misleading on their own. This resamples
+ the aligned returns in blocks of consecutive periods (a circular moving-block bootstrap,
+ which keeps the short-range autocorrelation and the symbol/benchmark co-movement intact)
+ and recomputes every beta and alpha for every resample.
+
+ Resamples are drawn as an index matrix, turned into a matrix of how often each period is
+ picked, and evaluated in batches with a few matrix products per batch. Large jobs are
+ split over a process pool.
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+
+import sc_analysis
+import sc_panel
+
+batch_bytes = 64*1024*1024
+# Rough cap on the weights, the (batch x N x M) results and the symbol x benchmark return
+# products evaluated at once
+
+
+def block_indices(n_periods, n_resamples, block_length, rng):
+    """
+    Index matrix for a circular moving-block bootstrap.
+
+    Parameters
+    ----------
+    n_periods :
+        <int> T, the number of returns
+    n_resamples :
+        <int> B, the number of resamples
+    block_length :
+        <int> Consecutive periods per block
+    rng :
+        <numpy.random.Generator>
+
+    Returned Variables [1]
+    ----------------------
+    <ndarray> :
+        (B x T) int array. Row b picks the periods of resample b.
+    """
+
+    n_blocks = -(-n_periods//block_length)
+    starts = rng.integers(0, n_periods, (n_resamples, n_blocks, 1))
+    index = (starts + np.arange(block_length)) % n_periods
+    # Blocks wrap around the end of the series so every period is equally likely
+
+    return index.reshape(n_resamples, -1)[:, :n_periods]
+
+
+def resample_alpha_beta(symbol_returns, benchmark_returns, index, years, rfr):
+    """
+    Betas and alphas for a batch of resamples, matching sc_analysis.alpha_beta_matrix.
+
+    Parameters
+    ----------
+    symbol_returns :
+        (N x T) array of percent change data
+    benchmark_returns :
+        (M x T) array of percent change data, aligned with symbol_returns
+    index :
+        (b x T) index matrix from block_indices()
+    years :
+        <float> The duration of the dataset in years.
+    rfr :
+        <float> The risk-free rate in decimal form.
+
+    Returned Variables [2]
+    ----------------------
+    <ndarray> :
+        (b x N x M) betas
+    <ndarray> :
+        (b x N x M) annualized alphas
+    """
+
+    n_resamples, n_periods = index.shape
+    offsets = index + n_periods*np.arange(n_resamples)[:, None]
+    weights = np.bincount(offsets.ravel(), minlength=n_resamples*n_periods).reshape(n_resamples, n_periods)
+    weights = weights.T.astype(np.float64)
+    # (T x b) how many times each period appears in each resample. Every sum over a
+    # resample is then a matrix product with the weights, no resampled copies needed.
+
+    x, y = symbol_returns, benchmark_returns
+    n_symbols, n_benchmarks = len(x), len(y)
+
+    y_mean = (y @ weights)/n_periods
+    var = ((y*y) @ weights - n_periods*y_mean**2)/(n_periods-1)
+    # (M x b) benchmark variance in each resample
+
+    cov = np.empty((n_symbols, n_benchmarks, n_resamples))
+    block = max(1, batch_bytes//(8*n_benchmarks*n_periods))
+    for first in range(0, n_symbols, block):
+        xs = x[first:first+block]
+        xy = (xs[:, None, :]*y[None, :, :]).reshape(len(xs)*n_benchmarks, n_periods)
+        cov[first:first+block] = ((xy @ weights).reshape(len(xs), n_benchmarks, n_resamples)
+                                  - y_mean[None, :, :]*(xs @ weights)[:, None, :])/(n_periods-1)
+    # (N x M x b) sum(w*x*y) - mean_y*sum(w*x), the covariance without centering each resample.
+    # The (N*M x T) products are built a block of symbols at a time to stay inside batch_bytes.
+
+    betas = (cov/var[None, :, :]).transpose(2, 0, 1)
+
+    symbol_performance = np.expm1(np.log1p(x) @ weights).T
+    benchmark_performance = np.expm1(np.log1p(y) @ weights).T
+    # Total return of each resampled path, (b x N) and (b x M)
+
+    symbol_excess = sc_analysis.annualize_return(symbol_performance, years) - rfr
+    benchmark_excess = sc_analysis.annualize_return(benchmark_performance, years) - rfr
+    alphas = symbol_excess[:, :, None] - betas*benchmark_excess[:, None, :]
+
+    return betas, alphas
+
+
+def _bootstrap_job(job):
+    symbol_returns, benchmark_returns, n_resamples, block_length, years, rfr, seed = job
+    rng = np.random.default_rng(seed)
+    n_symbols, n_periods = symbol_returns.shape
+    batch = max(1, batch_bytes//(8*(n_periods + 4*n_symbols*benchmark_returns.shape[0])))
+
+    betas, alphas = [], []
+    for start in range(0, n_resamples, batch):
+        index = block_indices(n_periods, min(batch, n_resamples - start), block_length, rng)
+        b, a = resample_alpha_beta(symbol_returns, benchmark_returns, index, years, rfr)
+        betas.append(b)
+        alphas.append(a)
+    return np.concatenate(betas), np.concatenate(alphas)
+
+
+def bootstrap_alpha_beta(symbol_returns, benchmark_returns, years, rfr, n_resamples=1000,
+                         block_length=None, ci=0.95, seed=None, processes=None):
+    """
+    Block-bootstrap confidence intervals for the beta and alpha of every
+    symbol against every benchmark.
+
+    Parameters
+    ----------
+    symbol_returns :
+        (N x T) array-like of percent change data (or length T for one symbol)
+    benchmark_returns :
+        (M x T) array-like of percent change data, aligned with symbol_returns
+    years :
+        <float> The duration of the dataset in years.
+    rfr :
+        <float> The risk-free rate in decimal form.
+    n_resamples :
+        <int> Number of bootstrap resamples.
+    block_length :
+        <int> Periods per block. Default: T^(1/3), rounded.
+    ci :
+        <float> Confidence level of the intervals, eg. 0.95
+    seed :
+        Seed for reproducible intervals.
+    processes :
+        Worker processes. Default: one per CPU for large jobs, none for
+        small ones (where starting a pool costs more than it saves).
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys:
+        'beta_low', 'beta_high', 'alpha_low', 'alpha_high' : (N x M) interval bounds
+        'beta_se', 'alpha_se' : (N x M) bootstrap standard errors
+        'n_resamples', 'block_length', 'ci' : the settings used
+    """
+
+    symbol_returns = np.atleast_2d(np.asarray(symbol_returns, dtype=np.float64))
+    benchmark_returns = np.atleast_2d(np.asarray(benchmark_returns, dtype=np.float64))
+    n_symbols, n_periods = symbol_returns.shape
+
+    if block_length is None:
+        block_length = max(1, int(round(n_periods**(1/3))))
+
+    work = n_resamples*n_periods*n_symbols*benchmark_returns.shape[0]
+    if processes is None:
+        processes = None if work > 2_000_000_000 else 1
+    # Below ~2G multiply-adds a single process finishes in about a second
+
+    seeds = np.random.SeedSequence(seed)
+    if (processes == 1):
+        betas, alphas = _bootstrap_job((symbol_returns, benchmark_returns, n_resamples,
+                                        block_length, years, rfr, seeds))
+    else:
+        n_jobs = processes or os.cpu_count() or 1
+        counts = [len(c) for c in np.array_split(np.arange(n_resamples), n_jobs) if len(c)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            jobs = [(symbol_returns, benchmark_returns, count, block_length, years, rfr, child)
+                    for count, child in zip(counts, seeds.spawn(len(counts)))]
+            parts = list(pool.map(_bootstrap_job, jobs))
+        betas = np.concatenate([p[0] for p in parts])
+        alphas = np.concatenate([p[1] for p in parts])
+        # Independent child seeds so the workers draw different resamples
+
+    tails = [100*(1 - ci)/2, 100*(1 + ci)/2]
+    result = {}
+    has_nan = np.isnan(betas).any() or np.isnan(alphas).any()
+    percentile, std = (np.nanpercentile, np.nanstd) if has_nan else (np.percentile, np.std)
+    # A flat resampled benchmark gives a NaN beta; the nan-aware versions are much slower otherwise
+
+    result['beta_low'], result['beta_high'] = percentile(betas, tails, axis=0)
+    result['alpha_low'], result['alpha_high'] = percentile(alphas, tails, axis=0)
+    result['beta_se'] = std(betas, axis=0, ddof=1)
+    result['alpha_se'] = std(alphas, axis=0, ddof=1)
+    result['n_resamples'] = n_resamples
+    result['block_length'] = block_length
+    result['ci'] = ci
+
+    return result
+
+
+def bootstrap_symbol(history, benchmark_histories, years, rfr, **kwargs):
+    """
+    Date-align one symbol with a set of benchmarks (like
+    sc_analysis.analyze_symbol, including annualizing a short panel over
+    its own span) and bootstrap its betas and alphas.
+    Keyword arguments are passed on to bootstrap_alpha_beta().
+
+    Returned Variables [1]
+    ----------------------
+    <dict> or None :
+        bootstrap_alpha_beta() results with the arrays reduced to length M,
+        or None if there are too few shared periods.
+    """
+
+    panel = sc_panel.build_panel(dict(enumerate([history] + list(benchmark_histories))))
+    if (len(panel['dates']) < 3):
+        return None
+
+    returns, _ = sc_panel.panel_returns(panel)
+    result = bootstrap_alpha_beta(returns[0], returns[1:], sc_analysis.aligned_duration(panel['dates'], years),
+                                  rfr, **kwargs)
+    return {key: (val[0] if isinstance(val, np.ndarray) else val) for key, val in result.items()}
@@ -0,0 +1,196 @@
+"""
+===============================================================
+On-disk price history cache used by sc_request_manager.py.
+===============================================================
+
+sc_cache.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: stores each (symbol, interval) history as a compressed .npz of columns (see
+ sc_series.py) plus a small JSON index with the requested start date, the time the data was
+ last refreshed from the API, and the time it was last used. The index drives the TTL checks
+ and the least-recently-used eviction once the cache grows past its size cap.
+
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+index_name = 'index.json'
+
+_index_lock = threading.Lock()
+# Histories are fetched from a thread pool, serialize updates to the index
+
+
+def _key(symbol, interval):
+    return symbol.upper() + '_' + interval
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key + '.npz')
+
+
+def _load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, index_name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # A missing or corrupt index just means an empty cache
+
+
+def _save_index(cache_dir, index):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = os.path.join(cache_dir, index_name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(cache_dir, index_name))
+    # Write-then-rename so an interrupted run never leaves a half-written index
+
+
+def load_entry(symbol, interval, cache_dir):
+    """
+    Look up the cached history for a symbol.
+
+    Parameters
+    ----------
+    symbol :
+        Stock ticker
+    interval :
+        'daily', 'weekly', or 'monthly'
+    cache_dir :
+        Directory holding the cache
+
+    Returned Variables [1]
+    ----------------------
+    <dict> or None :
+        None on a cache miss. Otherwise a dict with keys:
+        'series' (columnar history), 'start' (the start date originally
+        requested) and 'fetched' (epoch seconds of the last API refresh).
+    """
+
+    key = _key(symbol, interval)
+    with _index_lock:
+        index = _load_index(cache_dir)
+        if key not in index:
+            return None
+
+        try:
+            with np.load(_entry_path(cache_dir, key)) as npz:
+                series = {name: npz[name] for name in npz.files}
+        except (OSError, ValueError):
+            return None
+
+        index[key]['used'] = time.time()
+        _save_index(cache_dir, index)
+        # Touch the entry for the LRU ordering
+
+    return {'series': series,
+            'start': index[key]['start'],
+            'fetched': index[key]['fetched']}
+
+
+def store_entry(symbol, interval, series, start_date, cache_dir, max_mb):
+    """
+    Write a history to the cache and evict old entries if over the size cap.
+
+    Parameters
+    ----------
+    symbol :
+        Stock ticker
+    interval :
+        'daily', 'weekly', or 'monthly'
+    series :
+        <dict> columnar history (see sc_series.from_bars)
+    start_date :
+        The earliest date the cached history is known to cover
+    cache_dir :
+        Directory holding the cache
+    max_mb :
+        Size cap for the cache in megabytes
+
+    Returned Variables [nil]
+    ------------------------
+
+    """
+
+    os.makedirs(cache_dir, exist_ok=True)
+    key = _key(symbol, interval)
+    path = _entry_path(cache_dir, key)
+    np.savez_compressed(path, **series)
+
+    now = time.time()
+    with _index_lock:
+        index = _load_index(cache_dir)
+        index[key] = {'start': start_date,
+                      'fetched': now,
+                      'used': now,
+                      'size': os.path.getsize(path)}
+
+        _evict(cache_dir, index, max_mb*1024*1024, keep=key)
+        _save_index(cache_dir, index)
+
+
+def is_fresh(entry, ttl):
+    """ True if the entry was refreshed from the API within ttl seconds. """
+    return (time.time() - entry['fetched']) < ttl
+
+
+def _evict(cache_dir, index, max_bytes, keep=None):
+    total = sum(item['size'] for item in index.values())
+    for key in sorted(index, key=lambda k: index[k]['used']):
+        if (total <= max_bytes):
+            break
+        if (key == keep):
+            continue
+        # Never evict the entry that was just written
+
+        try:
+            os.remove(_entry_path(cache_dir, key))
+        except OSError:
+            pass
+        total -= index.pop(key)['size']
+
+
+def invalidate(cache_dir, symbol=None, interval=None):
+    """
+    Remove entries from the cache.
+
+    Parameters
+    ----------
+    cache_dir :
+        Directory holding the cache
+    symbol :
+        Only remove entries for this ticker. Default: every ticker.
+    interval :
+        Only remove entries for this interval. Default: every interval.
+
+    Returned Variables [1]
+    ----------------------
+    <int> :
+        The number of entries removed.
+    """
+
+    removed = 0
+    with _index_lock:
+        index = _load_index(cache_dir)
+        for key in list(index):
+            key_symbol, key_interval = key.rsplit('_', 1)
+            if (symbol is not None and key_symbol != symbol.upper()):
+                continue
+            if (interval is not None and key_interval != interval):
+                continue
+
+            try:
+                os.remove(_entry_path(cache_dir, key))
+            except OSError:
+                pass
+            del index[key]
+            removed += 1
+
+        _save_index(cache_dir, index)
+    return removed
@@ -0,0 +1,237 @@
+"""
+=============================================================
+Local stand-in for the Tradier history endpoint, for testing.
+=============================================================
+
+sc_fake_tradier.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: serves synthetic price histories from /v1/markets/history in the same JSON
+ shape as Tradier (including the bare-dict single bar and null history quirks) so the whole
+ pipeline can be exercised and timed offline. Every symbol gets a deterministic random walk
+ driven partly by a shared market factor, so betas and correlations come out realistic.
+ Symbols starting with 'BAD' return no data, symbols starting with 'FLAKY' get a 503 on every
+ other request, and a per-minute quota is enforced with 429s and X-Ratelimit-* headers.
+
+"""
+
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import multiprocessing
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+import zlib
+
+import numpy as np
+
+end_date = date(2024, 12, 31)
+first_date = date(2010, 1, 1)
+# Fixed calendar so results are reproducible between runs
+
+
+def _calendar(interval):
+    days = []
+    d = first_date
+    while d <= end_date:
+        if (d.weekday() < 5):
+            if (interval == 'daily'
+                    or (interval == 'weekly' and (not days or d.isocalendar()[1] != days[-1].isocalendar()[1]))
+                    or (interval == 'monthly' and (not days or d.month != days[-1].month))):
+                days.append(d)
+        d += timedelta(days=1)
+    return days
+    # First trading day of each period, like Tradier's weekly/monthly bars
+
+
+_calendars = {}
+_market = {}
+_init_lock = threading.Lock()
+
+
+def synthetic_history(symbol, interval, start_date):
+    """
+    Generate a deterministic price history for any symbol.
+
+    Parameters
+    ----------
+    symbol :
+        Stock ticker (any string)
+    interval :
+        'daily', 'weekly', or 'monthly'
+    start_date :
+        A date string in %Y-%m-d format (eg. 2019-01-01)
+
+    Returned Variables [1]
+    ----------------------
+    <list> :
+        A list of dicts with keys 'date', 'open', 'high', 'low', 'close', 'volume'
+    """
+
+    scale = {'daily': 1, 'weekly': 5, 'monthly': 21}[interval]
+    # Trading days per bar, so volatility scales sensibly with the interval
+
+    with _init_lock:
+        if interval not in _calendars:
+            rng = np.random.default_rng(0)
+            _market[interval] = rng.normal(0.0004*scale, 0.01*np.sqrt(scale), len(_calendar(interval)))
+            _calendars[interval] = _calendar(interval)
+    # The server handles requests on many threads, build the shared calendar once
+    days = _calendars[interval]
+    market = _market[interval]
+
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    beta = rng.normal(1.0, 0.4)
+    noise = rng.normal(0, 0.015*np.sqrt(scale), len(market))
+    close = rng.uniform(10, 300)*np.cumprod(1 + beta*market + noise)
+    # One-factor model: each symbol is a random beta to the shared market plus its own noise
+
+    first = next((i for i, d in enumerate(days) if d.isoformat() >= start_date), len(days))
+    bars = []
+    for d, c in zip(days[first:], close[first:]):
+        bars.append({'date': d.isoformat(), 'open': round(c*0.995, 2), 'high': round(c*1.01, 2),
+                     'low': round(c*0.99, 2), 'close': round(c, 2), 'volume': int(rng.integers(1e5, 1e7))})
+    return bars
+
+
+class QuotaServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer that tracks a per-minute request quota like the
+    real API, reported in the X-Ratelimit-* headers. Requests past the quota
+    get a 429 until the window rolls over.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, handler, quota=100000):
+        super().__init__(address, handler)
+        self.quota = quota
+        self.window_end = 0.0
+        self.used = 0
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def take(self, symbol):
+        with self.lock:
+            now = time.time()
+            if (now >= self.window_end):
+                self.window_end = now + 60
+                self.used = 0
+            self.used += 1
+            self.calls[symbol] = self.calls.get(symbol, 0) + 1
+            return self.used <= self.quota, max(self.quota - self.used, 0), self.calls[symbol]
+
+
+class HistoryHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.endswith('/markets/history'):
+            self.send_error(404)
+            return
+
+        query = {key: val[0] for key, val in parse_qs(url.query).items()}
+        symbol = query.get('symbol', '')
+
+        allowed, available, calls = self.server.take(symbol)
+        limit_headers = {'X-Ratelimit-Allowed': str(self.server.quota),
+                         'X-Ratelimit-Used': str(self.server.quota - available),
+                         'X-Ratelimit-Available': str(available),
+                         'X-Ratelimit-Expiry': str(int(self.server.window_end*1000))}
+        if not allowed:
+            self.send_error_status(429, limit_headers)
+            return
+        if (symbol.startswith('FLAKY') and calls % 2 == 1):
+            self.send_error_status(503, limit_headers)
+            return
+        # FLAKY symbols fail every other request, to exercise the retries
+        bars = [] if symbol.startswith('BAD') else synthetic_history(symbol, query.get('interval', 'daily'),
+                                                                     query.get('start', '1900-01-01'))
+
+        if not bars:
+            body = {'history': None}
+        elif (len(bars) == 1):
+            body = {'history': {'day': bars[0]}}
+        else:
+            body = {'history': {'day': bars}}
+        # Same shapes as the real API
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, val in limit_headers.items():
+            self.send_header(key, val)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_error_status(self, status, headers):
+        payload = b'{"fault":{"faultstring":"Rate limit exceeded"}}' if status == 429 else b''
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(payload)))
+        for key, val in headers.items():
+            self.send_header(key, val)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+        # Keep the benchmark output clean
+
+
+def start_server(port=0, quota=100000):
+    """
+    Start the fake API on a background thread.
+
+    Parameters
+    ----------
+    port :
+        Port to listen on. Default: any free port.
+    quota :
+        Requests allowed per minute before it answers 429.
+
+    Returned Variables [2]
+    ----------------------
+    <ThreadingHTTPServer> :
+        The running server; call .shutdown() when done.
+    <str> :
+        The root URL to use in place of sc_request_manager.root_url
+    """
+
+    server = QuotaServer(('127.0.0.1', port), HistoryHandler, quota)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, 'http://127.0.0.1:%d/v1/markets' % server.server_address[1]
+
+
+def _serve(port, quota, conn):
+    server = QuotaServer(('127.0.0.1', port), HistoryHandler, quota)
+    conn.send(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server_process(port=0, quota=100000):
+    """
+    Start the fake API in its own process, so generating the responses
+    doesn't compete with the client for the GIL while it is being timed.
+
+    Parameters
+    ----------
+    port :
+        Port to listen on. Default: any free port.
+    quota :
+        Requests allowed per minute before it answers 429.
+
+    Returned Variables [2]
+    ----------------------
+    <multiprocessing.Process> :
+        The server process; call .terminate() when done.
+    <str> :
+        The root URL to use in place of sc_request_manager.root_url
+    """
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(port, quota, child_conn), daemon=True)
+    process.start()
+    return process, 'http://127.0.0.1:%d/v1/markets' % parent_conn.recv()
+
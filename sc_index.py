@@ -0,0 +1,372 @@
+"""
+=====================================================================
+Similarity index: which instruments does a symbol track most closely?
+=====================================================================
+
+sc_index.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: the sets in sc_benchmarks are a handful of hand-picked ETFs. This keeps the
+ standardized, date-aligned returns of a whole reference universe (eg. every listed ETF) in
+ one contiguous float32 matrix on disk, so a query is a single matrix-vector product with
+ the symbol's standardized returns followed by a partial sort for the top K.
+
+ The matrix is time-major (one row per period, one column per instrument) so that new bars
+ are appended to the end of the file without rewriting it. Running sums per instrument are
+ kept alongside, so the means and standard deviations stay current as bars are added; the
+ stored values are only re-standardized (in place) once they have drifted noticeably.
+
+ Like sc_matrix.py, a missing return (not yet listed, or no trade) is treated as the
+ instrument's mean return, ie. it contributes nothing to any covariance. It is stored as an
+ exact 0 and stays 0 through any re-standardization.
+
+ The last bar can still have been in progress when it was stored (a weekly or monthly bar, or
+ a daily one during the session), so every update recomputes that row as well. Its raw
+ returns are kept in the metadata so they can be swapped out of the running sums exactly.
+
+Usage:
+    import sc_index
+    sc_index.build_index('etfs.idx', tickers, 'weekly', '2019-01-01')
+    sc_index.query('etfs.idx', 'AAPL', k=10)
+    sc_index.update_index('etfs.idx')
+
+"""
+
+import json
+import os
+
+import numpy as np
+
+import sc_panel
+import sc_request_manager as scr
+
+drift_tolerance = 0.02
+# Re-standardize once a mean or standard deviation has moved by this much (in std units)
+
+
+def _meta_path(path):
+    return path + '.json'
+
+
+def open_index(path, mode='r'):
+    """
+    Open an index built by build_index().
+
+    Parameters
+    ----------
+    path :
+        File path given to build_index()
+    mode :
+        'r' for read-only, 'r+' to update in place
+
+    Returned Variables [2]
+    ----------------------
+    <numpy.memmap> :
+        (T x N) float32 standardized returns, one column per instrument.
+    <dict> :
+        Metadata with keys 'symbols', 'dates' (the T+1 bar dates, YYYYMMDD),
+        'interval', 'start_date', 'calendar_symbol', the per-instrument
+        running stats 'sum', 'sumsq', 'count', 'mean', 'std' (the last two
+        are what the stored values were standardized with) and 'last', the
+        raw returns of the last row (None where missing).
+    """
+
+    with open(_meta_path(path)) as f:
+        meta = json.load(f)
+    shape = (len(meta['dates']) - 1, len(meta['symbols']))
+    return np.memmap(path, dtype=np.float32, mode=mode, shape=shape), meta
+
+
+def _write_meta(path, meta):
+    with open(_meta_path(path), 'w') as f:
+        json.dump(meta, f)
+
+
+def _moments(total, total_sq, count, n_periods):
+    mean = np.where(count > 0, total/np.maximum(count, 1), 0)
+    dev_sq = np.maximum(total_sq - count*mean*mean, 0)
+    std = np.sqrt(dev_sq/max(n_periods - 1, 1))
+    return mean, std
+    # Over every period, with the missing ones sitting at the mean (as in sc_matrix)
+
+
+def _standardize(returns, mean, std):
+    z = (returns - mean)/np.where(std > 0, std, np.inf)
+    return np.where(np.isnan(z), 0, z).astype(np.float32)
+
+
+def _raw_row(values):
+    return [None if v != v else float(v) for v in values]
+    # JSON has no NaN, missing returns are stored as null
+
+
+def _aligned_returns(histories, symbols, dates):
+    """ (len(dates)-1 x len(symbols)) returns of each history on the given bar dates, NaN where missing. """
+
+    output = np.full((len(dates) - 1, len(symbols)), np.nan)
+    for col, symbol in enumerate(symbols):
+        if (histories[symbol] != -1):
+            closes = sc_panel.align_to_dates(histories[symbol], dates)
+            output[:, col] = closes[1:]/closes[:-1] - 1
+    return output
+
+
+def build_index(path, symbols, interval, start_date, calendar_symbol='SPY', chunk=64):
+    """
+    Download the histories for a reference universe and write their
+    standardized returns into a new index, one chunk of symbols at a time.
+
+    Parameters
+    ----------
+    path :
+        File path for the index. Metadata goes to <path>.json
+    symbols :
+        <list> of tickers
+    interval :
+        'daily', 'weekly', or 'monthly'
+    start_date :
+        A date string in %Y-%m-d format (eg. 2019-01-01)
+    calendar_symbol :
+        Ticker whose bar dates define the shared date axis
+    chunk :
+        Number of symbols fetched and held in memory at once
+
+    Returned Variables [1]
+    ----------------------
+    <list> :
+        The tickers that could not be downloaded (left out of the index).
+    """
+
+    calendar = scr.get_history(calendar_symbol, interval, start_date)
+    if (calendar == -1):
+        raise ValueError("could not download the calendar symbol " + calendar_symbol)
+    dates = sc_panel.to_series(calendar)['date']
+    n_periods = len(dates) - 1
+
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    columns, stats, failed, last = [], [], [], []
+    matrix = np.memmap(path, dtype=np.float32, mode='w+', shape=(n_periods, len(symbols)))
+
+    for first in range(0, len(symbols), chunk):
+        batch = symbols[first:first+chunk]
+        histories = scr.get_histories(batch, interval, start_date)
+        batch_ok = [s for s in batch if histories[s] != -1]
+        failed += [s for s in batch if histories[s] == -1]
+
+        returns = _aligned_returns(histories, batch_ok, dates)
+        observed = ~np.isnan(returns)
+        total = np.where(observed, returns, 0).sum(axis=0)
+        total_sq = np.where(observed, returns*returns, 0).sum(axis=0)
+        count = observed.sum(axis=0)
+        mean, std = _moments(total, total_sq, count, n_periods)
+
+        matrix[:, len(columns):len(columns)+len(batch_ok)] = _standardize(returns, mean, std)
+        columns += batch_ok
+        stats.append((total, total_sq, count, mean, std))
+        last += _raw_row(returns[-1]) if n_periods else []
+
+    if failed:
+        packed = np.memmap(path + '.tmp', dtype=np.float32, mode='w+', shape=(n_periods, len(columns)))
+        rows = max(1, (64*1024*1024)//(4*max(len(symbols), 1)))
+        for first in range(0, n_periods, rows):
+            packed[first:first+rows] = matrix[first:first+rows, :len(columns)]
+        packed.flush()
+        del packed, matrix
+        os.replace(path + '.tmp', path)
+        # The good columns were written packed to the left, drop the unused ones on the right
+    else:
+        matrix.flush()
+        del matrix
+
+    meta = {'symbols': columns, 'dates': [int(d) for d in dates], 'interval': interval,
+            'start_date': start_date, 'calendar_symbol': calendar_symbol}
+    for i, key in enumerate(('sum', 'sumsq', 'count', 'mean', 'std')):
+        meta[key] = [float(v) for part in stats for v in part[i]]
+    meta['last'] = last
+    _write_meta(path, meta)
+    return failed
+
+
+def load_index(path):
+    """
+    Open an index for querying, with its stats as arrays. Keep the result
+    around to answer many queries without re-reading the metadata.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        The open_index() metadata plus 'matrix' (the read-only memmap),
+        'column' (ticker to column number) and 'std' as an ndarray.
+    """
+
+    matrix, meta = open_index(path)
+    meta['matrix'] = matrix
+    meta['column'] = {symbol: i for i, symbol in enumerate(meta['symbols'])}
+    meta['std'] = np.asarray(meta['std'])
+    return meta
+
+
+def query(index, symbol, k=10, by='corr', history=None):
+    """
+    The K instruments in the index that a symbol tracks most closely.
+
+    Parameters
+    ----------
+    index :
+        A path given to build_index(), or a dict from load_index()
+    symbol :
+        The ticker to look up. If it is in the index its stored column is
+        used, otherwise its history is downloaded.
+    k :
+        <int> Number of results
+    by :
+        'corr' for the highest correlations, 'beta' for the highest betas
+        of the symbol against each instrument.
+    history :
+        The symbol's history, to skip the download.
+
+    Returned Variables [1]
+    ----------------------
+    <list> :
+        Up to k dicts with keys 'symbol', 'corr' and 'beta', best first.
+    """
+
+    if isinstance(index, str):
+        index = load_index(index)
+    matrix, std = index['matrix'], index['std']
+    n_periods = matrix.shape[0]
+    symbol = symbol.upper()
+
+    own = index['column'].get(symbol)
+    if (own is not None and history is None):
+        z = np.asarray(matrix[:, own])
+        symbol_std = std[own]
+    else:
+        if history is None:
+            history = scr.get_history(symbol, index['interval'], index['start_date'])
+        if (history == -1):
+            raise ValueError("no data for " + symbol)
+        closes = sc_panel.align_to_dates(history, index['dates'])
+        returns = closes[1:]/closes[:-1] - 1
+        observed = ~np.isnan(returns)
+        mean, symbol_std = _moments(returns[observed].sum(), (returns[observed]**2).sum(),
+                                    observed.sum(), n_periods)
+        z = _standardize(returns, mean, symbol_std)
+
+    corr = (z @ matrix).astype(np.float64)/(n_periods - 1)
+    # The whole query: one (T) x (T x N) product against the standardized universe
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = corr*symbol_std/std
+    # beta of the symbol against each instrument, cov/var_j
+
+    score = np.array(corr if by == 'corr' else beta)
+    score[~np.isfinite(score)] = -np.inf
+    if own is not None:
+        score[own] = -np.inf
+    # Never report the symbol as its own best match
+
+    k = min(k, len(score))
+    if (k <= 0):
+        return []
+    top = np.argpartition(-score, k - 1)[:k]
+    top = top[np.argsort(-score[top])]
+    # Partial sort: only the k winners get fully sorted
+
+    return [{'symbol': index['symbols'][i], 'corr': float(corr[i]), 'beta': float(beta[i])}
+            for i in top if np.isfinite(score[i])]
+
+
+def update_index(path, chunk=64):
+    """
+    Append the bars that have come in since the index was built or last
+    updated, and recompute the last stored bar, which may have been a
+    partial period then. Nothing else is re-downloaded or rewritten (the
+    on-disk cache serves the old part of each history).
+
+    Parameters
+    ----------
+    path :
+        File path given to build_index()
+    chunk :
+        Number of symbols fetched and held in memory at once
+
+    Returned Variables [1]
+    ----------------------
+    <int> :
+        The number of periods added.
+    """
+
+    with open(_meta_path(path)) as f:
+        meta = json.load(f)
+    calendar = scr.get_history(meta['calendar_symbol'], meta['interval'], meta['start_date'])
+    if (calendar == -1):
+        raise ValueError("could not download the calendar symbol " + meta['calendar_symbol'])
+    calendar_dates = sc_panel.to_series(calendar)['date']
+    new_dates = calendar_dates[calendar_dates > meta['dates'][-1]]
+    symbols = meta['symbols']
+    n_stored = len(meta['dates']) - 1
+    redo = 1 if n_stored > 0 else 0
+    dates = np.r_[meta['dates'][-1-redo:], new_dates]
+    # The last stored return is recomputed along with the new ones
+
+    returns = np.empty((redo + len(new_dates), len(symbols)))
+    for first in range(0, len(symbols), chunk):
+        batch = symbols[first:first+chunk]
+        histories = scr.get_histories(batch, meta['interval'], meta['start_date'])
+        returns[:, first:first+len(batch)] = _aligned_returns(histories, batch, dates)
+
+    old_mean, old_std = np.asarray(meta['mean']), np.asarray(meta['std'])
+    total, total_sq, count = np.asarray(meta['sum']), np.asarray(meta['sumsq']), np.asarray(meta['count'])
+    if redo:
+        if 'last' in meta:
+            stale = np.array([np.nan if v is None else v for v in meta['last']], dtype=np.float64)
+        else:
+            z = np.asarray(open_index(path)[0][-1], dtype=np.float64)
+            stale = np.where(z == 0, np.nan, z*old_std + old_mean)
+        # Indexes written before 'last' was kept only have the standardized row to go on
+        observed = ~np.isnan(stale)
+        total = total - np.where(observed, stale, 0)
+        total_sq = total_sq - np.where(observed, stale*stale, 0)
+        count = count - observed
+    # Take the stale last row out of the running sums, it is added back below as recomputed
+
+    observed = ~np.isnan(returns)
+    total = total + np.where(observed, returns, 0).sum(axis=0)
+    total_sq = total_sq + np.where(observed, returns*returns, 0).sum(axis=0)
+    count = count + observed.sum(axis=0)
+    n_periods = n_stored + len(new_dates)
+
+    z = _standardize(returns, old_mean, old_std)
+    if redo:
+        matrix = np.memmap(path, dtype=np.float32, mode='r+', shape=(n_stored, len(symbols)))
+        matrix[-1] = z[0]
+        matrix.flush()
+        del matrix
+    with open(path, 'ab') as f:
+        f.write(z[redo:].tobytes())
+    # Time-major, so the new periods are just more rows at the end of the file
+    meta['dates'] += [int(d) for d in new_dates]
+    if len(returns):
+        meta['last'] = _raw_row(returns[-1])
+
+    mean, std = _moments(total, total_sq, count, n_periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drift = np.where(old_std > 0, np.maximum(np.abs(mean - old_mean)/old_std, np.abs(std/old_std - 1)), 0)
+    if (drift.max(initial=0) > drift_tolerance):
+        matrix = np.memmap(path, dtype=np.float32, mode='r+', shape=(n_periods, len(symbols)))
+        scale = (old_std/np.where(std > 0, std, np.inf)).astype(np.float32)
+        shift = ((old_mean - mean)/np.where(std > 0, std, np.inf)).astype(np.float32)
+        rows = max(1, (64*1024*1024)//(4*max(len(symbols), 1)))
+        for first in range(0, n_periods, rows):
+            block = matrix[first:first+rows]
+            matrix[first:first+rows] = np.where(block == 0, block, block*scale + shift)
+        matrix.flush()
+        del matrix
+        old_mean, old_std = mean, std
+        # z' = (z*s + m - m')/s', an in-place affine fix per column, no re-download needed.
+        # Missing cells are 0 and stay 0, ie. at the new mean.
+
+    meta['sum'], meta['sumsq'], meta['count'] = total.tolist(), total_sq.tolist(), count.tolist()
+    meta['mean'], meta['std'] = np.asarray(old_mean).tolist(), np.asarray(old_std).tolist()
+    _write_meta(path, meta)
+    return len(new_dates)
@@ -0,0 +1,177 @@
+"""
+======================================================
+Local-file price history source (CSV/Parquet on disk).
+======================================================
+
+sc_local_source.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: reads price histories from a directory of vendor end-of-day files instead of
+ the Tradier API. Selected with dict['data_source'] = 'local' in sc_settings.py. Files are
+ looked up as <data_dir>/<interval>/<SYMBOL>.parquet or .csv, and for daily data also as
+ <data_dir>/<SYMBOL>.parquet or .csv. Columns are read straight into the same dict-of-arrays
+ series that sc_series.py uses, without building a dict per bar.
+
+ CSV files need a header row. Column names are matched case-insensitively: 'date' (or
+ 'timestamp'), 'open', 'high', 'low', 'close', 'volume'. Only 'date' and 'close' are required.
+ Parquet files are memory-mapped and need the optional pyarrow package.
+
+"""
+
+import os
+
+import numpy as np
+
+import sc_series
+
+extensions = ('.parquet', '.csv')
+# Checked in this order, so a Parquet copy of a file wins over the CSV
+
+
+def find_file(symbol, interval, data_dir):
+    """
+    Locate the file holding a symbol's history.
+
+    Returned Variables [1]
+    ----------------------
+    <str> or None :
+        The path, or None if there is no file for the symbol.
+    """
+
+    folders = [os.path.join(data_dir, interval)]
+    if (interval == 'daily'):
+        folders.append(data_dir)
+    # Top-level files are taken to be daily bars, the usual vendor layout
+
+    for folder in folders:
+        for ext in extensions:
+            path = os.path.join(folder, symbol.upper() + ext)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def _dates_to_int(values):
+    """ Convert a date column (datetime64, YYYYMMDD integers or date strings) to int32 YYYYMMDD. """
+
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        days = values.astype('datetime64[D]')
+        months = days.astype('datetime64[M]')
+        years = months.astype('datetime64[Y]').astype(np.int64) + 1970
+        month = months.astype(np.int64) % 12 + 1
+        day = (days - months).astype(np.int64) + 1
+        return (years*10000 + month*100 + day).astype(np.int32)
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int32)
+    return np.char.replace(values.astype(str), '-', '').astype('U8').astype(np.int32)
+    # '2019-01-02' or '2019-01-02T00:00:00' -> '20190102' -> 20190102
+
+
+def _date_column(names):
+    for name in ('date', 'timestamp'):
+        if name in names:
+            return name
+    return None
+
+
+def read_csv(path):
+    """
+    Read a CSV history file into a columnar series.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dict of arrays. 'date' is int32 YYYYMMDD, every other field is float64.
+    """
+
+    with open(path, encoding='utf-8') as f:
+        header = [name.strip().lower() for name in f.readline().split(',')]
+
+    date_name = _date_column(header)
+    if (date_name is None or 'close' not in header):
+        raise ValueError(path + " needs a 'date' and a 'close' column")
+
+    columns = [date_name] + [field for field in sc_series.fields if field in header]
+    usecols = [header.index(name) for name in columns]
+
+    data = np.loadtxt(path, delimiter=',', skiprows=1, usecols=usecols, ndmin=2, dtype=np.float64,
+                      converters={usecols[0]: lambda s: s.replace('-', '')[0:8]})
+    # numpy parses the file in C; the date converter just strips 2019-01-02 down to 20190102
+
+    series = {'date': data[:, 0].astype(np.int32)}
+    for i, name in enumerate(columns[1:], 1):
+        series[name] = data[:, i]
+    return series
+
+
+def read_parquet(path):
+    """
+    Read a Parquet history file into a columnar series, memory-mapping the file.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dict of arrays. 'date' is int32 YYYYMMDD, every other field is float64.
+    """
+
+    import pyarrow.parquet as pq
+    # Optional dependency, only needed when the data directory holds Parquet files
+
+    names = {name.lower(): name for name in pq.read_schema(path).names}
+    date_name = _date_column(names)
+    if (date_name is None or 'close' not in names):
+        raise ValueError(path + " needs a 'date' and a 'close' column")
+
+    columns = [date_name] + [field for field in sc_series.fields if field in names]
+    table = pq.read_table(path, columns=[names[name] for name in columns], memory_map=True)
+
+    series = {'date': _dates_to_int(table.column(0).to_numpy())}
+    for i, name in enumerate(columns[1:], 1):
+        series[name] = table.column(i).to_numpy().astype(np.float64)
+    return series
+
+
+def load_series(symbol, interval, start_date, data_dir):
+    """
+    Load a symbol's history from the data directory.
+
+    Parameters
+    ----------
+    symbol :
+        Stock ticker
+    interval :
+        'daily', 'weekly', or 'monthly'
+    start_date :
+        A date string in %Y-%m-d format (eg. 2019-01-01)
+    data_dir :
+        The directory of history files
+
+    Returned Variables [1]
+    ----------------------
+    <dict> or int :
+        The columnar series from start_date on, in date order with every
+        field present (missing ones are NaN). -1 if there is no file for
+        the symbol or it has no bars after start_date.
+    """
+
+    path = find_file(symbol, interval, data_dir)
+    if path is None:
+        return -1
+
+    series = read_parquet(path) if path.endswith('.parquet') else read_csv(path)
+
+    n = len(series['date'])
+    for field in sc_series.fields:
+        if field not in series:
+            series[field] = np.full(n, np.nan)
+
+    if np.any(np.diff(series['date']) < 0):
+        order = np.argsort(series['date'], kind='stable')
+        series = {key: val[order] for key, val in series.items()}
+    # Vendor files are usually in date order but don't have to be
+
+    series = sc_series.slice_from(series, start_date)
+    if (sc_series.length(series) == 0):
+        return -1
+    return series
@@ -0,0 +1,239 @@
+"""
+==========================================================================
+Out-of-core correlation and beta matrices for a large universe of symbols.
+==========================================================================
+
+sc_matrix.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: computes the full pairwise correlation and beta matrices for thousands of
+ symbols without holding them in memory. Returns live in a memory-mapped float32 store
+ (one row per symbol, aligned to a calendar symbol's dates), the matrices are computed
+ tile by tile and written to memory-mapped float32 files. Peak RAM is set by the tile
+ size, not the universe size. Optional Ledoit-Wolf shrinkage of the correlations towards
+ the identity helps when the history is short relative to the number of symbols.
+
+Missing returns (a symbol that didn't trade, or listed later) are treated as the symbol's
+mean return, ie. they contribute nothing to any covariance.
+
+"""
+
+import json
+
+import numpy as np
+
+import sc_panel
+import sc_request_manager as scr
+
+
+def _meta_path(path):
+    return path + '.json'
+
+
+def create_return_store(path, symbols, dates):
+    """
+    Create an empty memory-mapped return store.
+
+    Parameters
+    ----------
+    path :
+        File path for the float32 return matrix. Metadata goes to <path>.json
+    symbols :
+        <list> of N tickers, one per row
+    dates :
+        (T) int YYYYMMDD dates, the end date of each return period
+
+    Returned Variables [1]
+    ----------------------
+    <numpy.memmap> :
+        (N x T) float32 matrix open for writing, filled with NaN.
+    """
+
+    store = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32,
+                                      shape=(len(symbols), len(dates)))
+    store[:] = np.nan
+
+    with open(_meta_path(path), 'w') as f:
+        json.dump({'symbols': list(symbols), 'dates': [int(d) for d in dates]}, f)
+
+    return store
+
+
+def open_return_store(path, mode='r'):
+    """
+    Open an existing return store.
+
+    Parameters
+    ----------
+    path :
+        File path given to create_return_store()
+    mode :
+        'r' for read-only, 'r+' to update in place
+
+    Returned Variables [2]
+    ----------------------
+    <numpy.memmap> :
+        (N x T) float32 return matrix.
+    <dict> :
+        Metadata with keys 'symbols' and 'dates'.
+    """
+
+    with open(_meta_path(path)) as f:
+        meta = json.load(f)
+    return np.load(path, mmap_mode=mode), meta
+
+
+def build_return_store(path, symbols, interval, start_date, calendar_symbol='SPY', chunk=64):
+    """
+    Download the histories for a universe and write their returns into a
+    memory-mapped store, one chunk of symbols at a time.
+
+    Parameters
+    ----------
+    path :
+        File path for the store
+    symbols :
+        <list> of tickers
+    interval :
+        'daily', 'weekly', or 'monthly'
+    start_date :
+        A date string in %Y-%m-d format (eg. 2019-01-01)
+    calendar_symbol :
+        Ticker whose bar dates define the shared date axis
+    chunk :
+        Number of symbols fetched and held in memory at once
+
+    Returned Variables [1]
+    ----------------------
+    <list> :
+        The tickers that could not be downloaded (their rows stay NaN).
+    """
+
+    calendar = scr.get_history(calendar_symbol, interval, start_date)
+    if (calendar == -1):
+        raise ValueError("could not download the calendar symbol " + calendar_symbol)
+    dates = sc_panel.to_series(calendar)['date']
+
+    store = create_return_store(path, symbols, dates[1:])
+    failed = []
+
+    for first in range(0, len(symbols), chunk):
+        batch = symbols[first:first+chunk]
+        histories = scr.get_histories(batch, interval, start_date)
+        for row, symbol in enumerate(batch, start=first):
+            if (histories[symbol] == -1):
+                failed.append(symbol)
+                continue
+            closes = sc_panel.align_to_dates(histories[symbol], dates)
+            store[row] = closes[1:]/closes[:-1] - 1
+            # NaN wherever either end of the period is missing
+        store.flush()
+
+    return failed
+
+
+def _row_moments(store, tile):
+    n_rows, n_periods = store.shape
+    means = np.empty(n_rows)
+    stds = np.empty(n_rows)
+    for first in range(0, n_rows, tile):
+        block = np.asarray(store[first:first+tile], dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            mean = np.nanmean(block, axis=1)
+        mean = np.where(np.isnan(mean), 0, mean)
+        dev = np.where(np.isnan(block), 0, block - mean[:, None])
+        means[first:first+tile] = mean
+        stds[first:first+tile] = np.sqrt((dev*dev).sum(axis=1)/(n_periods-1))
+    return means, stds
+
+
+def _standardized(store, first, tile, means, stds):
+    block = np.asarray(store[first:first+tile], dtype=np.float64)
+    rows = slice(first, first + block.shape[0])
+    z = (block - means[rows, None])/np.where(stds[rows] > 0, stds[rows], np.inf)[:, None]
+    return np.where(np.isnan(z), 0, z)
+    # Missing returns sit at the mean, constant rows standardize to zero
+
+
+def correlation_matrix(store_path, out_prefix, tile=512, shrinkage=False):
+    """
+    Compute the full correlation and beta matrices tile by tile.
+
+    Parameters
+    ----------
+    store_path :
+        Path of a store from create_return_store()/build_return_store()
+    out_prefix :
+        Output files are <out_prefix>_corr.npy and <out_prefix>_beta.npy
+    tile :
+        Number of symbols per tile. Peak memory is about
+        2*tile*T + 4*tile*tile float64 values.
+    shrinkage :
+        Shrink the off-diagonal correlations (and so the betas) towards
+        zero by the Ledoit-Wolf optimal intensity for an identity target.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys 'corr' and 'beta' (paths to the (N x N)
+        float32 .npy outputs, openable with np.load(path, mmap_mode='r')),
+        and 'shrinkage' (the intensity used, 0 if disabled). beta[i, j] is
+        the beta of symbol i against symbol j.
+    """
+
+    store, meta = open_return_store(store_path)
+    n_rows, n_periods = store.shape
+    means, stds = _row_moments(store, tile)
+
+    corr_path = out_prefix + '_corr.npy'
+    beta_path = out_prefix + '_beta.npy'
+    corr = np.lib.format.open_memmap(corr_path, mode='w+', dtype=np.float32, shape=(n_rows, n_rows))
+    beta = np.lib.format.open_memmap(beta_path, mode='w+', dtype=np.float32, shape=(n_rows, n_rows))
+
+    pi_sum = 0.0
+    gamma_sum = 0.0
+    # Ledoit-Wolf accumulators: variance of the sample correlations, distance from the target
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i in range(0, n_rows, tile):
+            zi = _standardized(store, i, tile, means, stds)
+            ri = slice(i, i + zi.shape[0])
+
+            for j in range(i, n_rows, tile):
+                zj = zi if (j == i) else _standardized(store, j, tile, means, stds)
+                rj = slice(j, j + zj.shape[0])
+
+                c = zi @ zj.T/(n_periods-1)
+                corr[ri, rj] = c
+                corr[rj, ri] = c.T
+                beta[ri, rj] = c*stds[ri, None]/stds[None, rj]
+                beta[rj, ri] = c.T*stds[rj, None]/stds[None, ri]
+                # Each tile pair is computed once and written to both triangles
+
+                if shrinkage:
+                    s = c*(n_periods-1)/n_periods
+                    pi = (zi*zi) @ (zj*zj).T/n_periods - s*s
+                    off_diag = np.ones_like(s, dtype=bool)
+                    if (i == j):
+                        np.fill_diagonal(off_diag, False)
+                    weight = 1 if (i == j) else 2
+                    # Off-diagonal tiles stand in for their mirror image too
+                    pi_sum += weight*pi[off_diag].sum()
+                    gamma_sum += weight*(s[off_diag]**2).sum()
+
+    intensity = 0.0
+    if (shrinkage and gamma_sum > 0):
+        intensity = min(1.0, max(0.0, pi_sum/(n_periods*gamma_sum)))
+
+        for i in range(0, n_rows, tile):
+            ri = slice(i, min(i + tile, n_rows))
+            corr[ri] *= (1 - intensity)
+            beta[ri] *= (1 - intensity)
+            for k in range(ri.start, ri.stop):
+                corr[k, k] = 1.0
+                beta[k, k] = 1.0
+            # Shrink the off-diagonals only, the diagonal is the target's own 1.0
+
+    corr.flush()
+    beta.flush()
+    return {'corr': corr_path, 'beta': beta_path, 'shrinkage': intensity}
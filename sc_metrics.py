@@ -0,0 +1,218 @@
+"""
+=========================================================
+Lightweight timers and counters for the hot code paths.
+=========================================================
+
+sc_metrics.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: collects request latency and bytes, cache hits and misses, and per-stage wall
+ time so a slow run can be broken down. Off by default: until enable() is called, timer()
+ hands back one shared do-nothing context manager and increment()/observe() return straight
+ away, so leaving the calls in the hot paths costs next to nothing. The collected numbers can
+ be printed as a table or written out as JSON or Prometheus text format.
+
+Usage:
+    import sc_metrics as scm
+    with scm.timer('stage', stage='fetch'):
+        ...
+    scm.increment('cache_lookups', result='hit')
+
+"""
+
+import json
+import sys
+import threading
+import time
+
+enabled = False
+
+_lock = threading.Lock()
+_counters = {}
+_timers = {}
+# Keyed by (name, ((label, value), ...)). Timers hold [count, total seconds, max seconds]
+
+
+def enable(on=True):
+    """ Turn collection on (or off with on=False). """
+    global enabled
+    enabled = on
+
+
+def reset():
+    """ Forget everything collected so far. """
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def increment(name, value=1, **labels):
+    """ Add value to a counter. Does nothing while collection is off. """
+    if not enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    """ Record one duration for a timer. Does nothing while collection is off. """
+    if not enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        stats = _timers.get(key)
+        if stats is None:
+            _timers[key] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Timer:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+_null_timer = _NullTimer()
+
+
+def timer(name, **labels):
+    """
+    Context manager that records how long its block took.
+
+    Parameters
+    ----------
+    name :
+        Timer name, eg. 'http_request'
+    labels :
+        Optional labels to split the timer by, eg. stage='fetch'
+
+    Returned Variables [1]
+    ----------------------
+    <context manager> :
+        A shared no-op one while collection is off.
+    """
+
+    if not enabled:
+        return _null_timer
+    return _Timer(name, labels)
+
+
+def _label_text(labels):
+    return ','.join("%s=%s" % (key, val) for key, val in labels)
+
+
+def snapshot():
+    """
+    Copy of everything collected so far.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys:
+        'counters' : <list> of {'name', 'labels', 'value'}
+        'timers'   : <list> of {'name', 'labels', 'count', 'total_s', 'mean_s', 'max_s'}
+    """
+
+    with _lock:
+        counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(_counters.items())]
+        timers = [{'name': name, 'labels': dict(labels), 'count': count, 'total_s': total,
+                   'mean_s': total/count, 'max_s': longest}
+                  for (name, labels), (count, total, longest) in sorted(_timers.items())]
+    return {'counters': counters, 'timers': timers}
+
+
+def print_summary(file=sys.stderr):
+    """ Print the timers and counters as a table. """
+
+    snap = snapshot()
+    print("", file=file)
+    print("%-34s %8s %11s %11s %11s" % ('Timer', 'Count', 'Total (s)', 'Mean (ms)', 'Max (ms)'), file=file)
+    for t in snap['timers']:
+        name = t['name'] + ('[' + _label_text(t['labels'].items()) + ']' if t['labels'] else '')
+        print("%-34s %8d %11.3f %11.2f %11.2f" % (name, t['count'], t['total_s'],
+                                                  t['mean_s']*1000, t['max_s']*1000), file=file)
+    if snap['counters']:
+        print("%-34s %8s" % ('Counter', 'Value'), file=file)
+    for c in snap['counters']:
+        name = c['name'] + ('[' + _label_text(c['labels'].items()) + ']' if c['labels'] else '')
+        print("%-34s %8g" % (name, c['value']), file=file)
+
+
+def to_prometheus(prefix='sc_'):
+    """
+    Format everything collected in the Prometheus text exposition format.
+    Timers become summaries (<name>_seconds_count/_sum, plus a _max gauge)
+    and counters become <name>_total.
+
+    Returned Variables [1]
+    ----------------------
+    <str> :
+        The metrics text.
+    """
+
+    def labels_text(labels):
+        if not labels:
+            return ''
+        return '{' + ','.join('%s="%s"' % (key, str(val).replace('\\', '\\\\').replace('"', '\\"'))
+                              for key, val in sorted(labels.items())) + '}'
+
+    snap = snapshot()
+    lines = []
+    names = list(dict.fromkeys(t['name'] for t in snap['timers']))
+    for timer_name in names:
+        name = prefix + timer_name + '_seconds'
+        group = [t for t in snap['timers'] if t['name'] == timer_name]
+        lines.append('# TYPE %s summary' % name)
+        for t in group:
+            lines.append('%s_count%s %d' % (name, labels_text(t['labels']), t['count']))
+            lines.append('%s_sum%s %.9g' % (name, labels_text(t['labels']), t['total_s']))
+        lines.append('# TYPE %s_max gauge' % name)
+        for t in group:
+            lines.append('%s_max%s %.9g' % (name, labels_text(t['labels']), t['max_s']))
+    # Each metric family has to be listed in one block
+
+    for counter_name in dict.fromkeys(c['name'] for c in snap['counters']):
+        name = prefix + counter_name + '_total'
+        lines.append('# TYPE %s counter' % name)
+        for c in snap['counters']:
+            if (c['name'] == counter_name):
+                lines.append('%s%s %.9g' % (name, labels_text(c['labels']), c['value']))
+    return '\n'.join(lines) + '\n'
+
+
+def write(path):
+    """
+    Write everything collected to a file: Prometheus text format for a
+    .prom or .txt path, JSON otherwise.
+    """
+
+    with open(path, 'w') as f:
+        if path.lower().endswith(('.prom', '.txt')):
+            f.write(to_prometheus())
+        else:
+            json.dump(snapshot(), f, indent=2)
@@ -0,0 +1,134 @@
+"""
+=====================================================================
+Date-aligned price panel for the symbol and benchmark price histories.
+=====================================================================
+
+sc_panel.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: joins every downloaded history on date into one NumPy panel (an int YYYYMMDD
+ date vector plus a float close matrix with one row per symbol) so that returns line up
+ period-by-period before anything is correlated. A benchmark with a missing or extra bar
+ used to silently shift every return after it.
+
+"""
+
+import numpy as np
+
+import sc_series
+
+
+def to_series(history):
+    """
+    Accept either history format and return the columnar one.
+
+    Parameters
+    ----------
+    history :
+        The list-of-dicts returned by sc_request_manager.get_history() or a
+        columnar series dict (see sc_series.py).
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        The columnar series.
+    """
+
+    if isinstance(history, dict) and 'date' in history and not isinstance(history['date'], str):
+        return history
+    return sc_series.from_bars(history)
+
+
+def build_panel(histories):
+    """
+    Inner-join a set of histories on date.
+
+    Parameters
+    ----------
+    histories :
+        <dict> mapping a label (usually the ticker) to its history. Rows of
+        the panel follow the order of the dict.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys:
+        'labels' : <list> of row labels
+        'dates'  : (T) int32 YYYYMMDD dates present in every history
+        'closes' : (K x T) float64 closing prices
+    """
+
+    labels = list(histories.keys())
+    series = [to_series(histories[label]) for label in labels]
+
+    dates = series[0]['date']
+    for s in series[1:]:
+        dates = np.intersect1d(dates, s['date'])
+    # Only keep the periods that every series has a bar for
+
+    closes = np.empty((len(series), len(dates)), dtype=np.float64)
+    for row, s in enumerate(series):
+        order = np.argsort(s['date'], kind='stable')
+        closes[row] = s['close'][order][np.searchsorted(s['date'], dates, sorter=order)]
+    # Pull each series' closes onto the shared date axis
+
+    return {'labels': labels, 'dates': dates.astype(np.int32), 'closes': closes}
+
+
+def align_to_dates(history, dates):
+    """
+    Pull a history's closing prices onto a fixed date axis, leaving NaN
+    wherever the history has no bar. Used when the date axis comes from a
+    calendar symbol rather than from an inner join.
+
+    Parameters
+    ----------
+    history :
+        The history (list-of-dicts or columnar series)
+    dates :
+        (T) int YYYYMMDD dates to align to, sorted ascending
+
+    Returned Variables [1]
+    ----------------------
+    <ndarray> :
+        (T) float64 closing prices, NaN where missing.
+    """
+
+    s = to_series(history)
+    closes = np.full(len(dates), np.nan)
+    found = np.searchsorted(s['date'], dates)
+    found_ok = found < len(s['date'])
+    found_ok[found_ok] = s['date'][found[found_ok]] == np.asarray(dates)[found_ok]
+    closes[found_ok] = s['close'][found[found_ok]]
+
+    return closes
+
+
+def panel_returns(panel):
+    """
+    Take the closing prices in the panel and convert them to percent change
+    data + calculate the percent return of each row.
+
+    Parameters
+    ----------
+    panel :
+        <dict> returned from build_panel()
+
+    Returned Variables [2]
+    ----------------------
+    <ndarray> :
+        (K x T-1) percent change data for each row of the panel.
+    <ndarray> :
+        Length K percent return of each row over the time period.
+    """
+
+    closes = panel['closes']
+    returns = closes[:, 1:]/closes[:, :-1] - 1
+    performance = closes[:, -1]/closes[:, 0] - 1
+
+    return returns, performance
+
+
+def row(panel, label):
+    """ Index of a label in the panel. """
+    return panel['labels'].index(label)
@@ -0,0 +1,350 @@
+"""
+==========================================================================
+Run the per-symbol statistics for a large universe across a process pool.
+==========================================================================
+
+sc_parallel.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: the statistics in sc_analysis, sc_bootstrap and sc_rolling are independent from
+ one symbol to the next, so a big universe can be split into chunks of rows and spread over
+ every core. The aligned (N x T) return matrix and the benchmark data are copied into shared
+ memory once; each worker maps the same memory as a numpy array when it starts, so a task is
+ only (task, first row, last row) and nothing large is ever pickled. Workers write their rows
+ straight into preallocated shared output arrays, which are copied out once at the end.
+
+ Workers are started with 'spawn' and one BLAS thread each, so N workers don't each start a
+ BLAS thread per core and fight over them. Small jobs run in the calling process, where
+ starting a pool would cost more than it saves.
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import multiprocessing
+from multiprocessing import shared_memory
+import os
+
+import numpy as np
+
+import sc_analysis
+
+min_work = 200_000_000
+# Below ~200M multiply-adds a single process is done in well under a second
+
+chunks_per_process = 4
+# More chunks than workers so a slow chunk doesn't leave the other cores idle
+
+blas_threads = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS')
+
+_shared = {}
+_handles = []
+# In a worker: array name -> view onto the parent's shared memory, and the open segments
+
+
+def _attach(specs):
+    """ Pool initializer: map every shared array once per worker. """
+
+    for name, (segment, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=segment)
+        _handles.append(shm)
+        _shared[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _run_chunk(job):
+    task, start, stop, args = job
+    task(_shared, start, stop, *args)
+
+
+@contextlib.contextmanager
+def _one_blas_thread():
+    """ Environment for spawning workers: one BLAS thread each unless set already. """
+
+    saved = {name: os.environ.get(name) for name in blas_threads}
+    for name in blas_threads:
+        os.environ.setdefault(name, '1')
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def default_processes(work):
+    """
+    Number of worker processes for a job of roughly work multiply-adds:
+    1 for small jobs, otherwise one per CPU.
+    """
+
+    return 1 if work < min_work else (os.cpu_count() or 1)
+
+
+def map_rows(task, inputs, outputs, n_rows, args=(), processes=None, chunk=None):
+    """
+    Run task over chunks of rows, in a process pool that shares the inputs
+    and outputs instead of copying them.
+
+    Parameters
+    ----------
+    task :
+        Module-level function task(arrays, start, stop, *args) that fills
+        rows start:stop of the output arrays in arrays. It is also called
+        (once, for all rows) when the job runs in this process.
+    inputs :
+        <dict> of name to ndarray, read-only in the workers
+    outputs :
+        <dict> of name to (shape, dtype). Each output's first axis is the rows.
+    n_rows :
+        <int> Number of rows to split into chunks
+    args :
+        <tuple> Extra (small) arguments passed on to every task call
+    processes :
+        Worker processes. Default: one per CPU.
+    chunk :
+        <int> Rows per task. Default: about chunks_per_process tasks per worker.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        Name to filled output array, one for each of outputs.
+    """
+
+    processes = min(processes or os.cpu_count() or 1, max(n_rows, 1))
+    if (processes == 1):
+        arrays = dict(inputs)
+        arrays.update({name: np.empty(shape, dtype=dtype) for name, (shape, dtype) in outputs.items()})
+        if n_rows:
+            task(arrays, 0, n_rows, *args)
+        return {name: arrays[name] for name in outputs}
+
+    if chunk is None:
+        chunk = -(-n_rows//(chunks_per_process*processes))
+    segments = []
+    specs = {}
+    views = {}
+    try:
+        for name, array in inputs.items():
+            array = np.ascontiguousarray(array)
+            segments.append(shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1)))
+            views[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=segments[-1].buf)
+            views[name][...] = array
+            specs[name] = (segments[-1].name, array.shape, array.dtype.str)
+        # The one copy of the inputs
+        for name, (shape, dtype) in outputs.items():
+            dtype = np.dtype(dtype)
+            segments.append(shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape))*dtype.itemsize, 1)))
+            views[name] = np.ndarray(shape, dtype=dtype, buffer=segments[-1].buf)
+            specs[name] = (segments[-1].name, tuple(shape), dtype.str)
+        # Preallocated outputs, every worker writes its own rows in place
+
+        jobs = [(task, start, min(start + chunk, n_rows), args) for start in range(0, n_rows, chunk)]
+        with _one_blas_thread():
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_attach, initargs=(specs,)) as pool:
+                for _ in pool.map(_run_chunk, jobs):
+                    pass
+
+        result = {name: views[name].copy() for name in outputs}
+    finally:
+        views.clear()
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    return result
+
+
+def _stats_from(arrays, years, rfr):
+    return {'centered': arrays['centered'], 'var': arrays['var'], 'excess': arrays['excess'],
+            'years': years, 'rfr': rfr}
+
+
+def _alpha_beta_task(arrays, start, stop, years, rfr):
+    betas, alphas = sc_analysis.alpha_beta_matrix(arrays['returns'][start:stop], arrays['performance'][start:stop],
+                                                  _stats_from(arrays, years, rfr))
+    arrays['betas'][start:stop] = betas
+    arrays['alphas'][start:stop] = alphas
+
+
+def parallel_alpha_beta(symbol_returns, symbol_performance, stats, processes=None, chunk=None):
+    """
+    sc_analysis.alpha_beta_matrix() for a large universe, split by symbol.
+
+    Parameters
+    ----------
+    symbol_returns :
+        (N x T) array-like of percent change data, aligned with the benchmarks
+    symbol_performance :
+        Length N array-like of total percent returns for each symbol
+    stats :
+        <dict> returned from sc_analysis.benchmark_stats()
+    processes :
+        Worker processes. Default: one per CPU for large jobs, none for small ones.
+    chunk :
+        <int> Symbols per task.
+
+    Returned Variables [2]
+    ----------------------
+    <ndarray> :
+        (N x M) matrix of betas.
+    <ndarray> :
+        (N x M) matrix of annualized alphas.
+    """
+
+    returns = np.atleast_2d(np.asarray(symbol_returns, dtype=np.float64))
+    n_symbols, n_periods = returns.shape
+    n_benchmarks = len(stats['var'])
+    if processes is None:
+        processes = default_processes(n_symbols*n_periods*n_benchmarks)
+
+    out = map_rows(_alpha_beta_task,
+                   {'returns': returns, 'performance': np.asarray(symbol_performance, dtype=np.float64).ravel(),
+                    'centered': stats['centered'], 'var': stats['var'],
+                    'excess': np.asarray(stats['excess'], dtype=np.float64)},
+                   {'betas': ((n_symbols, n_benchmarks), np.float64), 'alphas': ((n_symbols, n_benchmarks), np.float64)},
+                   n_symbols, (stats['years'], stats['rfr']), processes, chunk)
+    return out['betas'], out['alphas']
+
+
+def _correlation_task(arrays, start, stop):
+    z = arrays['standardized']
+    arrays['corr'][start:stop] = z[start:stop] @ z.T
+    # Rows of z are scaled so that a dot product is a correlation
+
+
+def parallel_correlation(returns, processes=None, chunk=None):
+    """
+    Correlation matrix of every symbol against every other, split by rows.
+    For a matrix too large to hold in memory use sc_matrix.py instead.
+
+    Parameters
+    ----------
+    returns :
+        (N x T) array-like of percent change data, aligned and without gaps
+    processes :
+        Worker processes. Default: one per CPU for large jobs, none for small ones.
+    chunk :
+        <int> Rows per task.
+
+    Returned Variables [1]
+    ----------------------
+    <ndarray> :
+        (N x N) correlation matrix, NaN for symbols whose returns are flat.
+    """
+
+    returns = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    n_symbols, n_periods = returns.shape
+    centered = returns - returns.mean(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        standardized = centered/np.sqrt(np.einsum('ij,ij->i', centered, centered))[:, None]
+    # Standardize once in the parent so each worker only does its block of the product
+
+    if processes is None:
+        processes = default_processes(n_symbols*n_symbols*n_periods)
+    return map_rows(_correlation_task, {'standardized': standardized},
+                    {'corr': ((n_symbols, n_symbols), np.float64)}, n_symbols,
+                    processes=processes, chunk=chunk)['corr']
+
+
+_bootstrap_keys = ('beta_low', 'beta_high', 'alpha_low', 'alpha_high', 'beta_se', 'alpha_se')
+
+
+def _bootstrap_task(arrays, start, stop, years, rfr, n_resamples, block_length, ci, seed):
+    import sc_bootstrap
+
+    result = sc_bootstrap.bootstrap_alpha_beta(arrays['returns'][start:stop], arrays['benchmarks'], years, rfr,
+                                               n_resamples=n_resamples, block_length=block_length, ci=ci,
+                                               seed=seed, processes=1)
+    for key in _bootstrap_keys:
+        arrays[key][start:stop] = result[key]
+
+
+def parallel_bootstrap(symbol_returns, benchmark_returns, years, rfr, n_resamples=1000,
+                       block_length=None, ci=0.95, seed=None, processes=None, chunk=None):
+    """
+    sc_bootstrap.bootstrap_alpha_beta() for a large universe, split by symbol.
+    Every chunk draws the same resamples from the same seed, so the results
+    don't depend on how the symbols were split (or whether they were).
+
+    Parameters
+    ----------
+    symbol_returns, benchmark_returns, years, rfr, n_resamples, block_length, ci, seed :
+        As for sc_bootstrap.bootstrap_alpha_beta()
+    processes :
+        Worker processes. Default: one per CPU for large jobs, none for small ones.
+    chunk :
+        <int> Symbols per task.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        Same keys as sc_bootstrap.bootstrap_alpha_beta().
+    """
+
+    returns = np.atleast_2d(np.asarray(symbol_returns, dtype=np.float64))
+    benchmarks = np.atleast_2d(np.asarray(benchmark_returns, dtype=np.float64))
+    n_symbols, n_periods = returns.shape
+    if block_length is None:
+        block_length = max(1, int(round(n_periods**(1/3))))
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    # Draw one seed here so every chunk resamples the same periods
+
+    if processes is None:
+        processes = default_processes(n_resamples*n_symbols*n_periods*benchmarks.shape[0])
+    shape = (n_symbols, benchmarks.shape[0])
+    result = map_rows(_bootstrap_task, {'returns': returns, 'benchmarks': benchmarks},
+                      {key: (shape, np.float64) for key in _bootstrap_keys}, n_symbols,
+                      (years, rfr, n_resamples, block_length, ci, seed), processes, chunk)
+    result['n_resamples'] = n_resamples
+    result['block_length'] = block_length
+    result['ci'] = ci
+    return result
+
+
+def _rolling_task(arrays, start, stop, windows, interval, rfr):
+    import sc_rolling
+
+    for i in range(start, stop):
+        result = sc_rolling.rolling_alpha_beta(arrays['returns'][i], arrays['benchmarks'], windows, interval, rfr)
+        for key in ('beta', 'alpha', 'corr'):
+            arrays[key][i] = result[key]
+
+
+def parallel_rolling(symbol_returns, benchmark_returns, windows, interval, rfr, processes=None, chunk=None):
+    """
+    sc_rolling.rolling_alpha_beta() for every symbol in a universe.
+
+    Parameters
+    ----------
+    symbol_returns :
+        (N x T) percent change data, aligned with the benchmarks
+    benchmark_returns, windows, interval, rfr :
+        As for sc_rolling.rolling_alpha_beta()
+    processes :
+        Worker processes. Default: one per CPU for large jobs, none for small ones.
+    chunk :
+        <int> Symbols per task.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys 'windows', 'beta', 'alpha' and 'corr'. Each
+        result is an (N symbols x W windows x M benchmarks x T periods) array.
+    """
+
+    returns = np.atleast_2d(np.asarray(symbol_returns, dtype=np.float64))
+    benchmarks = np.atleast_2d(np.asarray(benchmark_returns, dtype=np.float64))
+    n_symbols, n_periods = returns.shape
+    shape = (n_symbols, len(windows), benchmarks.shape[0], n_periods)
+    if processes is None:
+        processes = default_processes(20*int(np.prod(shape)))
+    # About twenty operations per output value, the prefix sums and the window arithmetic
+
+    result = map_rows(_rolling_task, {'returns': returns, 'benchmarks': benchmarks},
+                      {key: (shape, np.float64) for key in ('beta', 'alpha', 'corr')}, n_symbols,
+                      (list(windows), interval, rfr), processes, chunk)
+    result['windows'] = list(windows)
+    return result
@@ -5,13 +5,24 @@ Plot handling methods for run_correlations.py driver file.
 
 sc_plot_manager.py
 Author: Teddy Rowan @ MySybil.com
-Last Modified: Sept 16, 2020
+Last Modified: October 18, 2026
 Description: Helper code for run_risk_assessment.py. This code abstracts a lot of the plt setup and
  the label making which were repeated and a needless distraction from the main code base.
+ Everything below set_defaults() works on explicit Figure/Axes objects, so the same code
+ draws the interactive chart and the headless charts in sc_render.py. pyplot itself is never
+ imported here; set_defaults() is handed the module by the caller.
 """
 
-import matplotlib.pyplot as plt; plt.rcdefaults()
 import matplotlib.patches as mpatches
+import numpy as np
+
+import gradient_bar as gb
+import sc_analysis as sca
+
+figure_size = (8.4, 4.2)
+subplot_margins = {'left': 0.05, 'top': 0.92, 'right': 0.95}
+# Shared between the pyplot figure and the headless renderer
+
 
 def set_defaults(plt_input):
     """
@@ -33,29 +44,53 @@ def set_defaults(plt_input):
     """
     
     
-    plt_input.rcParams['figure.figsize'] = (8.4, 4.2)
+    plt_input.rcdefaults()
+    # Start from matplotlib's defaults regardless of any local rc file
+
+    plt_input.rcParams['figure.figsize'] = figure_size
     # Default figure size. 2-to-1 width to height
 
-    plt_input.rcParams['figure.subplot.left'] = 0.05
-    plt_input.rcParams['figure.subplot.top'] = 0.92
-    plt_input.rcParams['figure.subplot.right'] = 0.95
+    plt_input.rcParams['figure.subplot.left'] = subplot_margins['left']
+    plt_input.rcParams['figure.subplot.top'] = subplot_margins['top']
+    plt_input.rcParams['figure.subplot.right'] = subplot_margins['right']
     # Position the chart in the figure
         
     fig_out = plt_input.figure()
     ax_out = plt_input.subplot2grid((1,1), (0,0))
     # Assign the outputs to return.
     
+    style_axes(ax_out)
+    
+    return plt_input, fig_out, ax_out;
+
+
+def style_axes(ax_out):
+    """
+    Apply the chart styling (grid, zero-line, legend, no borders) to an axes
+    without touching any pyplot global state.
+    
+    Parameters
+    ----------
+    ax_out :
+        The axes object for the plot.
+        
+    Returned Variables [nil]
+    ------------------------
+    
+    """
+    
     ax_out.xaxis.set_ticks_position('none')
     ax_out.yaxis.set_ticks_position('none')
     # Don't print the tick dashes at the boundaries of the grid
     
-    plt_input.yticks(alpha=0)
+    ax_out.tick_params(axis='y', labelcolor=(0, 0, 0, 0))
     # Don't print the ticks on the vertical axis
     
-    plt_input.box(False)
+    for spine in ax_out.spines.values():
+        spine.set_visible(False)
     # Don't print a border around the plot
     
-    plt_input.grid(color='black', linestyle='-', linewidth=1.5, alpha=0.1, zorder=0)
+    ax_out.grid(color='black', linestyle='-', linewidth=1.5, alpha=0.1, zorder=0)
     # Gridline styling
     
     ax_out.xaxis.grid()
@@ -68,15 +103,101 @@ def set_defaults(plt_input):
     p1patch = mpatches.Patch(color=[0, 0.75, 1.0], label="Beta to benchmark")
     p2patch = mpatches.Patch(color=[0.9, 0, 0.25], label="Negative un-CORR return /yr")
     p3patch = mpatches.Patch(color=[0, 1.0, 0.75], label="Positive un-CORR return /yr")
-    legend = plt.legend(handles=[p1patch, p3patch, p2patch], framealpha=0.25, loc=0, facecolor='white', fontsize=9)
-    plt_input.setp(legend.get_texts(), color='black')    
+    legend = ax_out.legend(handles=[p1patch, p3patch, p2patch], framealpha=0.25, loc=0, facecolor='white', fontsize=9)
+    for text in legend.get_texts():
+        text.set_color('black')
+
+
+def plot_correlations(ax, symbol, beta_values, alpha_values, beta_ci=None, alpha_ci=None):
+    """
+    Draw the full beta/alpha bar chart for a symbol onto an axes styled by
+    set_defaults() or style_axes().
     
-    return plt_input, fig_out, ax_out;
+    Parameters
+    ----------
+    ax :
+        The plot axis.
+    symbol :
+        <str> The ticker, used in the title.
+    beta_values :
+        <dict> of benchmark name to beta
+    alpha_values :
+        <dict> of benchmark name to alpha
+    beta_ci, alpha_ci :
+        Optional <dict>s of benchmark name to a (low, high) confidence
+        interval, drawn as error bars (see sc_bootstrap.py)
+        
+    Returned Variables [nil]
+    ------------------------
+    
+    """
+    
+    sorted_correlations = dict(sorted(beta_values.items(), key = lambda kv:(kv[1], kv[0]), reverse=True))
+    # Sort the betas so that we can plot the benchmarks in order of correlation
+
+    benchmark_ticks = list(sorted_correlations.keys())
+    # Create a list of the tick values in plot-order
+
+    x_positions = np.arange(len(benchmark_ticks))
+    # Array of 0 to N-1 as positions for plotting the columns
+
+    sorted_betas_list = list(sorted_correlations.values())
+    # Extract the beta values for the chart
+
+    sorted_alphas_list = [alpha_values[key] for key in sorted_correlations]
+    # Take the sort order from the betas and sort the alphas to match
+
+    sorted_beta_ci = [beta_ci[key] for key in sorted_correlations] if beta_ci else None
+    sorted_alpha_ci = [alpha_ci[key] for key in sorted_correlations] if alpha_ci else None
+    # Confidence intervals in the same order, if there are any
+
+    extrema = sca.get_component_extrema(sorted_alphas_list, sorted_betas_list)
+    # Determine the (zero-constrained) extrema we will need to know
+
+    colors = sca.get_alpha_colors(sorted_alphas_list, extrema)
+    # Assign a color to each column to be plotted
+
+    if (sorted_beta_ci or sorted_alpha_ci):
+        extrema = sca.get_component_extrema(
+            sorted_alphas_list + [v for ci in (sorted_alpha_ci or []) for v in ci],
+            sorted_betas_list + [v for ci in (sorted_beta_ci or []) for v in ci])
+    # Make room for the error bars too. The colors stay scaled to the point estimates
+
+    bar_w = 0.5
+    # Column width for barchart
+
+    kwargs = dict(width=bar_w-0.1, align='center', alpha=1, zorder=3)
+    # Shared plot settings between alpha/beta columns
+
+    br  = ax.bar(x_positions-bar_w/2+0.03, sorted_betas_list, **kwargs, color=[0, 0.75, 1.0])
+    # Plot the beta columns
+
+    br2 = ax.bar(x_positions+bar_w/2-0.03, sorted_alphas_list, **kwargs, color=colors)
+    # Plot the alpha columns
+
+    gb.overlay_bars(ax, [(br, True), (br2, False)], 5)
+    # Overlay a blue-gradient onto the beta columns and custom red/green gradients
+    # on the alpha columns, all drawn as one image
+
+    reorient_plot(ax, len(sorted_betas_list), extrema['min'], extrema['max'])
+    # Leave room around the columns for the labels
+
+    title_str = 'Benchmark Correlations for ' + symbol
+    customize_plot(title_str, x_positions, benchmark_ticks, ax)
+    # Override the x-ticklabels with benchmark names. Add a title to the figure.
+
+    v_offset = 0.020*(extrema['max']-extrema['min'])
+    # Vertical offset for the labels above/below the columns
+
+    create_labels(v_offset, ax, sorted_betas_list, sorted_alphas_list, sorted_beta_ci, sorted_alpha_ci)
+    # Create the labels above/below the columns
 
 
 def reorient_plot(ax, n_points, y_min, y_max):
     """
-    Reset the window for the plot after gradient_bar() screws up the viewer.
+    Set the window for the plot so the columns and their labels fit. This
+    was needed to repair the viewer after the per-bar gradient_bar()
+    images; overlay_bars() leaves the limits alone.
     
     Parameters
     ----------
@@ -95,18 +216,18 @@ def reorient_plot(ax, n_points, y_min, y_max):
     
     """
     
-    plt.xlim((-0.5, n_points-0.5))
+    ax.set_xlim((-0.5, n_points-0.5))
     # The columns are plotted at x=0,1,2,...,n-1
 
     min_modifier = 0.9 if (y_min > 0) else 1.1
     max_modifier = 1.1 if (y_max > 0) else 0.9
     # Modifier values to set chart limits big enough to show the labels
 
-    plt.ylim((y_min*min_modifier, y_max*max_modifier))
+    ax.set_ylim((y_min*min_modifier, y_max*max_modifier))
     ax.set_aspect('auto')
 
 
-def customize_plot(title, x_ticks, x_tick_titles):
+def customize_plot(title, x_ticks, x_tick_titles, ax=None):
     """
     Graphical customization of the plot based on the data contained. Currently
     this means settings the title for the figure and overriding the tick labels.
@@ -119,18 +240,25 @@ def customize_plot(title, x_ticks, x_tick_titles):
         The list of x_ticks for the figure.
     x_tick_titles :
         The new strings to override the current x_tick_labels        
+    ax :
+        The plot axis. Default: the current pyplot axis.
 
     Returned Variables [nil]
     ------------------------
     
     """
     
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
+    
     titlefont = {'fontname':'DejaVu Sans', 'fontsize':11, 'fontweight':'light'}
-    plt.title(title, color='black', **titlefont)
-    plt.xticks(x_ticks, x_tick_titles, color='black', fontname='DejaVu Sans', fontsize=8)
+    ax.set_title(title, color='black', **titlefont)
+    ax.set_xticks(x_ticks)
+    ax.set_xticklabels(x_tick_titles, color='black', fontname='DejaVu Sans', fontsize=8)
     
 
-def create_labels(offset, ax, betas, alphas):
+def create_labels(offset, ax, betas, alphas, beta_ci=None, alpha_ci=None):
     """
     Create the labels above/below the bars that let us remove the y-ticks 
     and clean up the figure.
@@ -145,6 +273,10 @@ def create_labels(offset, ax, betas, alphas):
         A <list> of the beta/correlations for the benchmarks
     alphas :
         A <list> of the alpha/performance vs the benchmarks
+    beta_ci, alpha_ci :
+        Optional <list>s of (low, high) confidence intervals in the same
+        order as betas/alphas. Drawn as error bars, with the labels moved
+        past the end of each bar.
 
     Returned Variables [nil]
     ------------------------
@@ -156,29 +288,88 @@ def create_labels(offset, ax, betas, alphas):
     sc_green = [0, 1.0, 0.75]
     sc_red   = [0.9, 0, 0.25]
     
+    bar_shift = 0.22
+    # Column centers sit this far either side of each tick (see plot_correlations)
+
+    beta_ends, alpha_ends = list(betas), list(alphas)
+    # Where the labels are anchored: the top/bottom of each column or its error bar
+    for values, cis, ends, shift in ((betas, beta_ci, beta_ends, -bar_shift),
+                                     (alphas, alpha_ci, alpha_ends, bar_shift)):
+        if not cis:
+            continue
+        values = np.asarray(values)
+        low = np.minimum([ci[0] for ci in cis], values)
+        high = np.maximum([ci[1] for ci in cis], values)
+        ax.errorbar(np.arange(len(values)) + shift, values, yerr=[values - low, high - values],
+                    fmt='none', ecolor=[0.35, 0.35, 0.35], elinewidth=0.8, capsize=2, zorder=4)
+        for i, y in enumerate(values):
+            ends[i] = high[i] if (y >= 0) else low[i]
+
     # Generate the labels for the beta columns
-    for x, y in enumerate(betas):
+    for x, (y, end) in enumerate(zip(betas, beta_ends)):
         lbl_text = "{:.2f}".format(y)
         
         if (y >= 0):
-            ax.text(x-0.36, y+1*offset, lbl_text, color=sc_blue, **kwargs)
+            ax.text(x-0.36, end+1*offset, lbl_text, color=sc_blue, **kwargs)
         else:
-            ax.text(x-0.38, y-2*offset, lbl_text, color=sc_blue, **kwargs)
+            ax.text(x-0.38, end-2*offset, lbl_text, color=sc_blue, **kwargs)
 
     # Generate the labels for the uncorrelated returns columns
-    for x, y in enumerate(alphas):
+    for x, (y, end) in enumerate(zip(alphas, alpha_ends)):
         lbl_text = "{:.1f}%".format(100*y)
         
         if (y >= 0):
             """Positve Alpha"""
             if (y > 0.1): #spacing fix
-                ax.text(x+0.06, y+1*offset, lbl_text, color=sc_green, **kwargs)
+                ax.text(x+0.06, end+1*offset, lbl_text, color=sc_green, **kwargs)
             else:
-                ax.text(x+0.08, y+1*offset, lbl_text, color=sc_green, **kwargs)
+                ax.text(x+0.08, end+1*offset, lbl_text, color=sc_green, **kwargs)
         else:
             """Negative Alpha"""
             if (y < -0.1):
-                ax.text(x+0.06, y-2*offset, lbl_text, color=sc_red, **kwargs)
+                ax.text(x+0.06, end-2*offset, lbl_text, color=sc_red, **kwargs)
             else:
-                ax.text(x+0.08, y-2*offset, lbl_text, color=sc_red, **kwargs)
+                ax.text(x+0.08, end-2*offset, lbl_text, color=sc_red, **kwargs)
                 
+
+
+def plot_sweep(ax, symbol, sweep_result, names):
+    """
+    Draw a beta-by-lookback heatmap: one row per start date, one column per
+    benchmark, each cell labelled with its beta and alpha.
+
+    Parameters
+    ----------
+    ax :
+        A plain (unstyled) plot axis.
+    symbol :
+        <str> The ticker, used in the title.
+    sweep_result :
+        <dict> returned from sc_sweep.sweep()
+    names :
+        <list> of benchmark names in the column order of the sweep
+
+    Returned Variables [nil]
+    ------------------------
+
+    """
+
+    betas, alphas = sweep_result['beta'], sweep_result['alpha']
+    limit = np.nanmax(np.abs(betas)) if np.isfinite(betas).any() else 1
+    image = ax.imshow(np.ma.masked_invalid(betas), cmap='RdBu_r', vmin=-limit, vmax=limit, aspect='auto')
+    # Diverging colors centred on a beta of zero
+    ax.figure.colorbar(image, ax=ax, label='Beta')
+
+    for (i, j), beta in np.ndenumerate(betas):
+        if np.isfinite(beta):
+            ax.text(j, i, "{:.2f}\n{:.1f}%".format(beta, 100*alphas[i, j]), ha='center', va='center',
+                    fontsize=7, color='white' if abs(beta) > 0.6*limit else 'black')
+
+    ax.set_yticks(np.arange(len(sweep_result['start_dates'])))
+    ax.set_yticklabels(["%s (%d)" % (first if clamped else d, n) for d, first, clamped, n
+                        in zip(sweep_result['start_dates'], sweep_result['first'], sweep_result['clamped'],
+                               sweep_result['periods'])], fontsize=8)
+    # Windows asked to start before the first bar are labelled with the date they really start
+    ax.set_ylabel('Start date (periods)')
+    customize_plot('Beta and Alpha by Lookback for ' + symbol, np.arange(len(names)),
+                   [name.replace('\n', ' ') for name in names], ax)
@@ -0,0 +1,204 @@
+"""
+=====================================================================
+Portfolio-level and per-position beta, alpha and contribution to beta.
+=====================================================================
+
+sc_portfolio.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: back to where this tool was forked from: a whole portfolio rather than one
+ symbol. Every position's returns are aligned to the benchmark dates in one (N x T) matrix,
+ so the portfolio return series is a single weighted matrix product and the positions'
+ betas and alphas come from one vectorized sc_analysis.alpha_beta_matrix() call. Because a
+ covariance is linear in the weights, the portfolio beta splits exactly into weight x beta
+ per position (the contribution to beta), and a rebalanced set of weights can be evaluated
+ from the same matrix without fetching anything again.
+
+ The portfolio is treated as rebalanced to its weights every period. A position with no
+ return in a period (eg. before it listed) counts as cash for that period.
+
+"""
+
+import csv
+
+import numpy as np
+
+import sc_analysis
+import sc_panel
+
+weight_columns = ('weight', 'value', 'shares')
+# A holdings file needs a symbol column and one of these
+
+
+def load_holdings(path):
+    """
+    Read a holdings CSV file.
+
+    Parameters
+    ----------
+    path :
+        CSV file with a header, a 'symbol' (or 'ticker') column and one of
+        'weight', 'value' or 'shares'. Repeated symbols are added together.
+
+    Returned Variables [2]
+    ----------------------
+    <dict> :
+        Symbol to amount, in file order.
+    <str> :
+        Which column the amounts came from: 'weight', 'value' or 'shares'.
+    """
+
+    with open(path, newline='') as f:
+        reader = csv.DictReader(row for row in f if row.strip() and not row.startswith('#'))
+        header = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+        symbol_col = header.get('symbol', header.get('ticker'))
+        kind = next((col for col in weight_columns if col in header), None)
+        if (symbol_col is None or kind is None):
+            raise ValueError("Holdings file needs a 'symbol' column and one of: " + ', '.join(weight_columns))
+
+        holdings = {}
+        for row in reader:
+            symbol = row[symbol_col].strip().upper()
+            if symbol:
+                holdings[symbol] = holdings.get(symbol, 0.0) + float(row[header[kind]])
+    return holdings, kind
+
+
+def normalize_weights(amounts):
+    """
+    Scale position amounts (weights, values) to weights that sum to 1.
+
+    Returned Variables [1]
+    ----------------------
+    <ndarray> :
+        The weights. Shorts keep their negative sign.
+    """
+
+    amounts = np.asarray(amounts, dtype=np.float64)
+    total = amounts.sum()
+    if (abs(total) < 1e-12):
+        raise ValueError("Position amounts add up to zero, can't turn them into weights")
+    return amounts/total
+
+
+def build_model(histories, symbols, benchmark_tickers, years, rfr):
+    """
+    Align every position with the benchmarks and compute what any set of
+    weights needs: the return matrix and each position's betas and alphas.
+
+    Parameters
+    ----------
+    histories :
+        <dict> of ticker to history (or -1) for the positions and benchmarks
+    symbols :
+        <list> of position tickers
+    benchmark_tickers :
+        <dict> of benchmark name to ticker, all with data
+    years :
+        <float> The duration of the dataset in years.
+    rfr :
+        <float> The risk-free rate in decimal form.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys:
+        'symbols'  : the positions with data, in input order
+        'missing'  : the positions without any data
+        'keys'     : benchmark names, in column order
+        'dates'    : (T+1) the benchmark dates everything is aligned to
+        'returns'  : (N x T) position returns, 0 where a position had none
+        'periods'  : length N number of real (not filled) returns per position
+        'stats'    : sc_analysis.benchmark_stats() for the benchmarks
+        'betas', 'alphas' : (N x M) per-position results
+        'last_close' : length N latest close per position, for share counts
+    """
+
+    keys = list(benchmark_tickers)
+    panel = sc_panel.build_panel({key: histories[benchmark_tickers[key]] for key in keys})
+    if (len(panel['dates']) < 3):
+        raise ValueError("Not enough shared benchmark dates")
+    bench_returns, bench_performance = sc_panel.panel_returns(panel)
+    stats = sc_analysis.benchmark_stats(bench_returns, bench_performance,
+                                        sc_analysis.aligned_duration(panel['dates'], years), rfr)
+
+    present = [s for s in symbols if histories.get(s, -1) != -1]
+    missing = [s for s in symbols if histories.get(s, -1) == -1]
+    closes = np.array([sc_panel.align_to_dates(histories[s], panel['dates']) for s in present]).reshape(
+        len(present), len(panel['dates']))
+    returns = closes[:, 1:]/closes[:, :-1] - 1
+    periods = np.isfinite(returns).sum(axis=1)
+    returns = np.where(np.isfinite(returns), returns, 0)
+    # Periods without a return count as cash
+
+    performance = np.prod(1 + returns, axis=1) - 1
+    betas, alphas = sc_analysis.alpha_beta_matrix(returns, performance, stats)
+    # One vectorized pass for every position against every benchmark
+
+    last_close = np.array([sc_panel.to_series(histories[s])['close'][-1] for s in present])
+
+    return {'symbols': present, 'missing': missing, 'keys': keys, 'dates': panel['dates'],
+            'returns': returns, 'periods': periods, 'stats': stats,
+            'betas': betas, 'alphas': alphas, 'last_close': last_close}
+
+
+def evaluate(model, weights):
+    """
+    Portfolio beta and alpha for a set of weights, from the model alone.
+
+    Parameters
+    ----------
+    model :
+        <dict> from build_model()
+    weights :
+        Length N weights in model['symbols'] order (see normalize_weights)
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys:
+        'weights'      : the weights
+        'beta'         : length M portfolio betas
+        'alpha'        : length M annualized portfolio alphas
+        'contribution' : (N x M) weight x beta of each position; the
+                         columns add up to 'beta'
+        'performance'  : total return of the portfolio over the period
+    """
+
+    weights = np.asarray(weights, dtype=np.float64)
+    portfolio_returns = weights @ model['returns']
+    # The whole portfolio return series in one product
+    performance = np.prod(1 + portfolio_returns) - 1
+
+    betas, alphas = sc_analysis.alpha_beta_matrix(portfolio_returns, performance, model['stats'])
+    return {'weights': weights, 'beta': betas[0], 'alpha': alphas[0],
+            'contribution': weights[:, None]*model['betas'], 'performance': performance}
+
+
+def weights_for(model, holdings, kind):
+    """
+    Turn holdings amounts into weights in model['symbols'] order.
+
+    Parameters
+    ----------
+    model :
+        <dict> from build_model()
+    holdings :
+        <dict> of symbol to amount, from load_holdings()
+    kind :
+        'weight', 'value' or 'shares'. Shares are valued at the last close.
+
+    Returned Variables [1]
+    ----------------------
+    <ndarray> :
+        Length N weights. Symbols that aren't in the model get an error,
+        positions missing from holdings get 0.
+    """
+
+    unknown = [s for s in holdings if s not in model['symbols']]
+    if unknown:
+        raise ValueError("No data loaded for: " + ' '.join(unknown))
+    amounts = np.array([holdings.get(s, 0.0) for s in model['symbols']])
+    if (kind == 'shares'):
+        amounts = amounts*model['last_close']
+    return normalize_weights(amounts)
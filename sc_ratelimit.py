@@ -0,0 +1,159 @@
+"""
+=================================================================
+Client-side rate limiting and retry backoff for the Tradier API.
+=================================================================
+
+sc_ratelimit.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: keeps bulk fetches inside the API quota instead of running into it. Requests
+ take a token from a token bucket that refills at the allowed rate. The bucket is re-synced
+ from Tradier's X-Ratelimit-Available / X-Ratelimit-Expiry headers on every response, so the
+ remaining quota is spread evenly over what is left of the window. The number of requests in
+ flight is adjusted AIMD-style: one more slot after each clean response, half as many after
+ a throttled or failed one. backoff_delay() gives the jittered exponential wait between retries.
+
+"""
+
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket plus an adaptive cap on concurrent requests. Safe to share
+    between threads. Call acquire() before each request and release() with
+    the outcome after it.
+    """
+
+    def __init__(self, rate, burst=1, max_concurrency=8):
+        """
+        Parameters
+        ----------
+        rate :
+            <float> Requests per second allowed on average.
+        burst :
+            <int> Requests that can go out back to back when the bucket is full.
+        max_concurrency :
+            <int> Upper bound for the number of requests in flight.
+        """
+
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = float(self.max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._stamp = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._stamp)*self.rate)
+        self._stamp = now
+
+    def acquire(self):
+        """ Block until a request may go out. """
+
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if (now >= self.paused_until and self.tokens >= 1
+                        and self.in_flight < int(self.concurrency)):
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return
+
+                if (now < self.paused_until):
+                    wait = self.paused_until - now
+                elif (self.tokens < 1):
+                    wait = (1 - self.tokens)/self.rate
+                else:
+                    wait = None
+                    # Waiting for a concurrency slot, release() will notify
+                self._cond.wait(wait)
+
+    def release(self, ok=True):
+        """
+        Hand back the concurrency slot taken by acquire().
+
+        Parameters
+        ----------
+        ok :
+            False if the request was throttled or failed. Halves the number
+            of requests allowed in flight; True grows it back by about one
+            per round of successful requests.
+        """
+
+        with self._cond:
+            self.in_flight -= 1
+            if ok:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1/self.concurrency)
+            else:
+                self.concurrency = max(1.0, self.concurrency/2)
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """ Hold every request for a while, eg. for a Retry-After header. """
+
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+    def update(self, headers):
+        """
+        Re-sync the bucket with the rate-limit headers of a response.
+
+        Parameters
+        ----------
+        headers :
+            Response headers (case-insensitive mapping). Uses
+            X-Ratelimit-Available (requests left in this window) and
+            X-Ratelimit-Expiry (when the window resets, epoch milliseconds).
+        """
+
+        try:
+            available = int(headers['X-Ratelimit-Available'])
+            window_left = int(headers['X-Ratelimit-Expiry'])/1000 - time.time()
+        except (KeyError, TypeError, ValueError):
+            return
+        # Not every endpoint (or the fake server) sends them
+
+        if (window_left <= 0):
+            return
+        if (available <= 0):
+            self.pause(window_left)
+            return
+        # Out of quota: wait for the window to roll over rather than collecting 429s
+
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = available/window_left
+            self.tokens = min(self.tokens, available)
+            self._cond.notify_all()
+        # Spread what's left of the quota over what's left of the window
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """
+    Jittered exponential backoff ("full jitter").
+
+    Parameters
+    ----------
+    attempt :
+        <int> 0 for the first retry, 1 for the second, ...
+    base :
+        <float> Seconds for the first retry's upper bound.
+    cap :
+        <float> Longest wait in seconds.
+
+    Returned Variables [1]
+    ----------------------
+    <float> :
+        Seconds to wait, uniform between 0 and min(cap, base*2^attempt).
+    """
+
+    return random.uniform(0, min(cap, base*2**attempt))
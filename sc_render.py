@@ -0,0 +1,149 @@
+"""
+==================================================================
+Headless, parallel chart rendering for batch correlation reports.
+==================================================================
+
+sc_render.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: renders the run_correlations.py bar chart for many symbols to PNG/SVG files
+ without a display. Charts are drawn with the Agg canvas and the Figure/Axes API only (no
+ pyplot state), each worker process styles one template figure once and reuses it for every
+ symbol it is handed, and the symbols are spread over a process pool.
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import json
+import os
+
+_template = None
+# Per-process (figure, axes, baseline artists) reused across charts
+
+
+def _get_template():
+    global _template
+    if _template is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        import sc_plot_manager as scp
+
+        fig = Figure(figsize=scp.figure_size)
+        FigureCanvasAgg(fig)
+        fig.subplots_adjust(**scp.subplot_margins)
+        ax = fig.add_subplot(1, 1, 1)
+        scp.style_axes(ax)
+        _template = (fig, ax, set(ax.get_children()))
+    return _template
+
+
+def render_chart(path, symbol, beta_values, alpha_values):
+    """
+    Render one symbol's beta/alpha chart to a file.
+
+    Parameters
+    ----------
+    path :
+        Output file. The format comes from the extension (.png, .svg, ...)
+    symbol :
+        <str> The ticker, used in the title.
+    beta_values :
+        <dict> of benchmark name to beta
+    alpha_values :
+        <dict> of benchmark name to alpha
+
+    Returned Variables [1]
+    ----------------------
+    <str> :
+        The path written.
+    """
+
+    import sc_plot_manager as scp
+
+    fig, ax, baseline = _get_template()
+    try:
+        scp.plot_correlations(ax, symbol, beta_values, alpha_values)
+        fig.savefig(path)
+    finally:
+        for container in list(ax.containers):
+            container.remove()
+        for artist in ax.get_children():
+            if artist not in baseline:
+                artist.remove()
+        # Strip this symbol's bars, gradients and labels, keep the styling for the next one
+
+    return path
+
+
+def _render_job(job):
+    symbol, beta_values, alpha_values, path = job
+    try:
+        return render_chart(path, symbol, beta_values, alpha_values)
+    except Exception as e:
+        print("Error rendering chart for " + symbol + ": " + str(e))
+        return None
+
+
+def render_charts(results, out_dir, fmt='png', processes=None):
+    """
+    Render a chart per symbol across a process pool.
+
+    Parameters
+    ----------
+    results :
+        Iterable of (symbol, beta_values, alpha_values) tuples
+    out_dir :
+        Directory for the charts, named <SYMBOL>.<fmt>
+    fmt :
+        'png' or 'svg'
+    processes :
+        Number of worker processes. Default: one per CPU.
+
+    Returned Variables [1]
+    ----------------------
+    <list> :
+        The paths written (None for any chart that failed).
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = ((symbol, betas, alphas, os.path.join(out_dir, symbol + '.' + fmt))
+            for symbol, betas, alphas in results)
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=8))
+
+
+def read_results(results_path):
+    """
+    Lazily read the output of run_batch.py back as chart inputs.
+
+    Parameters
+    ----------
+    results_path :
+        A .csv or .jsonl file written by run_batch.py
+
+    Returned Variables [1]
+    ----------------------
+    <generator> :
+        Yields (symbol, beta_values, alpha_values) for every row that has results.
+    """
+
+    with open(results_path, newline='', encoding='utf-8') as f:
+        if results_path.lower().endswith(('.jsonl', '.json')):
+            for line in f:
+                row = json.loads(line)
+                if 'beta' in row:
+                    yield row['symbol'], row['beta'], row['alpha']
+        else:
+            for row in csv.DictReader(f):
+                if row['error']:
+                    continue
+                betas = {key[5:]: float(val) for key, val in row.items() if key.startswith('beta_')}
+                alphas = {key[6:]: float(val) for key, val in row.items() if key.startswith('alpha_')}
+                yield row['symbol'], betas, alphas
+
+
+def render_results(results_path, out_dir, fmt='png', processes=None):
+    """ Render a chart for every successful row of a run_batch.py output file. """
+    return render_charts(read_results(results_path), out_dir, fmt, processes)
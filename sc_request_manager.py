@@ -5,50 +5,357 @@ Request handling for benchmark correlation comparison tool.
 
 sc_request_manager.py
 Author: Teddy Rowan @ MySybil.com
-Last Modified: Sept 26, 2020
-Description: this script handles the requests for correlation scripts.
+Last Modified: October 18, 2026
+Description: this script handles the requests for correlation scripts. Histories come from the
+ data source picked by the 'data_source' setting: the Tradier API, or a directory of local
+ CSV/Parquet files (sc_local_source.py). Tradier histories are kept in an on-disk cache
+ (sc_cache.py) so that later runs only download the bars they are missing. All requests share
+ one keep-alive session, and get_histories() fetches a batch of symbols concurrently over it,
+ paced by a shared rate limiter (sc_ratelimit.py) and retrying throttled or failed requests.
 
 """
 
-import requests
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import sc_cache
+import sc_local_source
+import sc_metrics as scm
+import sc_ratelimit
+import sc_series
 import sc_settings
 
 root_url = 'https://sandbox.tradier.com/v1/markets'
 
-def get_history(symbol, interval, start_date):
-    """ 
-    GET request to the Tradier API to download daily stock data
-    for the requested symbol (either input or benchmark). Verify
-    the data is valid and then return the json response.
-    
+retry_statuses = (429, 500, 502, 503, 504)
+
+_session = None
+_limiter = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the shared keep-alive HTTP session, creating it on first use.
+    The connection pool is sized to the 'max_connections' setting so that
+    concurrent fetches reuse connections instead of re-handshaking.
+
+    Returned Variables [1]
+    ----------------------
+    <requests.Session> :
+        The shared session.
+    """
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            # Imported on first request, a fully cached run never needs it
+
+            pool_size = sc_settings.get_settings()['max_connections']
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({'Authorization': sc_settings.api_key(),
+                                    'Accept': 'application/json'})
+            _session = session
+    return _session
+
+
+def get_limiter():
+    """
+    Return the shared rate limiter, creating it on first use from the
+    'rate_limit' and 'max_connections' settings.
+
+    Returned Variables [1]
+    ----------------------
+    <sc_ratelimit.RateLimiter> :
+        The shared limiter.
+    """
+
+    global _limiter
+    with _session_lock:
+        if _limiter is None:
+            settings = sc_settings.get_settings()
+            _limiter = sc_ratelimit.RateLimiter(settings['rate_limit']/60, burst=settings['max_connections'],
+                                                max_concurrency=settings['max_connections'])
+    return _limiter
+
+
+def download_series(symbol, interval, start_date):
+    """
+    GET request to the Tradier API to download stock data for the requested
+    symbol (either input or benchmark). The response is streamed and decoded
+    straight into columns (sc_series.from_json_chunks) without building a
+    dict per bar.
+
     Parameters
     ----------
-    symbol : 
-        Stock ticker for the 
-    interval : 
+    symbol :
+        Stock ticker for the
+    interval :
         'daily', 'weekly', or 'monthly'
-    start_date : 
+    start_date :
         A date string in %Y-%m-d format (eg. 2019-01-01)
 
 
+    Requests go through the shared rate limiter (sc_ratelimit.py), and
+    throttled (429), 5xx and connection failures are retried with jittered
+    exponential backoff up to the 'max_retries' setting.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> or int :
+        The columnar series (see sc_series.py), or -1 if the response had
+        no data for the symbol or every attempt failed.
+
+    """
+
+    settings = sc_settings.get_settings()
+    limiter = get_limiter()
+
+    for attempt in range(settings['max_retries'] + 1):
+        if (attempt > 0):
+            scm.increment('http_retries', reason=reason)
+            time.sleep(sc_ratelimit.backoff_delay(attempt - 1))
+        # Jittered exponential backoff before each retry
+
+        limiter.acquire()
+        ok = False
+        try:
+            with scm.timer('http_request'):
+                response = get_session().get(root_url + '/history',
+                    params={'symbol': symbol,
+                            'interval': interval,
+                            'start': start_date},
+                    stream=True, timeout=30
+                )
+            # Time to the response headers, the body is read below
+            limiter.update(response.headers)
+
+            if (response.status_code in retry_statuses):
+                response.close()
+                reason = str(response.status_code)
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    limiter.pause(int(retry_after))
+                continue
+            # Throttled or a server hiccup, worth another try
+
+            with response:
+                received = []
+
+                def chunks():
+                    for chunk in response.iter_content(chunk_size=65536):
+                        received.append(len(chunk))
+                        yield chunk
+
+                with scm.timer('http_stream_decode'):
+                    series = sc_series.from_json_chunks(chunks())
+            ok = True
+
+        except IOError as e:
+            reason = type(e).__name__
+            continue
+            # Connection errors and timeouts (requests' exceptions are IOErrors)
+        finally:
+            limiter.release(ok)
+
+        scm.increment('http_requests')
+        scm.increment('http_bytes', sum(received))
+        if (series == -1):
+            scm.increment('http_empty_responses')
+        return series
+
+    print("Giving up on " + symbol + " after %d attempts (%s)" % (settings['max_retries'] + 1, reason))
+    scm.increment('http_failures')
+    return -1
+
+
+def download_history(symbol, interval, start_date):
+    """
+    Same as download_series() but returns the old list-of-dicts format,
+    with keys 'date', 'open', 'high', 'low', 'close', 'volume'. Kept for
+    compatibility.
+    """
+
+    series = download_series(symbol, interval, start_date)
+    return -1 if series == -1 else sc_series.to_bars(series)
+
+
+def tradier_series(symbol, interval, start_date, use_cache, settings):
+    """
+    Tradier data source. Goes through the on-disk cache when it is enabled:
+    a cached history younger than the cache TTL is returned as-is; an older
+    one is topped up with only the bars dated on or after its last cached bar.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> or int :
+        The columnar series (see sc_series.py), or -1 if the data could
+        not be retrieved.
+    """
+
+    if not (use_cache and settings['use_cache']):
+        return download_series(symbol, interval, start_date)
+
+    cache_dir = settings['cache_dir']
+    entry = sc_cache.load_entry(symbol, interval, cache_dir)
+
+    if (entry is None or entry['start'] > start_date):
+        # Cache miss, or the cached history doesn't reach back far enough
+        scm.increment('cache_lookups', result='miss')
+        series = download_series(symbol, interval, start_date)
+        if (series == -1):
+            return -1
+        sc_cache.store_entry(symbol, interval, series, start_date, cache_dir, settings['cache_max_mb'])
+
+    elif sc_cache.is_fresh(entry, settings['cache_ttl']):
+        scm.increment('cache_lookups', result='hit')
+        series = entry['series']
+
+    else:
+        scm.increment('cache_lookups', result='stale')
+        last_date = sc_series.int_to_date(entry['series']['date'][-1])
+        new = download_series(symbol, interval, last_date)
+        # Re-download the last cached bar too, it may have been a partial period
+
+        if (new == -1):
+            print("Could not refresh cached data for " + symbol + ". Using cached data.")
+            series = entry['series']
+            # Stale data beats no data. Try again next run.
+        else:
+            series = sc_series.merge(entry['series'], new)
+            sc_cache.store_entry(symbol, interval, series, entry['start'], cache_dir, settings['cache_max_mb'])
+
+    return sc_series.slice_from(series, start_date)
+
+
+def local_series(symbol, interval, start_date, use_cache, settings):
+    """
+    Local-file data source, reading from the 'data_dir' setting. The files
+    are already on disk so the cache is not used.
+    """
+
+    with scm.timer('local_read'):
+        return sc_local_source.load_series(symbol, interval, start_date, settings['data_dir'])
+
+
+data_sources = {'tradier': tradier_series,
+                'local': local_series}
+# Selected by the 'data_source' setting. Each takes
+# (symbol, interval, start_date, use_cache, settings) and returns a columnar series or -1
+
+
+def get_history(symbol, interval, start_date, use_cache=True, as_arrays=True):
+    """
+    Retrieve the price history for a symbol from the data source chosen in
+    sc_settings (the Tradier API by default, or a directory of local files).
+
+    Parameters
+    ----------
+    symbol :
+        Stock ticker
+    interval :
+        'daily', 'weekly', or 'monthly'
+    start_date :
+        A date string in %Y-%m-d format (eg. 2019-01-01)
+    use_cache :
+        Set False to bypass the cache for this call.
+    as_arrays :
+        Default True returns the columnar series. Set False for the old
+        list-of-dicts format.
+
     Returned Variables [1]
     ----------------------
-    <list> : 
-        A list of dicts for each trading interval. Lists have keys:
-        'date', 'open', 'high', 'low', 'close'
-        
+    <dict> :
+        The columnar series: a dict of arrays, 'date' as int32 YYYYMMDD
+        and 'open', 'high', 'low', 'close', 'volume' as float64 (see
+        sc_series.py). With as_arrays=False, a list of dicts for each
+        trading interval with those keys and 'date' as a %Y-%m-%d string.
+        Returns -1 if the data could not be retrieved.
+
     """
 
+    settings = sc_settings.get_settings()
     try:
-        response = requests.get(root_url + '/history',
-            params={'symbol': symbol, 
-                    'interval': interval, 
-                    'start': start_date},
-            headers={'Authorization': sc_settings.api_key(), 
-                     'Accept': 'application/json'}
-        ).json()
-    
-        json_data = response['history']['day']
-        return json_data
-    except TypeError:
+        source = data_sources[settings['data_source']]
+    except KeyError:
+        raise ValueError("Unknown data_source setting: " + str(settings['data_source']))
+
+    series = source(symbol, interval, start_date, use_cache, settings)
+    if (series == -1 or sc_series.length(series) == 0):
         return -1
+
+    return series if as_arrays else sc_series.to_bars(series)
+
+
+def get_histories(symbols, interval, start_date, max_workers=None, use_cache=True, as_arrays=True):
+    """
+    Retrieve the price histories for several symbols concurrently.
+
+    Parameters
+    ----------
+    symbols :
+        Iterable of stock tickers. Duplicates are only fetched once.
+    interval :
+        'daily', 'weekly', or 'monthly'
+    start_date :
+        A date string in %Y-%m-d format (eg. 2019-01-01)
+    max_workers :
+        Maximum number of requests in flight. Default: the 'max_connections' setting.
+    use_cache :
+        Set False to bypass the cache for these calls.
+    as_arrays :
+        Set False to get lists of dicts instead of columnar series.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        Maps each symbol to its history as returned by get_history(),
+        or to -1 if that symbol could not be retrieved.
+
+    """
+
+    symbols = list(dict.fromkeys(symbols))
+    # Drop duplicates but keep the caller's order
+
+    if (max_workers is None):
+        max_workers = sc_settings.get_settings()['max_connections']
+    max_workers = max(1, min(max_workers, len(symbols)))
+
+    def fetch(symbol):
+        try:
+            return get_history(symbol, interval, start_date, use_cache, as_arrays)
+        except (IOError, ValueError):
+            return -1
+        # One bad symbol shouldn't take down the rest of the batch
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(fetch, symbols))
+
+    return dict(zip(symbols, results))
+
+
+def clear_cache(symbol=None, interval=None):
+    """
+    Invalidate cached histories so they are downloaded again on next use.
+
+    Parameters
+    ----------
+    symbol :
+        Only clear this ticker. Default: every ticker.
+    interval :
+        Only clear this interval. Default: every interval.
+
+    Returned Variables [1]
+    ----------------------
+    <int> :
+        The number of cached histories removed.
+
+    """
+
+    return sc_cache.invalidate(sc_settings.get_settings()['cache_dir'], symbol, interval)
@@ -0,0 +1,149 @@
+"""
+====================================================================
+Build weekly and monthly bars locally from one daily download.
+====================================================================
+
+sc_resample.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: looking at daily, weekly and monthly betas used to mean three full sets of
+ downloads. This groups daily columnar series into calendar weeks (Monday to Friday) or
+ months with NumPy's ufunc.reduceat, so one daily fetch covers all three intervals: open from
+ the first day, close from the last, high/low the extremes and volume the sum.
+
+ Each bar is dated by the calendar start of its period (the Monday of the week, the 1st of
+ the month) rather than its first trading day like Tradier's bars. Symbols can have
+ different first trading days in a period (a halt, or a holiday on one exchange only), and
+ the panel joins on date, so only a canonical date keeps their bars lined up.
+
+"""
+
+import numpy as np
+
+intervals = ('daily', 'weekly', 'monthly')
+
+
+def day_numbers(dates):
+    """
+    Convert YYYYMMDD integers to days since 1970-01-01.
+
+    Parameters
+    ----------
+    dates :
+        <ndarray> of YYYYMMDD integers
+
+    Returned Variables [1]
+    ----------------------
+    <ndarray> :
+        int64 day numbers.
+    """
+
+    dates = np.asarray(dates, dtype=np.int64)
+    months = (dates//10000 - 1970)*12 + (dates//100)%100 - 1
+    first_of_month = months.astype('datetime64[M]').astype('datetime64[D]')
+    return first_of_month.astype(np.int64) + dates%100 - 1
+
+
+def period_keys(dates, interval):
+    """
+    Label each date with the period it falls in. Consecutive equal keys
+    form one bar.
+
+    Parameters
+    ----------
+    dates :
+        <ndarray> of YYYYMMDD integers
+    interval :
+        'daily', 'weekly', or 'monthly'
+
+    Returned Variables [1]
+    ----------------------
+    <ndarray> :
+        int64 period keys, one per date.
+    """
+
+    if (interval == 'daily'):
+        return np.asarray(dates, dtype=np.int64)
+    elif (interval == 'weekly'):
+        return (day_numbers(dates) + 3)//7
+        # 1970-01-01 was a Thursday, shifting by 3 days starts every week on a Monday
+    elif (interval == 'monthly'):
+        return np.asarray(dates, dtype=np.int64)//100
+    raise ValueError("Unknown interval: " + str(interval))
+
+
+def period_start(keys, interval):
+    """
+    The YYYYMMDD date a period starts on: the key itself for daily, the
+    Monday for weekly and the 1st for monthly periods.
+
+    Parameters
+    ----------
+    keys :
+        <ndarray> of period keys from period_keys()
+    interval :
+        'daily', 'weekly', or 'monthly'
+
+    Returned Variables [1]
+    ----------------------
+    <ndarray> :
+        int64 YYYYMMDD dates.
+    """
+
+    keys = np.asarray(keys, dtype=np.int64)
+    if (interval == 'daily'):
+        return keys
+    elif (interval == 'weekly'):
+        days = (keys*7 - 3).astype('datetime64[D]')
+        months = days.astype('datetime64[M]')
+        years = months.astype('datetime64[Y]')
+        return ((years.astype(np.int64) + 1970)*10000 + (months - years).astype(np.int64)*100 + 100
+                + (days - months).astype(np.int64) + 1)
+    elif (interval == 'monthly'):
+        return keys*100 + 1
+    raise ValueError("Unknown interval: " + str(interval))
+
+
+def resample(series, interval):
+    """
+    Group a daily columnar series into weekly or monthly bars.
+
+    Parameters
+    ----------
+    series :
+        <dict> of daily arrays (see sc_series.py), sorted by date
+    interval :
+        'daily', 'weekly', or 'monthly'. 'daily' returns the series as-is.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        The resampled columnar series, each bar dated by period_start().
+    """
+
+    if (interval == 'daily' or len(series['date']) == 0):
+        return series
+
+    keys = period_keys(series['date'], interval)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    # First and last row of every period
+
+    output = {}
+    output['date'] = period_start(keys[starts], interval).astype(series['date'].dtype)
+    output['open'] = series['open'][starts]
+    output['high'] = np.maximum.reduceat(series['high'], starts)
+    output['low'] = np.minimum.reduceat(series['low'], starts)
+    output['close'] = series['close'][ends]
+    output['volume'] = np.add.reduceat(series['volume'], starts)
+    return output
+
+
+def resample_histories(histories, interval):
+    """
+    resample() every entry of a get_histories() result, passing failed
+    downloads (-1) through.
+    """
+
+    return {symbol: (history if history == -1 else resample(history, interval))
+            for symbol, history in histories.items()}
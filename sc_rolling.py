@@ -0,0 +1,187 @@
+"""
+=================================================================
+Rolling-window and exponentially weighted alpha/beta time series.
+=================================================================
+
+sc_rolling.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: shows how a stock's exposure to each benchmark drifts over time instead of the
+ one static number over the whole dataset. The fixed-window version keeps running (prefix)
+ sums of the returns, squares and cross-products so that every bar of every window costs the
+ same constant amount no matter how long the window is. The EWMA version updates exponentially
+ weighted moments bar by bar. Both work on every benchmark and every window at once.
+
+"""
+
+import numpy as np
+
+import sc_analysis
+
+
+def _as_inputs(symbol_returns, benchmark_returns):
+    x = np.asarray(symbol_returns, dtype=np.float64).ravel()
+    b = np.atleast_2d(np.asarray(benchmark_returns, dtype=np.float64))
+    if (b.shape[1] != len(x)):
+        raise ValueError("symbol and benchmark returns must be aligned to the same periods")
+    return x, b
+
+
+def _prefix(values):
+    out = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    np.cumsum(values, axis=-1, out=out[..., 1:])
+    return out
+    # out[..., t] is the sum of the first t values, so a window sum is one subtraction
+
+
+def rolling_alpha_beta(symbol_returns, benchmark_returns, windows, interval, rfr):
+    """
+    Rolling beta, alpha and correlation of a symbol against each benchmark
+    for several window lengths.
+
+    Parameters
+    ----------
+    symbol_returns :
+        Length T percent change data for the symbol (eg. from
+        sc_analysis.convert_to_percent_change or a sc_panel row)
+    benchmark_returns :
+        (M x T) percent change data for the benchmarks, aligned with the symbol
+    windows :
+        <list> of window lengths in bars (eg. [26, 52, 104] for weekly data)
+    interval :
+        'daily', 'weekly', or 'monthly'. Used to annualize the alphas.
+    rfr :
+        <float> The risk-free rate in decimal form.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys 'windows', 'beta', 'alpha' and 'corr'. Each
+        result is a (W windows x M benchmarks x T periods) array where entry
+        t covers the window ending at bar t, NaN until the window is full.
+    """
+
+    x, b = _as_inputs(symbol_returns, benchmark_returns)
+    n_periods = len(x)
+    ppy = sc_analysis.periods_per_year(interval)
+
+    sx = _prefix(x)
+    sxx = _prefix(x*x)
+    sb = _prefix(b)
+    sbb = _prefix(b*b)
+    sxb = _prefix(b*x)
+    # Running sums over the whole series, computed once for every window
+
+    log_x = _prefix(np.log1p(x))
+    log_b = _prefix(np.log1p(b))
+    # Running log-growth so each window's compounded return is one subtraction
+
+    shape = (len(windows), b.shape[0], n_periods)
+    result = {'windows': list(windows),
+              'beta': np.full(shape, np.nan),
+              'alpha': np.full(shape, np.nan),
+              'corr': np.full(shape, np.nan)}
+
+    for i, w in enumerate(windows):
+        if (w < 2 or w > n_periods):
+            continue
+
+        mx = sx[w:] - sx[:-w]
+        mxx = sxx[w:] - sxx[:-w]
+        mb = sb[:, w:] - sb[:, :-w]
+        mbb = sbb[:, w:] - sbb[:, :-w]
+        mxb = sxb[:, w:] - sxb[:, :-w]
+        # Window sums for every window end at once
+
+        cov = (mxb - mx*mb/w)/(w-1)
+        var_b = (mbb - mb*mb/w)/(w-1)
+        var_x = (mxx - mx*mx/w)/(w-1)
+
+        beta = cov/var_b
+        ann_x = np.expm1((log_x[w:] - log_x[:-w])*ppy/w)
+        ann_b = np.expm1((log_b[:, w:] - log_b[:, :-w])*ppy/w)
+        # Annualized window returns, (1+R)^(1/years)-1 with years = w/ppy
+
+        result['beta'][i, :, w-1:] = beta
+        result['alpha'][i, :, w-1:] = (ann_x - rfr) - beta*(ann_b - rfr)
+        result['corr'][i, :, w-1:] = cov/np.sqrt(var_x*var_b)
+
+    return result
+
+
+def ewma_alpha_beta(symbol_returns, benchmark_returns, halflives, interval, rfr):
+    """
+    Exponentially weighted beta, alpha and correlation of a symbol against
+    each benchmark for several half-lives. Each bar updates the weighted
+    moments in constant time.
+
+    Parameters
+    ----------
+    symbol_returns :
+        Length T percent change data for the symbol
+    benchmark_returns :
+        (M x T) percent change data for the benchmarks, aligned with the symbol
+    halflives :
+        <list> of half-lives in bars
+    interval :
+        'daily', 'weekly', or 'monthly'. Used to annualize the alphas.
+    rfr :
+        <float> The risk-free rate in decimal form.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys 'halflives', 'beta', 'alpha' and 'corr'. Each
+        result is a (H half-lives x M benchmarks x T periods) array. The
+        alphas annualize the weighted mean return per period.
+    """
+
+    x, b = _as_inputs(symbol_returns, benchmark_returns)
+    n_periods = len(x)
+    ppy = sc_analysis.periods_per_year(interval)
+
+    decay = np.power(0.5, 1/np.asarray(halflives, dtype=np.float64))[:, None]
+    # Per-bar decay factor for each half-life, shaped to broadcast over the benchmarks
+
+    shape = (len(halflives), b.shape[0])
+    mean_x = np.zeros((len(halflives), 1))
+    mean_xx = np.zeros((len(halflives), 1))
+    mean_b = np.zeros(shape)
+    mean_bb = np.zeros(shape)
+    mean_xb = np.zeros(shape)
+    weight = np.zeros((len(halflives), 1))
+    # Weighted moments, normalized by the total weight seen so far
+
+    result = {'halflives': list(halflives),
+              'beta': np.full(shape + (n_periods,), np.nan),
+              'alpha': np.full(shape + (n_periods,), np.nan),
+              'corr': np.full(shape + (n_periods,), np.nan)}
+
+    for t in range(n_periods):
+        weight = decay*weight + 1
+        k = 1/weight
+        # Bias-corrected update weight for the newest bar
+
+        bt = b[:, t]
+        mean_x += k*(x[t] - mean_x)
+        mean_xx += k*(x[t]*x[t] - mean_xx)
+        mean_b += k*(bt - mean_b)
+        mean_bb += k*(bt*bt - mean_bb)
+        mean_xb += k*(x[t]*bt - mean_xb)
+
+        if (t == 0):
+            continue
+
+        cov = mean_xb - mean_x*mean_b
+        var_b = mean_bb - mean_b*mean_b
+        var_x = mean_xx - mean_x*mean_x
+
+        beta = cov/var_b
+        ann_x = np.power(1 + mean_x, ppy) - 1
+        ann_b = np.power(1 + mean_b, ppy) - 1
+
+        result['beta'][:, :, t] = beta
+        result['alpha'][:, :, t] = (ann_x - rfr) - beta*(ann_b - rfr)
+        result['corr'][:, :, t] = cov/np.sqrt(var_x*var_b)
+
+    return result
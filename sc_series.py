@@ -0,0 +1,238 @@
+"""
+===========================================================
+Compact columnar price series helpers for the history data.
+===========================================================
+
+sc_series.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: the Tradier API hands back a list of dicts, one per bar. These helpers convert
+ that into a dict of NumPy columns (one array per field) which is what gets stored on disk
+ and merged when a cached history is topped up. from_json_chunks() decodes a streamed
+ response directly into columns, so the per-bar dicts are never built at all.
+
+"""
+
+from array import array
+import json
+import re
+
+import numpy as np
+
+fields = ('open', 'high', 'low', 'close', 'volume')
+# Price fields carried alongside the integer 'date' column
+
+_date_re = re.compile(rb'"date"\s*:\s*"(\d{4}-\d{2}-\d{2})')
+_date_weights = np.array([10000000, 1000000, 100000, 10000, 0, 1000, 100, 0, 10, 1], dtype=np.int64)
+# Digit weights for YYYY-MM-DD -> YYYYMMDD, the dashes get weight 0
+_field_res = {field: re.compile(rb'"' + field.encode() + rb'"\s*:\s*([-+0-9.eE]+|null)') for field in fields}
+
+
+def date_to_int(date_str):
+    """
+    Convert a %Y-%m-%d date string to a YYYYMMDD integer.
+
+    Parameters
+    ----------
+    date_str :
+        A date string in %Y-%m-d format (eg. 2019-01-01)
+
+    Returned Variables [1]
+    ----------------------
+    <int> :
+        The date as an integer (eg. 20190101)
+    """
+
+    return int(date_str[0:4] + date_str[5:7] + date_str[8:10])
+
+
+def int_to_date(date_int):
+    """
+    Convert a YYYYMMDD integer back to a %Y-%m-%d date string.
+
+    Parameters
+    ----------
+    date_int :
+        The date as an integer (eg. 20190101)
+
+    Returned Variables [1]
+    ----------------------
+    <str> :
+        A date string in %Y-%m-d format (eg. 2019-01-01)
+    """
+
+    date_int = int(date_int)
+    return "%04d-%02d-%02d" % (date_int//10000, (date_int//100)%100, date_int%100)
+
+
+def from_bars(bars):
+    """
+    Convert the list-of-dicts history returned by Tradier into columns.
+
+    Parameters
+    ----------
+    bars :
+        <list> of dicts with keys 'date', 'open', 'high', 'low', 'close', 'volume'
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dict of arrays. 'date' is int32 YYYYMMDD, every other field is float64.
+    """
+
+    if isinstance(bars, dict):
+        bars = [bars]
+    # Tradier returns a bare dict instead of a list when there is only one bar
+
+    series = {'date': np.array([date_to_int(b['date']) for b in bars], dtype=np.int32)}
+    for field in fields:
+        series[field] = np.array([b.get(field, np.nan) for b in bars], dtype=np.float64)
+
+    return series
+
+
+def from_json_chunks(chunks):
+    """
+    Decode a Tradier history response incrementally, straight into columns.
+    Every bar is a flat JSON object ({...} with no nested braces), so each
+    complete run of bars in the buffer is scanned with one regex per field
+    and converted by numpy, instead of building a dict per bar.
+
+    Parameters
+    ----------
+    chunks :
+        Iterable of bytes, eg. response.iter_content(chunk_size)
+
+    Returned Variables [1]
+    ----------------------
+    <dict> or int :
+        A dict of arrays like from_bars(), or -1 if the response holds no
+        bars (eg. {"history": null} for an unknown symbol).
+    """
+
+    dates = array('i')
+    columns = {field: array('d') for field in fields}
+    buffer = b''
+
+    def scan(segment):
+        found = _date_re.findall(segment)
+        if not found:
+            return
+        values = {field: _field_res[field].findall(segment) for field in fields}
+
+        if all(len(v) in (0, len(found)) for v in values.values()):
+            digits = np.frombuffer(b''.join(found), dtype=np.uint8).reshape(-1, 10).astype(np.int64) - 48
+            dates.extend((digits @ _date_weights).tolist())
+            for field in fields:
+                if values[field]:
+                    columns[field].extend(map(float, values[field] if b'null' not in segment else
+                                              [b'nan' if v == b'null' else v for v in values[field]]))
+                else:
+                    columns[field].extend([np.nan]*len(found))
+            # The usual case: every bar in the segment has the same fields
+        else:
+            for bar in re.findall(rb'\{[^{}]*\}', segment):
+                bar = json.loads(bar)
+                if 'date' in bar:
+                    dates.append(date_to_int(bar['date']))
+                    for field in fields:
+                        value = bar.get(field)
+                        columns[field].append(np.nan if value is None else value)
+            # Ragged bars, decode them one at a time
+
+    for chunk in chunks:
+        buffer += chunk
+        end = buffer.rfind(b'}') + 1
+        if end:
+            scan(buffer[:end])
+            buffer = buffer[end:]
+        # Everything up to the last closing brace is whole bars, keep the partial one for the next chunk
+
+    if not dates:
+        return -1
+
+    series = {'date': np.frombuffer(dates, dtype=np.int32).copy()}
+    for field in fields:
+        series[field] = np.frombuffer(columns[field], dtype=np.float64).copy()
+    return series
+
+
+def to_bars(series):
+    """
+    Convert a columnar series back into the list-of-dicts format.
+
+    Parameters
+    ----------
+    series :
+        <dict> of arrays as returned by from_bars()
+
+    Returned Variables [1]
+    ----------------------
+    <list> :
+        A list of dicts for each trading interval with keys:
+        'date', 'open', 'high', 'low', 'close', 'volume'
+    """
+
+    bars = []
+    columns = [(field, series[field].tolist()) for field in fields if field in series]
+    for i, date_int in enumerate(series['date'].tolist()):
+        bar = {'date': int_to_date(date_int)}
+        for field, values in columns:
+            bar[field] = values[i]
+        bars.append(bar)
+
+    return bars
+
+
+def length(series):
+    """ Number of bars in a columnar series. """
+    return len(series['date'])
+
+
+def slice_from(series, start_date):
+    """
+    Drop every bar dated before start_date.
+
+    Parameters
+    ----------
+    series :
+        <dict> of arrays as returned by from_bars()
+    start_date :
+        A date string in %Y-%m-d format (eg. 2019-01-01)
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        The columnar series starting at start_date.
+    """
+
+    first = np.searchsorted(series['date'], date_to_int(start_date), side='left')
+    return {key: val[first:] for key, val in series.items()}
+
+
+def merge(old, new):
+    """
+    Merge newer bars onto an existing series. Bars in new replace any bars
+    in old with the same or a later date (the last cached bar of a period
+    is often still in progress when it is first downloaded).
+
+    Parameters
+    ----------
+    old :
+        <dict> columnar series already on hand
+    new :
+        <dict> columnar series of freshly downloaded bars
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        The combined columnar series in date order.
+    """
+
+    if length(new) == 0:
+        return old
+
+    keep = np.searchsorted(old['date'], new['date'][0], side='left')
+    # Everything in old from the first new date onwards is superseded
+
+    return {key: np.concatenate((old[key][:keep], new[key])) for key in old}
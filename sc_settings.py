@@ -32,4 +32,32 @@ def get_settings():
     dict['interval'] = 'weekly'
     """ Interval for the alpha/beta calculations. """
     
+    dict['data_source'] = 'tradier'
+    """ Where histories come from: 'tradier' (the API) or 'local' (files in data_dir). """
+
+    dict['data_dir'] = 'data'
+    """ Directory of <SYMBOL>.csv / <SYMBOL>.parquet files for the 'local' data source. Daily files
+    can sit at the top level, weekly and monthly ones go in data/weekly/ and data/monthly/. """
+
+    dict['max_connections'] = 8
+    """ Maximum number of concurrent requests when fetching several histories. """
+
+    dict['rate_limit'] = 120
+    """ Requests per minute to pace API calls at. Refined on the fly from the API's rate-limit headers. """
+
+    dict['max_retries'] = 4
+    """ Retries for a throttled or failed request, with jittered exponential backoff between them. """
+
+    dict['use_cache'] = True
+    """ Keep downloaded histories on disk and only fetch newer bars on later runs. """
+
+    dict['cache_dir'] = '.sc_cache'
+    """ Directory for the price history cache. """
+
+    dict['cache_ttl'] = 6*60*60
+    """ Seconds before a cached history is topped up from the API again. """
+
+    dict['cache_max_mb'] = 256
+    """ Size cap for the cache. Least recently used histories are evicted first. """
+    
     return dict
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+====================================================
+Import-time measurement for the tool's entry points.
+====================================================
+
+sc_startup.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: runs `python -X importtime` in a fresh interpreter for each module and reports
+ the cumulative import cost, so startup time can be tracked as the code changes. Short CLI
+ queries and batch workers spend a big share of their runtime just starting up.
+
+Usage:
+    python3 sc_startup.py [module ...]
+
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+default_modules = ['run_correlations', 'run_batch', 'sc_analysis', 'sc_request_manager',
+                   'sc_plot_manager', 'sc_render']
+
+
+def measure_import_time(module):
+    """
+    Import a module in a fresh interpreter and measure what it costs.
+
+    Parameters
+    ----------
+    module :
+        <str> Module name, importable from this directory.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys:
+        'module'     : the module name
+        'import_us'  : cumulative import time of the module (and anything
+                       imported before it, eg. site hooks) in microseconds
+        'wall_s'     : wall time of the whole interpreter run in seconds
+        'heaviest'   : <list> of (cumulative_us, package) for the slowest
+                       top-level imports it pulled in
+    """
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                          cwd=here, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+
+    cumulative = {}
+    dependencies = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1)//2
+        # Lines are "import time: self | cumulative | name", the name indented two spaces per nesting level
+
+        if (depth == 0):
+            cumulative[name.strip()] = int(cumulative_us)
+        elif (depth == 1):
+            dependencies.append((int(cumulative_us), name.strip()))
+
+    return {'module': module,
+            'import_us': sum(cumulative.values()),
+            'wall_s': wall,
+            'heaviest': sorted(dependencies, reverse=True)[:5]}
+
+
+def main(argv=None):
+    modules = (argv if argv is not None else sys.argv[1:]) or default_modules
+    print("%-20s %12s %10s   %s" % ('Module', 'Import (ms)', 'Wall (ms)', 'Heaviest dependencies (ms)'))
+    for module in modules:
+        m = measure_import_time(module)
+        heaviest = ', '.join("%s %.0f" % (name, us/1000) for us, name in m['heaviest'][:3])
+        print("%-20s %12.1f %10.1f   %s" % (module, m['import_us']/1000, m['wall_s']*1000, heaviest))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""
+=====================================================================
+Streaming beta/alpha: running moments updated bar by bar or tick by tick.
+=====================================================================
+
+sc_stream.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: once the history is loaded, new prices only have to be folded into a handful of
+ running sums per symbol-benchmark pair (count, sums, sums of squares and cross-products, and
+ log growth for the alphas), so beta and alpha can be kept current in constant time per pair
+ instead of rerunning the whole analysis.
+
+ Prices come from a feed: any iterable of (YYYYMMDD date, ticker, price) events. A price is the
+ latest close of the bar its date falls in (sc_resample.period_keys), so last-trade updates
+ simply keep moving the current bar's close; the bar is folded into the sums once the first
+ price for a later bar arrives. Until then it is included provisionally, so the numbers always
+ reflect the latest price. Each symbol-benchmark pair keeps the closes of the last bar both
+ sides traded in, and its returns run from there: when one side misses a bar, both returns
+ span the gap, the same as the date-joined panel in sc_panel.
+
+ Feeds are looked up in the 'feeds' dict, like the data sources in sc_request_manager. Two are
+ built in, so a session can be replayed offline: 'file' reads a CSV of date,ticker,price lines
+ and 'tcp' reads the same lines from a socket (eg. serve_replay() below).
+
+"""
+
+import socket
+import socketserver
+import time
+
+import numpy as np
+
+import sc_analysis
+import sc_panel
+import sc_resample
+import sc_series
+
+_sums = ('n', 'sx', 'sy', 'sxy', 'syy', 'lx', 'ly')
+# Per-pair running sums: count, returns, cross-product, benchmark squares, log growth
+
+
+class MomentStream:
+    """
+    Running moment state for every symbol against every benchmark. update()
+    is O(1); folding in a finished bar costs O(1) per pair.
+    """
+
+    def __init__(self, symbols, benchmark_dict, interval):
+        """
+        Parameters
+        ----------
+        symbols :
+            <list> of tickers to monitor
+        benchmark_dict :
+            <dict> of benchmark name to ticker
+        interval :
+            'daily', 'weekly', or 'monthly': the bar size the returns are taken over
+        """
+
+        self.symbols = list(symbols)
+        self.keys = list(benchmark_dict)
+        self.tickers = list(dict.fromkeys(self.symbols + list(benchmark_dict.values())))
+        self.column = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.interval = interval
+
+        self._x = np.array([self.column[s] for s in self.symbols], dtype=int)
+        self._y = np.array([self.column[benchmark_dict[k]] for k in self.keys], dtype=int)
+        self._self_pair = self._x[:, None] == self._y[None, :]
+        # A symbol is never measured against itself
+
+        shape = (len(self.symbols), len(self.keys))
+        self.close = np.full(len(self.tickers), np.nan)
+        self.close_day = np.zeros(len(self.tickers))
+        # Latest price of each ticker in the current bar, and its day number
+        self.pair_x = np.full(shape, np.nan)
+        self.pair_y = np.full(shape, np.nan)
+        self.pair_day = np.full(shape, np.nan)
+        # Symbol and benchmark close of the last finished bar both sides of a pair traded in
+        self.first_day = np.full(shape, np.nan)
+        # Where each pair's first shared return starts, for annualizing over the pair's own span
+        self.bar = None
+        self.bar_date = None
+        self._bar_of = {}
+        # date -> (bar key, day number), a feed repeats the same few dates over and over
+        self.updates = 0
+        self.sums = {name: np.zeros((len(self.symbols), len(self.keys))) for name in _sums}
+
+    def update(self, date, ticker, price):
+        """
+        Feed one price. Prices for earlier bars than the current one, and
+        tickers that aren't being tracked, are ignored.
+
+        Parameters
+        ----------
+        date :
+            <int> YYYYMMDD date of the price
+        ticker :
+            The ticker
+        price :
+            <float> Last trade or bar close
+
+        Returned Variables [1]
+        ----------------------
+        <bool> :
+            True if the price was used.
+        """
+
+        col = self.column.get(ticker)
+        if col is None:
+            return False
+        cached = self._bar_of.get(date)
+        if cached is None:
+            cached = self._bar_of[date] = (int(sc_resample.period_keys(np.array([date]), self.interval)[0]),
+                                           int(sc_resample.day_numbers([date])[0]))
+        bar, day = cached
+        if (self.bar is None or bar > self.bar):
+            if self.bar is not None:
+                self.commit()
+            self.bar = bar
+            self.bar_date = date
+        elif (bar < self.bar):
+            return False
+        # Late prints for a bar that has already been folded in are dropped
+
+        self.close[col] = price
+        self.close_day[col] = day
+        self.updates += 1
+        return True
+
+    def _current(self):
+        """ (N x M) closes and day of the current bar for every pair, and where both sides traded in it. """
+
+        close_x = np.broadcast_to(self.close[self._x][:, None], self.pair_x.shape)
+        close_y = np.broadcast_to(self.close[self._y][None, :], self.pair_y.shape)
+        traded = np.isfinite(close_x) & np.isfinite(close_y) & ~self._self_pair
+        day = np.maximum(self.close_day[self._x][:, None], self.close_day[self._y][None, :])
+        return close_x, close_y, day, traded
+
+    def _bar_sums(self):
+        """ This bar's contribution to every pair's sums, from the current closes. """
+
+        close_x, close_y, _, traded = self._current()
+        valid = traded & np.isfinite(self.pair_x)
+        # Both sides traded now and in some earlier bar; the returns run from that bar
+        with np.errstate(invalid='ignore'):
+            x = np.where(valid, close_x/self.pair_x - 1, 0)
+            y = np.where(valid, close_y/self.pair_y - 1, 0)
+
+        lx, ly = np.log1p(x), np.log1p(y)
+        return {'n': valid*1.0, 'sx': x, 'sy': y, 'sxy': x*y, 'syy': y*y, 'lx': lx, 'ly': ly}
+
+    def _first_days(self, bar):
+        """ first_day, filled in for pairs whose first shared return is in this bar. """
+
+        return np.where(np.isnan(self.first_day) & (bar['n'] > 0), self.pair_day, self.first_day)
+
+    def commit(self):
+        """ Fold the current bar into the running sums and start a new one. """
+
+        bar = self._bar_sums()
+        self.first_day = self._first_days(bar)
+        for name, value in bar.items():
+            self.sums[name] += value
+        close_x, close_y, day, traded = self._current()
+        self.pair_x[traded] = close_x[traded]
+        self.pair_y[traded] = close_y[traded]
+        self.pair_day[traded] = day[traded]
+        self.close[:] = np.nan
+
+    def results(self, years, rfr):
+        """
+        Current beta and alpha of every symbol against every benchmark,
+        including the bar in progress.
+
+        Parameters
+        ----------
+        years :
+            <float> The duration of the data in years, for annualizing, or
+            None to annualize each pair over the span of its own shared returns.
+        rfr :
+            <float> The risk-free rate in decimal form.
+
+        Returned Variables [3]
+        ----------------------
+        <ndarray> :
+            (N x M) betas, NaN for pairs with fewer than 2 shared returns
+        <ndarray> :
+            (N x M) annualized alphas
+        <ndarray> :
+            (N x M) number of shared returns
+        """
+
+        bar = self._bar_sums()
+        s = {name: self.sums[name] + bar[name] for name in _sums}
+        n = s['n']
+        if years is None:
+            _, _, day, _ = self._current()
+            years = (np.where(bar['n'] > 0, day, self.pair_day) - self._first_days(bar))/365
+        # From the start of each pair's first shared return to the end of its last one
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = (s['sxy'] - s['sx']*s['sy']/n)/(n - 1)
+            var = (s['syy'] - s['sy']*s['sy']/n)/(n - 1)
+            betas = np.where(n >= 2, cov/var, np.nan)
+            symbol_excess = sc_analysis.annualize_return(np.expm1(s['lx']), years) - rfr
+            benchmark_excess = sc_analysis.annualize_return(np.expm1(s['ly']), years) - rfr
+            alphas = symbol_excess - betas*benchmark_excess
+        # Same CAPM definitions as sc_analysis.alpha_beta_matrix, from the sums alone
+
+        return betas, alphas, n.astype(int)
+
+
+def seed(stream, histories):
+    """
+    Load price histories into a stream, oldest bar first. The last bar is
+    left open so a live price for it replaces its close.
+
+    Parameters
+    ----------
+    stream :
+        <MomentStream>
+    histories :
+        <dict> of ticker to history (or -1 for a failed download)
+    """
+
+    series = {t: sc_panel.to_series(h) for t, h in histories.items() if h != -1 and t in stream.column}
+    if not series:
+        return
+    dates = np.unique(np.concatenate([s['date'] for s in series.values()]))
+    for date in dates:
+        for ticker, s in series.items():
+            i = np.searchsorted(s['date'], date)
+            if (i < len(s['date']) and s['date'][i] == date):
+                stream.update(int(date), ticker, float(s['close'][i]))
+
+
+def parse_event(line):
+    """
+    Parse one 'date,ticker,price' line. The date may carry a time of day
+    (eg. 2026-10-18T10:31:05 or 2026-10-18 10:31:05), which is ignored.
+
+    Returned Variables [1]
+    ----------------------
+    <tuple> or None :
+        (YYYYMMDD int, ticker, price), or None for a header, comment or
+        malformed line.
+    """
+
+    parts = [p.strip() for p in line.split(',')]
+    if (len(parts) < 3 or line.startswith('#')):
+        return None
+    try:
+        return sc_series.date_to_int(parts[0][:10]), parts[1].upper(), float(parts[2])
+    except ValueError:
+        return None
+
+
+def file_feed(path, delay=0.0):
+    """ Events from a CSV file of date,ticker,price lines, optionally paced by delay seconds per line. """
+
+    with open(path) as f:
+        for line in f:
+            event = parse_event(line)
+            if event is not None:
+                yield event
+                if delay:
+                    time.sleep(delay)
+
+
+def tcp_feed(address):
+    """ Events from newline-delimited date,ticker,price lines read from host:port. """
+
+    host, port = address.rsplit(':', 1)
+    with socket.create_connection((host, int(port))) as conn:
+        for line in conn.makefile('r'):
+            event = parse_event(line)
+            if event is not None:
+                yield event
+
+
+feeds = {'file': file_feed, 'tcp': tcp_feed}
+# Feed sources by name. A feed takes its address and yields (date, ticker, price) events.
+
+
+def open_feed(spec, **kwargs):
+    """
+    Open a feed from a 'name:address' spec, eg. 'file:ticks.csv' or
+    'tcp:127.0.0.1:9009'. Keyword arguments go to file feeds only.
+    """
+
+    name, _, address = spec.partition(':')
+    if name not in feeds:
+        raise ValueError("Unknown feed '%s', expected one of: %s" % (name, ', '.join(feeds)))
+    return feeds[name](address, **kwargs) if (name == 'file') else feeds[name](address)
+
+
+def serve_replay(path, port=9009, delay=0.01, host='127.0.0.1'):
+    """
+    Replay a date,ticker,price file to every client that connects, one line
+    every delay seconds, for testing a 'tcp' feed offline. Blocks.
+    """
+
+    class ReplayHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            with open(path, 'rb') as f:
+                for line in f:
+                    self.wfile.write(line)
+                    self.wfile.flush()
+                    time.sleep(delay)
+
+    with socketserver.ThreadingTCPServer((host, port), ReplayHandler) as server:
+        server.daemon_threads = True
+        server.serve_forever()
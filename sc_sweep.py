@@ -0,0 +1,110 @@
+"""
+=================================================================
+Beta and alpha for a grid of start dates from one dataset.
+=================================================================
+
+sc_sweep.py
+Author: Teddy Rowan @ MySybil.com
+Last Modified: October 18, 2026
+Description: to see how much beta depends on the lookback, the start date in sc_settings used
+ to be edited and the whole script rerun for each date. This downloads once from the earliest
+ start date and answers every window from running (prefix) sums of the returns, their squares
+ and cross-products. All windows end at the latest bar, so each one only needs the sums at its
+ first period subtracted from the totals: O(1) per window and benchmark, however long the
+ history is.
+
+"""
+
+import numpy as np
+
+import sc_analysis
+import sc_resample
+import sc_series
+
+
+def prefix_sums(values):
+    """ Running sums along the last axis with a leading 0, so sum(values[..., a:b]) = s[..., b] - s[..., a]. """
+
+    values = np.asarray(values, dtype=np.float64)
+    output = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    np.cumsum(values, axis=-1, out=output[..., 1:])
+    return output
+
+
+def sweep(symbol_closes, benchmark_closes, dates, start_dates, rfr):
+    """
+    Beta and alpha of one symbol against every benchmark for every window
+    running from one of start_dates to the last bar.
+
+    Parameters
+    ----------
+    symbol_closes :
+        Length T array of date-aligned closing prices (eg. a panel row)
+    benchmark_closes :
+        (M x T) array of closing prices aligned with symbol_closes
+    dates :
+        Length T array of YYYYMMDD integers for the closes
+    start_dates :
+        <list> of %Y-%m-%d date strings, one per window
+    rfr :
+        <float> The risk-free rate in decimal form.
+
+    Returned Variables [1]
+    ----------------------
+    <dict> :
+        A dictionary with keys:
+        'start_dates' : the input start dates
+        'first'       : length G date strings of each window's first bar
+                        (None if there are no bars after the start date)
+        'clamped'     : length G bools, True where the start date is before
+                        the first bar so the window starts later than asked
+        'periods'     : length G number of returns in each window
+        'beta'        : (G x M) betas, NaN for windows with fewer than 2 returns
+        'alpha'       : (G x M) annualized alphas
+    """
+
+    x_closes = np.asarray(symbol_closes, dtype=np.float64)
+    y_closes = np.atleast_2d(np.asarray(benchmark_closes, dtype=np.float64))
+    x = x_closes[1:]/x_closes[:-1] - 1
+    y = y_closes[:, 1:]/y_closes[:, :-1] - 1
+    x = x - x.mean()
+    y = y - y.mean(axis=1, keepdims=True)
+    # Shifting doesn't change a covariance, and centred sums lose far less precision to cancellation
+
+    sx, sy = prefix_sums(x), prefix_sums(y)
+    sxy, syy = prefix_sums(x*y), prefix_sums(y*y)
+    # (T) and (M x T) running sums, built once for every window
+
+    starts = [sc_series.date_to_int(d) for d in start_dates]
+    found = np.searchsorted(dates, starts)
+    first = np.minimum(found, len(dates) - 1)
+    # Index of the first bar on or after each start date; returns run from there to the end
+    end = len(x)
+    n = (end - first).astype(np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wx = sx[end] - sx[first]
+        wy = sy[:, end:end+1] - sy[:, first]
+        cov = (sxy[:, end:end+1] - sxy[:, first] - wx*wy/n)/(n - 1)
+        var = (syy[:, end:end+1] - syy[:, first] - wy*wy/n)/(n - 1)
+        betas = (cov/var).T
+        # (G x M) from the window sums alone
+
+        days = sc_resample.day_numbers(dates)
+        years = (days[-1] - days[first])/365
+        # Each window is annualized over the bars it actually holds. A start date before the
+        # symbol's first bar is clamped to it, and those windows all cover the same span.
+        symbol_excess = sc_analysis.annualize_return(x_closes[-1]/x_closes[first] - 1, years) - rfr
+        benchmark_excess = sc_analysis.annualize_return(y_closes[:, -1:]/y_closes[:, first] - 1, years).T - rfr
+        alphas = symbol_excess[:, None] - betas*benchmark_excess
+
+    short = n < 2
+    betas[short] = np.nan
+    alphas[short] = np.nan
+
+    return {'start_dates': list(start_dates),
+            'first': [sc_series.int_to_date(dates[i]) if i == j else None for i, j in zip(first, found)],
+            'clamped': [bool(start < dates[0]) for start in starts],
+            'periods': (end - first).astype(int),
+            'beta': betas,
+            'alpha': alphas}
@@ -0,0 +1,55 @@
+"""
+Seeded sc_stream results must match sc_analysis.analyze_symbol on the same
+histories, including when either side of a pair misses bars.
+
+Run with: python3 -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sc_analysis  # noqa: E402
+import sc_stream  # noqa: E402
+
+
+def _weekly_dates(n):
+    days = np.datetime64('2019-01-07') + 7*np.arange(n)
+    return np.array([int(str(d).replace('-', '')) for d in days], dtype=np.int32)
+
+
+def _series(dates, closes, drop=()):
+    keep = np.ones(len(dates), dtype=bool)
+    keep[list(drop)] = False
+    return {'date': dates[keep], 'open': closes[keep], 'high': closes[keep], 'low': closes[keep],
+            'close': closes[keep], 'volume': np.ones(keep.sum())}
+
+
+def test_seeded_stream_matches_analyze_symbol_with_gaps():
+    rng = np.random.default_rng(7)
+    dates = _weekly_dates(312)
+    market = rng.normal(0.002, 0.02, len(dates))
+    closes = lambda beta, vol: 100*np.cumprod(1 + beta*market + rng.normal(0.001, vol, len(dates)))
+
+    histories = {'SPY': _series(dates, closes(1.0, 0.002), drop=(20, 21, 50, 90)),
+                 'QQQ': _series(dates, closes(1.2, 0.005)),
+                 'AAPL': _series(dates, closes(0.8, 0.03), drop=(5, 50, 200)),
+                 'NEW': _series(dates[150:], closes(1.5, 0.04)[150:], drop=(10, 11))}
+    benchmarks = {'SP500': 'SPY', 'NASDAQ': 'QQQ'}
+
+    stream = sc_stream.MomentStream(['AAPL', 'NEW', 'SPY'], benchmarks, 'weekly')
+    sc_stream.seed(stream, histories)
+    betas, alphas, periods = stream.results(None, 0.02)
+
+    for i, symbol in enumerate(stream.symbols):
+        for j, key in enumerate(stream.keys):
+            if (symbol == benchmarks[key]):
+                assert np.isnan(betas[i, j])
+                continue
+            beta, alpha, n = sc_analysis.analyze_symbol(histories[symbol], [histories[benchmarks[key]]], 99, 0.02)
+            assert periods[i, j] == n
+            assert np.isclose(betas[i, j], beta[0], rtol=1e-9, atol=1e-12)
+            assert np.isclose(alphas[i, j], alpha[0], rtol=1e-9, atol=1e-12)